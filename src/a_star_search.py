@@ -1,12 +1,23 @@
 """Solves a maze using the A* search algorithm"""
 import time
-import math
 from priority_queue import MazePriorityQueue
+from search_statistics import InstrumentedPriorityQueue, SearchStatistics
+from search_statistics import tracking_memory
+from search_progress import SearchProgress, run_to_completion
+from maze_grid import MazeGrid, open_neighbours
+from maze_binary import load_maze_cached
+from maze_components import load_components_cached, search_if_reachable
+from heuristics import resolve_heuristic, search_optimality
 from iterative_depth_first_search import performance_statistics
-from iterative_depth_first_search import maze_output_to_file
+from maze_output import maze_output_to_file, solver_arguments
 
+# The weight heuristic_calculator() and a_star_search() use by default
+DEFAULT_HEURISTIC_WEIGHT = 1.2
 
-def maze_solver(file_name: str) -> None:
+
+def maze_solver(file_name: str, path_format: str = None,
+                collect_statistics: bool = False, heuristic="manhattan",
+                weight: float = DEFAULT_HEURISTIC_WEIGHT) -> None:
     """ Uses the A* search algorithm to solve a maze and prints out
     statistics about the algorithm's performance when solving the maze,
     including the number of nodes explored, the execution time and the
@@ -14,85 +25,94 @@ def maze_solver(file_name: str) -> None:
 
     Args:
         file_name (str): The file name of the maze to be solved, provided as a
-            string so that it can be used to open the maze file directly, with
-            no error checking required.
+            string so that it can be used to open the maze file directly.
+        path_format (str, optional): How to print the path taken, one of
+            maze_output.PATH_FORMATS, or None (the default) to skip printing
+            it.
+        collect_statistics (bool, optional): Whether to collect and print
+            the search statistics (see search_statistics.SearchStatistics),
+            including the peak memory used, which slows the search down.
+        heuristic (str or callable, optional): The heuristic used to estimate
+            the distance to the goal, see heuristic_calculator().
+        weight (float, optional): The weight the heuristic is multiplied by.
     """
-    # Track the column and row number of a given position
-    row = 0
-    column = 0
-    # Stores the maze and maps each position to a wall/path value.
-    maze_dictionary = {}
-
-    # Opens the desired maze file and stores its contents in a string
-    with open(file_name, "r", encoding="utf-8") as file_pointer:
-        maze_string = file_pointer.readlines()
-
-    # Getting the coordinates of the starting node
-    start_point = (0, int(maze_string[0].index('-')/2))
-
-    # Iterates through each character on each line in the provided text file
-    for line in maze_string:
-        num_dashes = line.count('-')
-        # The goal node is the only node in the final row whose value is '-'
-        if num_dashes == 1 and row > 0:
-            # Removes the spaces from the line (is always a multiple of two)
-            # And gets the index of the end node
-            goal_point = (row, int(line.index('-')/2))
-
-        for position in line:
-            # Only storing values if they are a path or a wall
-            if position in '#' or position in '-':
-                maze_dictionary[(row, column)] = position
-                column += 1
-
-        # Moves down to the start of the next row
-        column = 0
-        row += 1
+    # Loads the maze (from the binary cache if it is fresh) into a flat grid
+    # along with its start and goal points
+    (maze_grid, start_point, goal_point) = load_maze_cached(file_name)
+    # Loads the maze's connected components (from the cache if they are
+    # fresh), so an unreachable goal is answered without searching
+    components = load_components_cached(file_name)
+
+    statistics = SearchStatistics() if collect_statistics else None
 
     # Stores both the path taken and the number of nodes explored by the
     # algorithm
     start_time = time.time()
-    (maze_path_a_star,
-     nodes_expanded) = a_star_search(maze_dictionary, start_point, goal_point)
+    with tracking_memory(statistics):
+        (maze_path_a_star,
+         nodes_expanded) = search_if_reachable(components, a_star_search,
+                                               maze_grid, start_point,
+                                               goal_point,
+                                               heuristic=heuristic,
+                                               weight=weight,
+                                               statistics=statistics)
     end_time = time.time()
-    maze_path_string = ''
-
-    # Converts the path list into a string with arrows between each point
-    # Allows the path to be printed in a more readable format
-    for item in maze_path_a_star:
-        if item == goal_point:
-            maze_path_string += str(goal_point)
-        else:
-            maze_path_string += str(item) + " -> "
 
     # Prints out all the algorithm's performance statistics
     # Finds the difference between the time at the start and end of the search
     # and rounds it to five decimal places
-    performance_statistics(len(maze_path_a_star),
+    performance_statistics((len(maze_path_a_star) - 1
+                            if maze_path_a_star is not None else None),
                            nodes_expanded,
                            round(end_time - start_time, 5),
-                           maze_path_string
+                           (maze_path_a_star if path_format is not None
+                            else None),
+                           path_format,
+                           statistics
                            )
 
-    # Outputs the algorithms path through the maze to the file mazePath.txt
-    maze_output_to_file(maze_dictionary, file_name, maze_path_a_star)
+    # Describes how close to the shortest path the path found is guaranteed
+    # to be, with the heuristic and weight that were actually used
+    if maze_path_a_star is not None:
+        print("The path found by the algorithm is:                ",
+              search_optimality(heuristic, weight))
+
+    # Outputs the algorithms path through the maze to the file maze_path.txt
+    maze_output_to_file(maze_grid, maze_path_a_star)
 
 
 def a_star_search(maze_dictionary: dict, start_point: tuple[int, int],
-                  goal_point: tuple[int, int]) -> tuple[list[(int, int)], int]:
+                  goal_point: tuple[int, int], heuristic="manhattan",
+                  weight: float = DEFAULT_HEURISTIC_WEIGHT,
+                  heuristic_table=None, statistics: SearchStatistics = None
+                  ) -> tuple[list[(int, int)], int]:
     """ Executes an A* search on the provided maze and returns the path taken
     by the algorithm from the start to the goal node, along with the number of
     nodes that have been expanded by the algorithm.
 
     Args:
-        maze_dictionary (dict of (int, int): str): A mapping of each coordinate
-            in the maze to a string representation of a wall or path. This
-            simplifies the representation and makes accessing parts of the
-            maze more efficient.
+        maze_dictionary (dict of (int, int): str or MazeGrid): A mapping of
+            each coordinate in the maze to a string representation of a wall
+            or path, or a MazeGrid holding the same maze as a flat array of
+            cells (which uses far less memory on large mazes), or a
+            tiled_maze.TiledMaze for mazes that don't fit in memory.
         start_point (tuple[int, int]): A coordinate (int, int) tuple indicating
             when the algorithm starts when solving the maze.
         goal_point (tuple[int, int]): A coordinate (int, int) tuple indicating
             when the algorithm ends when solving the maze.
+        heuristic (str or callable, optional): The heuristic used to estimate
+            the distance to the goal, see heuristic_calculator().
+        weight (float, optional): The weight the heuristic is multiplied by,
+            search_optimality(heuristic, weight) describes how close to the
+            shortest path the result is guaranteed to be.
+        heuristic_table (array, optional): The weighted heuristic of every
+            cell, as built by heuristics.heuristic_table(), which replaces
+            the heuristic and weight arguments. Only usable with a MazeGrid,
+            as the table is looked up by flat index.
+        statistics (SearchStatistics, optional): If provided, the search
+            records the largest size of the frontier, the size of the visited
+            set, the number of neighbours checked and the number of times a
+            cheaper route was found to a node already in the frontier.
 
     Returns:
         tuple[list[(int, int)], int]: (path_taken, nodes_expanded). A packaged
@@ -102,12 +122,69 @@ def a_star_search(maze_dictionary: dict, start_point: tuple[int, int],
             multiple values to be returned in one go and simplifies the data
             collection process.
     """
+    return run_to_completion(a_star_steps(
+        maze_dictionary, start_point, goal_point, heuristic, weight,
+        heuristic_table, statistics, batch_size=0))
+
+
+def a_star_steps(maze_dictionary: dict, start_point: tuple[int, int],
+                 goal_point: tuple[int, int], heuristic="manhattan",
+                 weight: float = DEFAULT_HEURISTIC_WEIGHT,
+                 heuristic_table=None, statistics: SearchStatistics = None,
+                 batch_size: int = 1):
+    """ Executes an A* search on the provided maze one step at a time, as a
+    generator that yields its progress after every batch of expansions, so
+    the caller can watch the search or stop it part way (see
+    search_progress.run_with_budget()). a_star_search() runs it to the end.
+
+    Args:
+        maze_dictionary (dict of (int, int): str or MazeGrid): The maze being
+            solved, see a_star_search().
+        start_point (tuple[int, int]): A coordinate (int, int) tuple indicating
+            when the algorithm starts when solving the maze.
+        goal_point (tuple[int, int]): A coordinate (int, int) tuple indicating
+            when the algorithm ends when solving the maze.
+        heuristic (str or callable, optional): See a_star_search().
+        weight (float, optional): See a_star_search().
+        heuristic_table (array, optional): See a_star_search().
+        statistics (SearchStatistics, optional): See a_star_search().
+        batch_size (int, optional): The number of expansions between each
+            yield, 0 to never yield.
+
+    Yields:
+        SearchProgress: (progress). A snapshot of the search after the last
+            expansion of each batch.
+
+    Returns:
+        tuple[list[(int, int)], int]: (path_taken, nodes_expanded). The result
+            of the search, as the value of the StopIteration raised when the
+            generator finishes.
+    """
+    if heuristic_table is not None:
+        # The table is indexed by flat index, so needs the maze's width
+        if not isinstance(maze_dictionary, MazeGrid):
+            raise TypeError("heuristic_table can only be used with a MazeGrid")
+        width = maze_dictionary.width
+        start_estimate = heuristic_table[start_point[0] * width
+                                         + start_point[1]]
+    else:
+        heuristic_function = resolve_heuristic(heuristic)
+        start_estimate = weight * heuristic_function(start_point, goal_point)
+
+    # Swaps in the instrumented frontier and neighbour function when the
+    # statistics are being collected, so the search loop itself is unchanged
+    if statistics is None:
+        frontier = MazePriorityQueue()
+        neighbours = open_neighbours
+    else:
+        frontier = InstrumentedPriorityQueue(statistics)
+        neighbours = statistics.counting_neighbours(open_neighbours)
+
     nodes_expanded = 0
-    # Initialises a new priority queue for the maze and places the starting
-    # node in it
-    frontier = MazePriorityQueue()
-    frontier.insert((start_point, heuristic_calculator(start_point,
-                                                       goal_point)))
+    # The number of expansions at which the progress is next yielded
+    next_progress = batch_size if batch_size > 0 else -1
+    # Places the starting node in the frontier
+    frontier.insert((start_point, start_estimate))
     visited_nodes = set()
     path_taken = []
     # Stores the parent of each node in a dictionary
@@ -115,19 +192,15 @@ def a_star_search(maze_dictionary: dict, start_point: tuple[int, int],
 
     # Dictionaries to store the g(x) of a node (cost from the start to the
     # node) and the f(x) of a node (g(x) + h(x) (heuristic) of a node)
+    # Nodes are only given an entry once they are first reached, so no
+    # per-cell work is needed before the search starts
     node_cost = {}
     node_function_cost = {}
-    # Initialises each cost and function cost to infinity
-    for item in maze_dictionary:
-        if maze_dictionary[item] == '-':
-            node_cost[item] = math.inf
-            node_function_cost[item] = math.inf
 
     # Adds the starting node along with it's cost and function cost to the
     # respective dictionaries
     node_cost[start_point] = 0
-    node_function_cost[start_point] = heuristic_calculator(start_point,
-                                                           goal_point)
+    node_function_cost[start_point] = start_estimate
 
     # While there are still paths to explore, move through the maze
     while frontier.is_empty() is False:
@@ -145,120 +218,103 @@ def a_star_search(maze_dictionary: dict, start_point: tuple[int, int],
                 (current_row, current_column) = parent_dict[(current_row,
                                                              current_column)]
 
+            if statistics is not None:
+                statistics.visited_nodes = len(visited_nodes)
             # Returns the path taken (Reversed as moving from goal to start)
             return (list(reversed(path_taken)), nodes_expanded)
 
         visited_nodes.add((current_row, current_column))
 
-        # Calculates each potential neighbouring node
-        next_nodes = [
-            (current_row - 1, current_column),  # Up
-            (current_row, current_column + 1),  # Right
-            (current_row + 1, current_column),  # Down
-            (current_row, current_column - 1)   # Left
-        ]
-
-        for (row, column) in next_nodes:
-            # Only explores the next node if it is a valid path
-            # Finds the "pseudo" cost of the current node from the start node
-            interimnode_cost = node_cost[(current_row, current_column)] + 1
-            if row >= 0 and column >= 0 and maze_dictionary[(row,
-                                                            column)] == '-':
-                # The neighbouring node is only visited if it isn't in the
-                # frontier and hasn't been visited
-                if (row, column) not in visited_nodes and frontier.in_queue(
-                        (row, column)) is False:
-                    # Adds the neighbouring node along with its cost function
-                    # to the frontier
-                    frontier.insert(((row, column),
-                                     heuristic_calculator((row, column),
-                                                          goal_point)
-                                    + interimnode_cost))
-                    # Adds the f(x) and g(x) of the current node to the
-                    # respective dictionaries
-                    node_function_cost[(row, column)] = (heuristic_calculator(
-                                                         (row, column),
-                                                         goal_point)
-                                                         + interimnode_cost)
-                    node_cost[(row, column)] = interimnode_cost
-                    # Stores the parent of the neighbouring node as the
-                    # current node
-                    parent_dict[(row, column)] = (current_row, current_column)
-
-                # If the neighbnouring node is alread_y in the frontier (and
-                # hasn't been visited) change the value of the cost function
-                # if it is lower than what is alread_y stored in the frontier
-                elif (row, column) not in visited_nodes and frontier.in_queue(
-                        (row, column)) is True:
-                    # Adds the f(x) and g(x) of the current node to the
-                    # respective dictionaries
-                    node_function_cost[(row, column)] = (heuristic_calculator(
-                                                       (row, column),
-                                                       goal_point)
-                                                       + interimnode_cost)
-                    node_cost[(row, column)] = interimnode_cost
-                    frontier.change_node_cost(((row, column),
-                                              heuristic_calculator((row,
-                                                                    column),
-                                                                   goal_point)
-                                              + interimnode_cost))
-                    # Stores the parent of the neighbouring node as the
-                    # current node
-                    parent_dict[(row, column)] = (current_row, current_column)
+        # Finds the "pseudo" cost of the neighbouring nodes from the start
+        interimnode_cost = node_cost[(current_row, current_column)] + 1
+
+        # Only explores the neighbouring nodes that are valid paths
+        for (row, column) in neighbours(maze_dictionary,
+                                        (current_row, current_column)):
+            if (row, column) in visited_nodes:
+                continue
+
+            # Finds the f(x) of the neighbouring node through the current node
+            if heuristic_table is None:
+                function_cost = (weight * heuristic_function((row, column),
+                                                             goal_point)
+                                 + interimnode_cost)
+            else:
+                function_cost = (heuristic_table[row * width + column]
+                                 + interimnode_cost)
+
+            # The neighbouring node is only visited if it isn't in the
+            # frontier and hasn't been visited
+            if frontier.in_queue((row, column)) is False:
+                # Adds the neighbouring node along with its cost function
+                # to the frontier
+                frontier.insert(((row, column), function_cost))
+
+            # If the neighbouring node is already in the frontier (and
+            # hasn't been visited) and a cheaper route to it has been
+            # found, lower the value of its cost function in the frontier
+            elif interimnode_cost < node_cost[(row, column)]:
+                frontier.change_node_cost(((row, column), function_cost))
+
+            else:
+                continue
+
+            # Adds the f(x) and g(x) of the neighbouring node to the
+            # respective dictionaries
+            node_function_cost[(row, column)] = function_cost
+            node_cost[(row, column)] = interimnode_cost
+            # Stores the parent of the neighbouring node as the
+            # current node
+            parent_dict[(row, column)] = (current_row, current_column)
+
+        # Hands control back to the caller after every batch of expansions
+        if nodes_expanded == next_progress:
+            next_progress += batch_size
+            yield SearchProgress((current_row, current_column),
+                                 nodes_expanded, len(frontier.priority_queue),
+                                 len(visited_nodes), statistics)
 
     # If the whole maze is explored and the goal node isn't found
     # return an empty path
+    if statistics is not None:
+        statistics.visited_nodes = len(visited_nodes)
     return (None, nodes_expanded)
 
 
 def heuristic_calculator(current_position: tuple[int, int],
-                         goal_point: tuple[int, int]) -> float:
-    """ Calculates a heuristic value for the node provided, this is the
-    Manhattan distance between the current position and the goal node.
-    Other heuristics (Euclidean and diagonal) are calculated for further
-    experimentation.
+                         goal_point: tuple[int, int],
+                         heuristic="manhattan",
+                         weight: float = DEFAULT_HEURISTIC_WEIGHT) -> float:
+    """ Calculates a heuristic value for the node provided, by default this is
+    the Manhattan distance between the current position and the goal node
+    multiplied by a weight of 1.2. Other heuristics (Euclidean, octile and a
+    zero heuristic for Dijkstra's algorithm) and weights can be selected for
+    further experimentation, see heuristics.py.
 
     Args:
         current_position (tuple[int, int]): A coordinate (int, int) tuple
             indicating the current position of the algorithm in the maze.
         goal_point (tuple[int, int]): A coordinate (int, int) tuple indicating
             when the algorithm ends when solving the maze.
+        heuristic (str or callable, optional): The name of the heuristic to
+            use ("manhattan", "euclidean", "octile" or "zero"), or a function
+            taking (current_position, goal_point).
+        weight (float, optional): The weight the heuristic is multiplied by.
+            Weights above 1 make the search more efficient, but the path it
+            finds may then be up to that many times longer than the shortest.
 
     Returns:
-        float: (1.2 * (d_x + d_y)). A float value representing the current
-            position's distance from the goal node. This can be any one of
-            three heuristic values (Manhattan, Euclidean, Diagonal), which
-            also use an arbitrary weight to make them more efficient.
+        float: (weight * distance). A float value representing the current
+            position's (weighted) estimated distance from the goal node.
     """
-    # Breaks the goal node and the current node into a (row,column) tuple
-    (current_row, current_column) = current_position
-    (goal_row, goal_column) = goal_point
-
-    # Finds the Manhattan distance between the current node and the goal node
-    d_x = abs(current_column - goal_column)
-    d_y = abs(current_row - goal_row)
-
-    # Returns the sum multiplied by an arbitrary weight (1) - Manhattan
-    return 1.2 * (d_x + d_y)
-
-    # Finds the Euclidean distance between the current node and the goal node
-    # d_x = abs(current_column - goal_column)
-    # d_y = abs(current_row - goal_row)
-
-    # # Returns the square root of the sum of the squares multiplied by some
-    # arbitrary weight (1) - Euclidean
-    # return (2 * math.sqrt(d_x * d_x + d_y * d_y))
-
-    # Finds the diagonal distance between the current node and the goal node
-    # d_x = abs(goal_column - current_column)
-    # d_y = abs(goal_row - current_row)
-
-    # # Returns the weight times the sum plus the minimum cost of moving
-    # diagonally
-    # return 1.2 * (d_x + d_y) + (1.2 - 2 * 1.2) * min(d_x, d_y)
+    return weight * resolve_heuristic(heuristic)(current_position, goal_point)
 
 
 if __name__ == '__main__':
+    # The path and statistics are only printed if asked for on the command
+    # line
+    OPTIONS = solver_arguments(statistics=True)
     MAZE_FILE_NAME = str(input(
                     "Enter the file_name of the maze you would like solved: "))
-    maze_solver("../docs/mazes/" + MAZE_FILE_NAME)
+    maze_solver("../docs/mazes/" + MAZE_FILE_NAME, OPTIONS.path_format,
+                OPTIONS.statistics)
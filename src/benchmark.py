@@ -0,0 +1,336 @@
+"""Benchmarks the maze solvers on the bundled mazes and on generated mazes
+
+Every solver is run on every maze a number of times (after some untimed
+warmup runs), timing the three stages of a solve separately:
+    parse  - loading the maze text file into a MazeGrid
+    search - running the search itself
+    output - writing the path through the maze to a file
+The median and 95th percentile of each stage are reported, and the full
+results are written to a JSON file so runs on different commits can be
+compared with --compare.
+
+Example:
+    python3 benchmark.py --trials 5 -o before.json
+    (check out another commit)
+    python3 benchmark.py --trials 5 -o after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from maze_io import MazeFormatError, load_maze
+from a_star_search import a_star_search
+from iterative_depth_first_search import iterative_dfs
+from flat_search import flat_a_star, flat_dfs
+from resumable_dfs import resumable_dfs
+from solver_registry import result_optimality
+from maze_output import maze_output_to_file
+from maze_generator import ALGORITHMS, generate_maze
+
+# The folder holding the bundled mazes
+MAZE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              "..", "docs", "mazes")
+BUNDLED_MAZES = ["maze-Easy.txt", "maze-Medium.txt", "maze-Large.txt",
+                 "maze-VLarge.txt"]
+# The sizes (rows and columns) of the generated mazes
+DEFAULT_SIZES = [101, 201, 401, 801]
+STAGES = ("parse", "search", "output")
+
+
+SOLVERS = {
+    "a_star": a_star_search,
+    "iterative_dfs": iterative_dfs,
+    # The recursive order DFS, which no longer recurses
+    "recursive_dfs": resumable_dfs,
+    "flat_a_star": flat_a_star,
+    "flat_dfs": flat_dfs,
+}
+# The faster versions of solvers, compared with the originals by
+# print_speedups() when both are benchmarked
+FAST_VARIANTS = {"flat_a_star": "a_star", "flat_dfs": "iterative_dfs"}
+
+
+def time_stages(maze_file: str, solver, trials: int, warmup: int,
+                output_directory: str) -> dict:
+    """ Times the parse, search and output stages of solving one maze with
+    one solver.
+
+    Args:
+        maze_file (str): The maze to solve.
+        solver (callable): The search function.
+        trials (int): The number of timed runs.
+        warmup (int): The number of untimed runs done first.
+        output_directory (str): The folder the path output is written to.
+
+    Returns:
+        dict: (result). The timings (in nanoseconds) of every trial of every
+            stage, along with the path length, its optimality (see
+            solver_registry.result_optimality()) and the number of nodes
+            expanded.
+    """
+    timings = {stage: [] for stage in STAGES}
+
+    for run in range(warmup + trials):
+        start_time = time.perf_counter_ns()
+        (maze_grid, start_point, goal_point) = load_maze(maze_file)
+        parse_time = time.perf_counter_ns()
+        (path_taken, nodes_expanded) = solver(maze_grid, start_point,
+                                              goal_point)
+        search_time = time.perf_counter_ns()
+        maze_output_to_file(maze_grid, path_taken,
+                            os.path.join(output_directory, "maze_path.txt"))
+        output_time = time.perf_counter_ns()
+
+        if run >= warmup:
+            timings["parse"].append(parse_time - start_time)
+            timings["search"].append(search_time - parse_time)
+            timings["output"].append(output_time - search_time)
+
+    result = {
+        "path_length": (len(path_taken) - 1 if path_taken is not None
+                        else None),
+        "nodes_expanded": nodes_expanded,
+        "stages": {stage: summarise(stage_timings)
+                   for (stage, stage_timings) in timings.items()},
+    }
+    if path_taken is not None:
+        # How close to the shortest path the path is guaranteed to be
+        result["optimality"] = result_optimality(solver, path_taken)
+    return result
+
+
+def summarise(timings: list[int]) -> dict:
+    """ Finds the median and 95th percentile (nearest rank) of a list of
+    timings.
+
+    Args:
+        timings (list[int]): The timings in nanoseconds.
+
+    Returns:
+        dict: (summary). The median, 95th percentile, minimum and every
+            timing, all in nanoseconds.
+    """
+    ordered = sorted(timings)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        median = ordered[middle]
+    else:
+        median = (ordered[middle - 1] + ordered[middle]) // 2
+    # The nearest rank method, rounding the rank up
+    p95 = ordered[max(0, -(-95 * len(ordered) // 100) - 1)]
+
+    return {"median_ns": median, "p95_ns": p95, "min_ns": ordered[0],
+            "trials_ns": timings}
+
+
+def run_benchmarks(solver_names: list[str], sizes: list[int], trials: int,
+                   warmup: int, seed: int,
+                   generator: str = "backtracker") -> list[dict]:
+    """ Runs every solver on the bundled mazes and on a generated maze of each
+    size, printing a line per stage as it goes.
+
+    Args:
+        solver_names (list[str]): The solvers to run, keys of SOLVERS.
+        sizes (list[int]): The sizes (rows and columns) of the generated
+            mazes.
+        trials (int): The number of timed runs per maze and solver.
+        warmup (int): The number of untimed runs done first.
+        seed (int): The seed the mazes are generated from.
+        generator (str, optional): The maze generation algorithm, one of
+            maze_generator.ALGORITHMS.
+
+    Returns:
+        list[dict]: (results). One entry per (maze, solver) pair, see
+            time_stages().
+    """
+    results = []
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        maze_files = [os.path.join(MAZE_DIRECTORY, maze_name)
+                      for maze_name in BUNDLED_MAZES]
+        for size in sizes:
+            maze_file = os.path.join(temporary_directory,
+                                     f"generated-{generator}-{size}.txt")
+            generate_maze(maze_file, size, size, generator, seed)
+            maze_files.append(maze_file)
+
+        for maze_file in maze_files:
+            for solver_name in solver_names:
+                result = {"maze": os.path.basename(maze_file),
+                          "solver": solver_name}
+                try:
+                    result.update(time_stages(maze_file, SOLVERS[solver_name],
+                                              trials, warmup,
+                                              temporary_directory))
+                except (MazeFormatError, OSError) as error:
+                    # A maze that can't be read (or output that can't be
+                    # written) shouldn't stop the rest of the benchmark
+                    result["error"] = f"{type(error).__name__}: {error}"
+
+                results.append(result)
+                _print_result(result)
+
+    return results
+
+
+def _print_result(result: dict) -> None:
+    """ Prints the median and 95th percentile of each stage of a result.
+    """
+    label = f"{result['maze']:<22} {result['solver']:<14}"
+    if "error" in result:
+        print(f"{label} {result['error']}")
+        return
+
+    stages = "  ".join(
+        f"{stage} {summary['median_ns'] / 1e6:9.3f} ms "
+        f"(p95 {summary['p95_ns'] / 1e6:9.3f})"
+        for (stage, summary) in result["stages"].items())
+    print(f"{label} {stages}")
+
+
+def print_speedups(results: list[dict]) -> None:
+    """ Prints how much faster the search stage of each of the FAST_VARIANTS
+    was than its original solver on every maze both were run on, checking
+    that the two found paths of the same length with the same number of
+    nodes expanded.
+
+    Args:
+        results (list[dict]): The results of a run, see run_benchmarks().
+    """
+    by_key = {(result["maze"], result["solver"]): result
+              for result in results if "stages" in result}
+
+    for ((maze, solver_name), result) in by_key.items():
+        original = by_key.get((maze, FAST_VARIANTS.get(solver_name)))
+        if original is None:
+            continue
+        before = original["stages"]["search"]["median_ns"]
+        after = result["stages"]["search"]["median_ns"]
+        matches = ((result["path_length"], result["nodes_expanded"]) ==
+                   (original["path_length"], original["nodes_expanded"]))
+        print(f"{maze:<22} {solver_name:<14} search "
+              f"{before / 1e6:9.3f} ms -> {after / 1e6:9.3f} ms "
+              f"({before / after if after else float('inf'):5.2f}x faster)"
+              f"{'' if matches else '  RESULTS DIFFER'}")
+
+
+def compare(previous: dict, current: dict, threshold: float) -> int:
+    """ Compares the median stage timings of two benchmark runs, printing the
+    ratio of each one and flagging those that got slower by more than the
+    threshold.
+
+    Args:
+        previous (dict): The results of the earlier run.
+        current (dict): The results of the later run.
+        threshold (float): The ratio (current / previous) above which a
+            timing counts as a regression.
+
+    Returns:
+        int: (regressions). The number of timings that regressed.
+    """
+    earlier = {(result["maze"], result["solver"]): result
+               for result in previous["results"] if "stages" in result}
+    regressions = 0
+
+    for result in current["results"]:
+        key = (result["maze"], result["solver"])
+        if "stages" not in result or key not in earlier:
+            continue
+        for stage in STAGES:
+            before = earlier[key]["stages"][stage]["median_ns"]
+            after = result["stages"][stage]["median_ns"]
+            ratio = after / before if before else float("inf")
+            flag = ""
+            if ratio > threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(f"{key[0]:<22} {key[1]:<14} {stage:<7} "
+                  f"{before / 1e6:9.3f} ms -> {after / 1e6:9.3f} ms "
+                  f"({ratio:5.2f}x){flag}")
+
+    return regressions
+
+
+def _git_commit() -> str:
+    """ Finds the commit being benchmarked, or None outside of git.
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"],
+                              capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))
+                              ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(arguments: list[str] = None) -> int:
+    """ Runs the benchmarks from the command line.
+
+    Returns:
+        int: (exit_code). 1 if --compare found a regression, otherwise 0.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark the maze solvers.")
+    parser.add_argument("--solvers", nargs="+", default=list(SOLVERS),
+                        choices=list(SOLVERS), metavar="SOLVER",
+                        help="solvers to benchmark (default: all of "
+                        f"{', '.join(SOLVERS)})")
+    parser.add_argument("--sizes", nargs="*", type=int,
+                        default=DEFAULT_SIZES,
+                        help="sizes of the generated mazes (default: "
+                        f"{' '.join(map(str, DEFAULT_SIZES))})")
+    parser.add_argument("--trials", type=int, default=5,
+                        help="timed runs per maze and solver (default: 5)")
+    parser.add_argument("--warmup", type=int, default=1,
+                        help="untimed runs first (default: 1)")
+    parser.add_argument("--generator", choices=ALGORITHMS,
+                        default="backtracker",
+                        help="algorithm used to generate the mazes (default: "
+                        "backtracker)")
+    parser.add_argument("--seed", type=int, default=2423,
+                        help="seed for the generated mazes (default: 2423)")
+    parser.add_argument("-o", "--output", default="benchmark_results.json",
+                        help="file to write the results to (default: "
+                        "benchmark_results.json)")
+    parser.add_argument("--compare", metavar="PREVIOUS",
+                        help="results of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=1.1,
+                        help="slowdown ratio counted as a regression by "
+                        "--compare (default: 1.1)")
+    options = parser.parse_args(arguments)
+
+    results = run_benchmarks(options.solvers, options.sizes, options.trials,
+                             options.warmup, options.seed, options.generator)
+    print_speedups(results)
+    report = {
+        "metadata": {
+            "commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "trials": options.trials,
+            "warmup": options.warmup,
+            "seed": options.seed,
+            "generator": options.generator,
+        },
+        "results": results,
+    }
+    with open(options.output, "w", encoding="utf-8") as file_pointer:
+        json.dump(report, file_pointer, indent=2)
+    print(f"Results written to {options.output}")
+
+    if options.compare:
+        with open(options.compare, "r", encoding="utf-8") as file_pointer:
+            previous = json.load(file_pointer)
+        if compare(previous, report, options.threshold):
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
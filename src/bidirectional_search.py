@@ -0,0 +1,291 @@
+"""Solves a maze by searching from the start and the goal at the same time"""
+import math
+import time
+from priority_queue import MazePriorityQueue
+from maze_grid import open_neighbours
+from maze_binary import load_maze_cached
+from maze_components import load_components_cached, search_if_reachable
+from iterative_depth_first_search import performance_statistics
+from maze_output import maze_output_to_file, solver_arguments
+
+
+def maze_solver(file_name: str, search_function=None,
+                path_format: str = None) -> None:
+    """ Uses a bidirectional search to solve a maze and prints out statistics
+    about the algorithm's performance when solving the maze, including the
+    number of nodes explored, the execution time and the number of steps in
+    the path.
+
+    Args:
+        file_name (str): The file name of the maze to be solved, provided as a
+            string so that it can be used to open the maze file directly.
+        search_function (callable, optional): The bidirectional search to use,
+            either bidirectional_a_star (the default) or bidirectional_bfs.
+        path_format (str, optional): How to print the path taken, one of
+            maze_output.PATH_FORMATS, or None (the default) to skip printing
+            it.
+    """
+    if search_function is None:
+        search_function = bidirectional_a_star
+
+    # Loads the maze (from the binary cache if it is fresh) into a flat grid
+    # along with its start and goal points
+    (maze_grid, start_point, goal_point) = load_maze_cached(file_name)
+    # Loads the maze's connected components (from the cache if they are
+    # fresh), so an unreachable goal is answered without searching
+    components = load_components_cached(file_name)
+
+    # Stores both the path taken and the number of nodes explored by the
+    # algorithm
+    start_time = time.time()
+    (maze_path_bidirectional,
+     nodes_expanded) = search_if_reachable(components, search_function,
+                                           maze_grid, start_point, goal_point)
+    end_time = time.time()
+
+    # Prints out all the algorithm's performance statistics
+    performance_statistics((len(maze_path_bidirectional) - 1
+                            if maze_path_bidirectional is not None else None),
+                           nodes_expanded,
+                           round(end_time - start_time, 5),
+                           (maze_path_bidirectional if path_format is not None
+                            else None),
+                           path_format
+                           )
+
+    # Outputs the algorithms path through the maze to the file maze_path.txt
+    maze_output_to_file(maze_grid, maze_path_bidirectional)
+
+
+def bidirectional_a_star(maze_dictionary, start_point: tuple[int, int],
+                         goal_point: tuple[int, int]
+                         ) -> tuple[list[(int, int)], int]:
+    """ Executes two A* searches on the provided maze, one forwards from the
+    start towards the goal and one backwards from the goal towards the start,
+    always expanding the side with the smaller frontier. Whenever one search
+    reaches a node the other has already reached, the length of the path
+    through that node is recorded.
+
+    Both searches use the balanced heuristic (half the difference between a
+    node's Manhattan distances to the goal and to the start, negated for the
+    backward search), so the f(x) of a node in each frontier adds up to the
+    length of the path through it. The searches stop once the shortest
+    recorded path is no longer than the sum of the two lowest f(x) values in
+    the frontiers, as every path that hasn't been found yet must be at least
+    that long, so the path returned is a shortest path.
+
+    Args:
+        maze_dictionary (dict of (int, int): str or MazeGrid): The maze being
+            solved, either as a maze dictionary or as a MazeGrid.
+        start_point (tuple[int, int]): A coordinate (int, int) tuple indicating
+            when the algorithm starts when solving the maze.
+        goal_point (tuple[int, int]): A coordinate (int, int) tuple indicating
+            when the algorithm ends when solving the maze.
+
+    Returns:
+        tuple[list[(int, int)], int]: (path_taken, nodes_expanded). A packaged
+            tuple containing the path from the start to the goal (or None if
+            there isn't one) along with the number of nodes expanded by both
+            searches combined.
+    """
+    if start_point == goal_point:
+        return ([start_point], 1)
+
+    # Each search is stored as [frontier, g(x), parents, visited, direction],
+    # where the direction flips the sign of the balanced heuristic
+    forwards = _new_a_star_side(start_point, 1, start_point, goal_point)
+    backwards = _new_a_star_side(goal_point, -1, start_point, goal_point)
+    nodes_expanded = 0
+    # The length of the shortest path found so far, and where the two
+    # searches met on it
+    best_cost = math.inf
+    meeting_point = None
+
+    while (forwards[0].is_empty() is False and
+           backwards[0].is_empty() is False):
+        # Stops once no unexplored path can be shorter than the best one
+        if best_cost <= (forwards[0].queue_peek()[1] +
+                         backwards[0].queue_peek()[1]):
+            break
+
+        # Expands the side with the fewest nodes waiting to be explored
+        if (len(forwards[0].priority_queue) <=
+                len(backwards[0].priority_queue)):
+            (side, other_side) = (forwards, backwards)
+        else:
+            (side, other_side) = (backwards, forwards)
+        (frontier, node_cost, parent_dict, visited_nodes, direction) = side
+
+        (current_point, _) = frontier.queue_pop()
+        nodes_expanded += 1
+        visited_nodes.add(current_point)
+
+        # Finds the "pseudo" cost of the neighbouring nodes from this side's
+        # starting point
+        interimnode_cost = node_cost[current_point] + 1
+
+        for next_point in open_neighbours(maze_dictionary, current_point):
+            if next_point in visited_nodes:
+                continue
+
+            # Records (or improves) the route to the neighbouring node
+            if interimnode_cost < node_cost.get(next_point, math.inf):
+                node_cost[next_point] = interimnode_cost
+                parent_dict[next_point] = current_point
+                function_cost = (interimnode_cost + direction *
+                                 _balanced_heuristic(next_point, start_point,
+                                                     goal_point))
+                if frontier.in_queue(next_point):
+                    frontier.change_node_cost((next_point, function_cost))
+                else:
+                    frontier.insert((next_point, function_cost))
+
+            # If the other search has reached this node too, a path from the
+            # start to the goal through it has been found
+            if next_point in other_side[1]:
+                path_cost = node_cost[next_point] + other_side[1][next_point]
+                if path_cost < best_cost:
+                    best_cost = path_cost
+                    meeting_point = next_point
+
+    if meeting_point is None:
+        return (None, nodes_expanded)
+
+    return (_join_paths(forwards[2], backwards[2],
+                        (meeting_point, meeting_point), start_point,
+                        goal_point), nodes_expanded)
+
+
+def bidirectional_bfs(maze_dictionary, start_point: tuple[int, int],
+                      goal_point: tuple[int, int]
+                      ) -> tuple[list[(int, int)], int]:
+    """ Executes two breadth first searches on the provided maze, one from the
+    start and one from the goal, expanding a whole layer of whichever side
+    has the smaller frontier at a time. The searches stop at the end of the
+    first layer in which they meet, taking the shortest of the paths that
+    were found in that layer, which is a shortest path through the maze.
+
+    Args:
+        maze_dictionary (dict of (int, int): str or MazeGrid): The maze being
+            solved, either as a maze dictionary or as a MazeGrid.
+        start_point (tuple[int, int]): A coordinate (int, int) tuple indicating
+            when the algorithm starts when solving the maze.
+        goal_point (tuple[int, int]): A coordinate (int, int) tuple indicating
+            when the algorithm ends when solving the maze.
+
+    Returns:
+        tuple[list[(int, int)], int]: (path_taken, nodes_expanded). A packaged
+            tuple containing the path from the start to the goal (or None if
+            there isn't one) along with the number of nodes expanded by both
+            searches combined.
+    """
+    if start_point == goal_point:
+        return ([start_point], 1)
+
+    # Each search is stored as [current layer, distances, parents]
+    forwards = [[start_point], {start_point: 0}, {}]
+    backwards = [[goal_point], {goal_point: 0}, {}]
+    nodes_expanded = 0
+
+    while forwards[0] and backwards[0]:
+        if len(forwards[0]) <= len(backwards[0]):
+            (side, other_side) = (forwards, backwards)
+        else:
+            (side, other_side) = (backwards, forwards)
+        (layer, distances, parent_dict) = side
+        other_distances = other_side[1]
+
+        next_layer = []
+        best_cost = math.inf
+        meeting_edge = None
+
+        for current_point in layer:
+            nodes_expanded += 1
+            for next_point in open_neighbours(maze_dictionary, current_point):
+                # Records the shortest path that crosses over to the other
+                # search, but finishes the layer in case there's a shorter one
+                if next_point in other_distances:
+                    path_cost = (distances[current_point] + 1 +
+                                 other_distances[next_point])
+                    if path_cost < best_cost:
+                        best_cost = path_cost
+                        meeting_edge = (current_point, next_point)
+
+                if next_point not in distances:
+                    distances[next_point] = distances[current_point] + 1
+                    parent_dict[next_point] = current_point
+                    next_layer.append(next_point)
+
+        if meeting_edge is not None:
+            # Orders the crossing edge as (forward node, backward node)
+            if side is backwards:
+                meeting_edge = (meeting_edge[1], meeting_edge[0])
+            return (_join_paths(forwards[2], backwards[2], meeting_edge,
+                                start_point, goal_point), nodes_expanded)
+
+        side[0] = next_layer
+
+    return (None, nodes_expanded)
+
+
+def _new_a_star_side(source_point: tuple[int, int], direction: int,
+                     start_point: tuple[int, int],
+                     goal_point: tuple[int, int]) -> list:
+    """ Creates the state for one direction of a bidirectional A* search, with
+    the source point waiting in its frontier.
+    """
+    frontier = MazePriorityQueue()
+    frontier.insert((source_point, direction * _balanced_heuristic(
+        source_point, start_point, goal_point)))
+    return [frontier, {source_point: 0}, {}, set(), direction]
+
+
+def _balanced_heuristic(point: tuple[int, int], start_point: tuple[int, int],
+                        goal_point: tuple[int, int]) -> float:
+    """ Finds the forward search's heuristic for a point, which is half the
+    difference between its Manhattan distance to the goal and to the start.
+    The backward search uses the same value negated. Because the two
+    heuristics sum to zero and change by at most one per step, they are
+    consistent, and the shortest path has been found once the lowest f(x) in
+    both frontiers add up to at least its length.
+    """
+    return (abs(point[0] - goal_point[0]) + abs(point[1] - goal_point[1])
+            - abs(point[0] - start_point[0])
+            - abs(point[1] - start_point[1])) / 2
+
+
+def _join_paths(forward_parents: dict, backward_parents: dict,
+                meeting_edge: tuple[(int, int), (int, int)],
+                start_point: tuple[int, int],
+                goal_point: tuple[int, int]) -> list[(int, int)]:
+    """ Builds the full path from the point where the two searches met, given
+    as a (forward node, backward node) pair (which are the same node when the
+    searches met on a node rather than across an edge). The path backtracks
+    to the start through the forward parents and to the goal through the
+    backward parents.
+    """
+    (forward_point, backward_point) = meeting_edge
+    path_taken = [forward_point]
+    current_point = forward_point
+    while current_point != start_point:
+        current_point = forward_parents[current_point]
+        path_taken.append(current_point)
+    path_taken.reverse()
+
+    current_point = backward_point
+    if backward_point != forward_point:
+        path_taken.append(backward_point)
+    while current_point != goal_point:
+        current_point = backward_parents[current_point]
+        path_taken.append(current_point)
+
+    return path_taken
+
+
+if __name__ == '__main__':
+    # The path is only printed if a format is given on the command line
+    OPTIONS = solver_arguments()
+    MAZE_FILE_NAME = str(input(
+                    "Enter the file_name of the maze you would like solved: "))
+    maze_solver("../docs/mazes/" + MAZE_FILE_NAME,
+                path_format=OPTIONS.path_format)
@@ -0,0 +1,276 @@
+"""Faster versions of the A* and iterative depth first searches
+
+These give exactly the same paths and node counts as a_star_search() and
+iterative_dfs() (they expand the same nodes in the same order), but do far
+less work per node:
+    - cells are flat integer ids in a padded copy of the maze (see
+      MazeGrid.padded_cells()), so neighbours are found by adding
+      precomputed offsets, with no bounds checks and no tuples or lists
+      built per expansion
+    - the costs, parents and insertion orders are stored in arrays indexed by
+      cell id rather than in dictionaries keyed by coordinate
+    - whether a cell is unseen, in the frontier or visited is one byte per
+      cell, and the A* frontier is a plain heap with lazy deletion, so each
+      neighbour is looked up once instead of through in_queue() calls
+    - the Manhattan heuristic is worked out inline from the cell id
+
+The arrays are allocated up front for the whole maze (about 21 bytes per cell
+for A*), which is quicker than growing dictionaries but uses more memory on
+mazes where the search only touches a small area. The original functions are
+still the ones to use for the search statistics.
+
+Run 'python3 benchmark.py --solvers a_star flat_a_star iterative_dfs
+flat_dfs' to compare the speed of the two versions.
+"""
+import heapq
+import time
+from array import array
+from maze_grid import MazeGrid
+from maze_binary import load_maze_cached
+from maze_components import load_components_cached, search_if_reachable
+from heuristics import manhattan_distance, resolve_heuristic
+from a_star_search import DEFAULT_HEURISTIC_WEIGHT
+from iterative_depth_first_search import performance_statistics
+from maze_output import maze_output_to_file, solver_arguments
+
+# The states of a cell during the A* search
+UNSEEN = 0
+IN_FRONTIER = 1
+VISITED = 2
+
+
+def maze_solver(file_name: str, path_format: str = None,
+                search_function=None) -> None:
+    """ Solves a maze with one of the faster searches and prints out
+    statistics about the algorithm's performance when solving the maze,
+    including the number of nodes explored, the execution time and the
+    number of steps in the path.
+
+    Args:
+        file_name (str): The file name of the maze to be solved, provided as a
+            string so that it can be used to open the maze file directly.
+        path_format (str, optional): How to print the path taken, one of
+            maze_output.PATH_FORMATS, or None (the default) to skip printing
+            it.
+        search_function (callable, optional): The search to use, either
+            flat_a_star (the default) or flat_dfs.
+    """
+    if search_function is None:
+        search_function = flat_a_star
+
+    # Loads the maze (from the binary cache if it is fresh) into a flat grid
+    # along with its start and goal points
+    (maze_grid, start_point, goal_point) = load_maze_cached(file_name)
+    # Loads the maze's connected components (from the cache if they are
+    # fresh), so an unreachable goal is answered without searching
+    components = load_components_cached(file_name)
+
+    # Stores both the path taken and the number of nodes explored by the
+    # algorithm
+    start_time = time.time()
+    (maze_path_flat,
+     nodes_expanded) = search_if_reachable(components, search_function,
+                                           maze_grid, start_point, goal_point)
+    end_time = time.time()
+
+    # Prints out all the algorithm's performance statistics
+    performance_statistics((len(maze_path_flat) - 1
+                            if maze_path_flat is not None else None),
+                           nodes_expanded,
+                           round(end_time - start_time, 5),
+                           (maze_path_flat if path_format is not None
+                            else None),
+                           path_format
+                           )
+
+    # Outputs the algorithms path through the maze to the file maze_path.txt
+    maze_output_to_file(maze_grid, maze_path_flat)
+
+
+def flat_a_star(maze, start_point: tuple[int, int],
+                goal_point: tuple[int, int], heuristic="manhattan",
+                weight: float = DEFAULT_HEURISTIC_WEIGHT
+                ) -> tuple[list[(int, int)], int]:
+    """ Executes an A* search on the provided maze, expanding the same nodes
+    in the same order as a_star_search() with the same heuristic and weight.
+
+    Args:
+        maze (dict of (int, int): str or MazeGrid): The maze being solved,
+            either as a maze dictionary or as a MazeGrid.
+        start_point (tuple[int, int]): A coordinate (int, int) tuple indicating
+            when the algorithm starts when solving the maze.
+        goal_point (tuple[int, int]): A coordinate (int, int) tuple indicating
+            when the algorithm ends when solving the maze.
+        heuristic (str or callable, optional): The heuristic used to estimate
+            the distance to the goal, see heuristics.resolve_heuristic(). The
+            Manhattan distance is worked out inline, others are called.
+        weight (float, optional): The weight the heuristic is multiplied by.
+
+    Returns:
+        tuple[list[(int, int)], int]: (path_taken, nodes_expanded). A packaged
+            tuple containing the path through the maze (or None if the goal
+            can't be reached) along with the number of nodes expanded.
+    """
+    if not isinstance(maze, MazeGrid):
+        maze = MazeGrid.from_dictionary(maze)
+    heuristic_function = resolve_heuristic(heuristic)
+    inline_manhattan = heuristic_function is manhattan_distance
+
+    (padded, padded_width) = maze.padded_cells()
+    offsets = (-padded_width, 1, padded_width, -1)
+    cell_count = len(padded)
+    (goal_row, goal_column) = goal_point
+    # Cells are compared by id, with the goal's row counted from the padding
+    goal_padded_row = goal_row + 1
+    start = (start_point[0] + 1) * padded_width + start_point[1]
+    goal = goal_padded_row * padded_width + goal_column
+
+    state = bytearray(cell_count)
+    # g(x) of every reached cell, its f(x) in the frontier (which is only
+    # ever lowered), the cell it was reached from and its insertion order
+    node_cost = array('i', [0]) * cell_count
+    function_cost = array('d', [0.0]) * cell_count
+    parents = array('i', [0]) * cell_count
+    insertion_order = array('i', [0]) * cell_count
+
+    start_estimate = weight * heuristic_function(start_point, goal_point)
+    function_cost[start] = start_estimate
+    state[start] = IN_FRONTIER
+    # Heap entries are [f(x), -insertion order, cell], so the newest cell
+    # wins any ties, as in MazePriorityQueue
+    heap = [(start_estimate, 0, start)]
+    inserted = 1
+    nodes_expanded = 0
+    heappop = heapq.heappop
+    heappush = heapq.heappush
+
+    while heap:
+        (current_cost_function, _, current) = heappop(heap)
+        # Skips entries superseded by a lower cost
+        if (state[current] != IN_FRONTIER
+                or function_cost[current] != current_cost_function):
+            continue
+        state[current] = VISITED
+        nodes_expanded += 1
+
+        if current == goal:
+            return (_path_to(parents, start, goal, padded_width),
+                    nodes_expanded)
+
+        interimnode_cost = node_cost[current] + 1
+        for offset in offsets:
+            neighbour = current + offset
+            if not padded[neighbour]:
+                continue
+            neighbour_state = state[neighbour]
+            if neighbour_state == VISITED:
+                continue
+
+            # Finds the f(x) of the neighbouring node through the current node
+            (row, column) = divmod(neighbour, padded_width)
+            if inline_manhattan:
+                estimate = (abs(row - goal_padded_row)
+                            + abs(column - goal_column))
+            else:
+                estimate = heuristic_function((row - 1, column), goal_point)
+            neighbour_cost_function = weight * estimate + interimnode_cost
+
+            if neighbour_state == UNSEEN:
+                state[neighbour] = IN_FRONTIER
+                insertion_order[neighbour] = inserted
+                function_cost[neighbour] = neighbour_cost_function
+                heappush(heap, (neighbour_cost_function, -inserted,
+                                neighbour))
+                inserted += 1
+            elif interimnode_cost < node_cost[neighbour]:
+                # Only a lower f(x) is pushed, keeping the original insertion
+                # order, while the cheaper route is always recorded
+                if neighbour_cost_function < function_cost[neighbour]:
+                    function_cost[neighbour] = neighbour_cost_function
+                    heappush(heap, (neighbour_cost_function,
+                                    -insertion_order[neighbour], neighbour))
+            else:
+                continue
+
+            node_cost[neighbour] = interimnode_cost
+            parents[neighbour] = current
+
+    return (None, nodes_expanded)
+
+
+def flat_dfs(maze, start_point: tuple[int, int],
+             goal_point: tuple[int, int]) -> tuple[list[(int, int)], int]:
+    """ Executes an iterative depth first search on the provided maze,
+    expanding the same nodes in the same order as iterative_dfs().
+
+    Args:
+        maze (dict of (int, int): str or MazeGrid): The maze being solved,
+            either as a maze dictionary or as a MazeGrid.
+        start_point (tuple[int, int]): A coordinate (int, int) tuple indicating
+            when the algorithm starts when solving the maze.
+        goal_point (tuple[int, int]): A coordinate (int, int) tuple indicating
+            when the algorithm ends when solving the maze.
+
+    Returns:
+        tuple[list[(int, int)], int]: (path_taken, nodes_expanded). A packaged
+            tuple containing the path through the maze (or None if the goal
+            can't be reached) along with the number of nodes expanded.
+    """
+    if not isinstance(maze, MazeGrid):
+        maze = MazeGrid.from_dictionary(maze)
+
+    # Cells are walled off in the padded copy once they have been pushed, so
+    # it doubles as the visited set. As in iterative_dfs(), the start isn't
+    # marked until one of its neighbours pushes it again
+    (unvisited, padded_width) = maze.padded_cells()
+    (up, right, down, left) = (-padded_width, 1, padded_width, -1)
+    start = (start_point[0] + 1) * padded_width + start_point[1]
+    goal = (goal_point[0] + 1) * padded_width + goal_point[1]
+    parents = array('i', [0]) * len(unvisited)
+
+    dfs_stack = [start]
+    pop = dfs_stack.pop
+    push = dfs_stack.append
+    nodes_expanded = 0
+
+    while dfs_stack:
+        current = pop()
+        nodes_expanded += 1
+
+        if current == goal:
+            return (_path_to(parents, start, goal, padded_width),
+                    nodes_expanded)
+
+        # Pushes the open neighbours in up, right, down, left order, so they
+        # are searched in reverse
+        for neighbour in (current + up, current + right, current + down,
+                          current + left):
+            if unvisited[neighbour]:
+                unvisited[neighbour] = 0
+                push(neighbour)
+                parents[neighbour] = current
+
+    return (None, nodes_expanded)
+
+
+def _path_to(parents: array, start: int, goal: int,
+             padded_width: int) -> list[(int, int)]:
+    """ Follows the parents back from the goal to the start, converting the
+    padded cell ids back into (row, column) coordinates.
+    """
+    path_taken = [goal]
+    current = goal
+    while current != start:
+        current = parents[current]
+        path_taken.append(current)
+    path_taken.reverse()
+    return [(cell // padded_width - 1, cell % padded_width)
+            for cell in path_taken]
+
+
+if __name__ == '__main__':
+    # The path is only printed if a format is given on the command line
+    OPTIONS = solver_arguments()
+    MAZE_FILE_NAME = str(input(
+                    "Enter the file_name of the maze you would like solved: "))
+    maze_solver("../docs/mazes/" + MAZE_FILE_NAME, OPTIONS.path_format)
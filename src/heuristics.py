@@ -0,0 +1,140 @@
+"""Heuristics for the A* search, along with precomputed heuristic tables
+
+Every heuristic takes the current position and the goal point as (row,
+column) tuples and returns an estimate of the number of steps between them.
+All of the built in heuristics are admissible on a 4-connected maze (they
+never overestimate), so A* returns a shortest path with them as long as their
+weight is at most 1. With a weight w above 1 the path found is at most w
+times longer than the shortest path (bounded-suboptimal), in exchange for
+exploring fewer nodes.
+"""
+import math
+from array import array
+
+
+def manhattan_distance(current_position: tuple[int, int],
+                       goal_point: tuple[int, int]) -> float:
+    """ The number of steps between two points if there were no walls, the
+    sum of the row and column differences.
+    """
+    return (abs(current_position[0] - goal_point[0])
+            + abs(current_position[1] - goal_point[1]))
+
+
+def euclidean_distance(current_position: tuple[int, int],
+                       goal_point: tuple[int, int]) -> float:
+    """ The straight line distance between two points.
+    """
+    return math.hypot(current_position[0] - goal_point[0],
+                      current_position[1] - goal_point[1])
+
+
+def octile_distance(current_position: tuple[int, int],
+                    goal_point: tuple[int, int]) -> float:
+    """ The distance between two points if diagonal moves (costing root two)
+    were allowed.
+    """
+    d_x = abs(current_position[1] - goal_point[1])
+    d_y = abs(current_position[0] - goal_point[0])
+    return max(d_x, d_y) + (math.sqrt(2) - 1) * min(d_x, d_y)
+
+
+def zero_heuristic(current_position: tuple[int, int],
+                   goal_point: tuple[int, int]) -> float:
+    """ Always estimates zero, which turns A* into Dijkstra's algorithm.
+    """
+    return 0
+
+
+# The heuristics that can be selected by name
+HEURISTICS = {
+    "manhattan": manhattan_distance,
+    "euclidean": euclidean_distance,
+    "octile": octile_distance,
+    "zero": zero_heuristic,
+}
+# The heuristics that never overestimate the distance on a 4-connected maze
+ADMISSIBLE_HEURISTICS = frozenset(HEURISTICS.values())
+
+
+def resolve_heuristic(heuristic):
+    """ Finds the heuristic function for a heuristic name, or returns the
+    heuristic unchanged if it is already a function.
+
+    Args:
+        heuristic (str or callable): One of the names in HEURISTICS, or a
+            function taking (current_position, goal_point).
+
+    Raises:
+        ValueError: If the name isn't one of the built in heuristics.
+
+    Returns:
+        callable: (heuristic_function). The heuristic function.
+    """
+    if callable(heuristic):
+        return heuristic
+
+    try:
+        return HEURISTICS[heuristic]
+    except KeyError:
+        raise ValueError(f"Unknown heuristic {heuristic!r}, expected one of "
+                         f"{', '.join(HEURISTICS)}") from None
+
+
+def search_optimality(heuristic, weight: float) -> str:
+    """ Describes the quality of the path A* is guaranteed to return with a
+    heuristic and weight.
+
+    Args:
+        heuristic (str or callable): The heuristic used by the search.
+        weight (float): The weight the heuristic is multiplied by.
+
+    Returns:
+        str: (optimality). "optimal" for an admissible heuristic with a weight
+            of at most 1, "bounded-suboptimal (at most Wx optimal)" for an
+            admissible heuristic with a larger weight, and "unbounded" for a
+            custom heuristic whose admissibility isn't known.
+    """
+    if resolve_heuristic(heuristic) not in ADMISSIBLE_HEURISTICS:
+        return "unbounded"
+    if weight <= 1:
+        return "optimal"
+    return f"bounded-suboptimal (at most {weight:g}x optimal)"
+
+
+def heuristic_table(maze_grid, goal_point: tuple[int, int],
+                    heuristic="manhattan", weight: float = 1.0) -> array:
+    """ Precomputes the weighted heuristic for every cell of a maze, so the
+    search can look the value up by flat index (row * width + column)
+    instead of calling the heuristic function for every neighbour.
+
+    Args:
+        maze_grid (MazeGrid): The maze the table is for.
+        goal_point (tuple[int, int]): The goal the heuristic estimates the
+            distance to.
+        heuristic (str or callable, optional): The heuristic to tabulate.
+        weight (float, optional): The weight the heuristic is multiplied by.
+
+    Returns:
+        array: (table). An array of doubles holding the weighted heuristic
+            of each cell in row order.
+    """
+    heuristic_function = resolve_heuristic(heuristic)
+    (goal_row, goal_column) = goal_point
+    table = array('d')
+
+    if heuristic_function is manhattan_distance:
+        # Builds each row from the column distances, which are shared by
+        # every row, so only the row distance has to be added per row
+        column_distances = [abs(column - goal_column)
+                            for column in range(maze_grid.width)]
+        for row in range(maze_grid.height):
+            row_distance = abs(row - goal_row)
+            table.extend([weight * (row_distance + column_distance)
+                          for column_distance in column_distances])
+        return table
+
+    for row in range(maze_grid.height):
+        table.extend([weight * heuristic_function((row, column), goal_point)
+                      for column in range(maze_grid.width)])
+    return table
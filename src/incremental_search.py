@@ -0,0 +1,347 @@
+"""Incremental replanning for mazes that change between searches (D* Lite)
+
+When a few cells of a maze open or close, most of the previous search is
+still right, so searching again from nothing wastes nearly all of its work.
+An IncrementalPlanner keeps its search state between plans and, after a
+batch of cell flips, only reprocesses the nodes whose distance to the goal
+the flips actually changed.
+
+It is an implementation of D* Lite (Koenig and Likhachev, 2002), which
+searches backwards from the goal, so the start can also be moved (such as
+an agent walking along the path) without starting again. Every node keeps:
+    g(x)   - its distance to the goal as of the last time it was expanded
+    rhs(x) - one step more than the smallest g(x) of its open neighbours
+             (0 for the goal), along with the neighbour that gives it, which
+             is the node's parent towards the goal
+A node whose g(x) and rhs(x) differ is inconsistent and waits in the priority
+queue, keyed on [min(g, rhs) + h(x) + k_m, min(g, rhs)], where h(x) is the
+Manhattan distance to the start (see heuristic_calculator()) and k_m adds up
+how far the start has moved. Planning expands inconsistent nodes until the
+start is consistent, and the path is then read off the parents from the
+start to the goal.
+
+Example, solving maze-Large.txt, then closing and opening 10 random cells at a
+time for 5 rounds, comparing each replan with a full A* search:
+    python3 incremental_search.py ../docs/mazes/maze-Large.txt --rounds 5 \\
+        --flips 10
+"""
+import argparse
+import math
+import random
+import sys
+from priority_queue import MazePriorityQueue
+from maze_grid import MazeGrid
+from maze_binary import load_maze_cached
+from a_star_search import a_star_search, heuristic_calculator
+
+# The distance of a node that can't reach the goal (or hasn't been reached)
+INFINITY = math.inf
+
+
+class IncrementalPlanner():
+    """ A class that finds the shortest path between a start and a goal with
+    D* Lite, keeping its search state so that the path can be repaired after
+    cells of the maze are opened or closed (update_cells()) or the start is
+    moved (move_start()).
+
+    After each plan, nodes_expanded holds the number of nodes it expanded and
+    nodes_updated the number of nodes whose rhs(x) it (and the updates since
+    the previous plan) recomputed.
+    """
+    def __init__(self, maze, start_point: tuple[int, int],
+                 goal_point: tuple[int, int], heuristic="manhattan"):
+        """ Sets up a search that has only reached the goal. The maze is
+        copied, so the planner's changes never affect the original.
+
+        Args:
+            maze (dict of (int, int): str or MazeGrid): The maze being solved,
+                either as a maze dictionary or as a MazeGrid.
+            start_point (tuple[int, int]): A coordinate (int, int) tuple
+                indicating when the algorithm starts when solving the maze.
+            goal_point (tuple[int, int]): A coordinate (int, int) tuple
+                indicating when the algorithm ends when solving the maze.
+            heuristic (str or callable, optional): The heuristic used to
+                estimate the distance to the start, see
+                heuristic_calculator(). It must be consistent (as all of the
+                built in ones are), and is always given a weight of 1.
+        """
+        if not isinstance(maze, MazeGrid):
+            maze = MazeGrid.from_dictionary(maze)
+        self.maze_grid = MazeGrid(maze.width, maze.height,
+                                  bytearray(maze.cells))
+        self.start_point = start_point
+        self.goal_point = goal_point
+        self.heuristic = heuristic
+
+        # g(x) and rhs(x) of every node reached so far (INFINITY otherwise),
+        # along with the neighbour each node's rhs(x) came from
+        self.node_cost = {}
+        self.lookahead_cost = {}
+        self.parent_dict = {}
+        self.priority_queue = MazePriorityQueue()
+        # The sum of the heuristic distances the start has moved, which keeps
+        # the keys already in the queue valid lower bounds
+        self.key_modifier = 0
+        self.last_start = start_point
+
+        self.nodes_expanded = 0
+        self.nodes_updated = 0
+        self._updates = 0
+        self._update_node(goal_point)
+
+    def plan(self) -> tuple[list[(int, int)], int]:
+        """ Finds the shortest path from the start to the goal, reusing the
+        work of the previous plans.
+
+        Returns:
+            tuple[list[(int, int)], int]: (path_taken, nodes_expanded). The
+                shortest path through the maze (or None if the goal can't be
+                reached) along with the number of nodes expanded by this plan.
+        """
+        start_point = self.start_point
+        nodes_expanded = 0
+        reachable = (self._is_open(start_point)
+                     and self._is_open(self.goal_point))
+        if reachable:
+            nodes_expanded = self._compute_shortest_path()
+            reachable = (self.node_cost.get(start_point, INFINITY)
+                         != INFINITY)
+
+        self.nodes_expanded = nodes_expanded
+        self.nodes_updated = self._updates
+        self._updates = 0
+        if not reachable:
+            return (None, nodes_expanded)
+
+        # Follows the parents from the start to the goal. Every change to a
+        # node's g(x) recomputes its neighbours' parents, so they always
+        # point at the neighbour that is currently closest to the goal
+        path_taken = [start_point]
+        current_point = start_point
+        while current_point != self.goal_point:
+            current_point = self.parent_dict[current_point]
+            path_taken.append(current_point)
+        return (path_taken, nodes_expanded)
+
+    def update_cells(self, changes) -> int:
+        """ Opens or closes a batch of cells, updating the nodes around each
+        changed cell ready for the next plan.
+
+        Args:
+            changes (dict of (int, int): bool, or iterable of ((int, int),
+                bool)): Each cell's coordinate along with whether it should be
+                open (True) or a wall (False).
+
+        Raises:
+            ValueError: If a coordinate is outside of the maze.
+
+        Returns:
+            int: (changed). The number of cells that actually changed.
+        """
+        if isinstance(changes, dict):
+            changes = changes.items()
+
+        changed_points = []
+        for (point, is_open) in changes:
+            if point not in self.maze_grid:
+                raise ValueError(f"{point} is outside of the maze")
+            index = self.maze_grid.index(point)
+            value = MazeGrid.PATH if is_open else MazeGrid.WALL
+            if self.maze_grid.cells[index] != value:
+                self.maze_grid.cells[index] = value
+                changed_points.append(point)
+
+        # The moves into and out of each changed cell have changed cost, which
+        # affects the rhs(x) of the cell and of its open neighbours
+        for point in changed_points:
+            self._update_node(point)
+            for neighbour in self.maze_grid.open_neighbours(point):
+                self._update_node(neighbour)
+
+        return len(changed_points)
+
+    def move_start(self, start_point: tuple[int, int]) -> None:
+        """ Moves the start, such as to the next cell of the path once it has
+        been walked, without throwing the search away.
+
+        Args:
+            start_point (tuple[int, int]): The coordinate of the new start.
+        """
+        self.key_modifier += heuristic_calculator(
+            self.last_start, start_point, self.heuristic, weight=1)
+        self.last_start = start_point
+        self.start_point = start_point
+
+    def _compute_shortest_path(self) -> int:
+        """ Expands inconsistent nodes until the start is consistent and no
+        node in the queue could still improve its distance.
+
+        Returns:
+            int: (nodes_expanded). The number of nodes expanded.
+        """
+        node_cost = self.node_cost
+        lookahead_cost = self.lookahead_cost
+        priority_queue = self.priority_queue
+        start_point = self.start_point
+        nodes_expanded = 0
+
+        while not priority_queue.is_empty():
+            (current_point, old_key) = priority_queue.queue_peek()
+            start_cost = node_cost.get(start_point, INFINITY)
+            if (old_key >= self._calculate_key(start_point)
+                    and lookahead_cost.get(start_point, INFINITY)
+                    == start_cost):
+                break
+
+            priority_queue.queue_pop()
+            nodes_expanded += 1
+            new_key = self._calculate_key(current_point)
+            current_cost = node_cost.get(current_point, INFINITY)
+            current_lookahead = lookahead_cost.get(current_point, INFINITY)
+
+            if old_key < new_key:
+                # The start has moved since the node was queued, so it goes
+                # back in with its up to date key
+                priority_queue.insert((current_point, new_key))
+            elif current_cost > current_lookahead:
+                # The node got closer to the goal, which its neighbours can
+                # now make use of
+                node_cost[current_point] = current_lookahead
+                for neighbour in self._neighbours(current_point):
+                    self._update_node(neighbour)
+            else:
+                # The node got further from the goal, so it and its
+                # neighbours have to find their best route again
+                node_cost[current_point] = INFINITY
+                self._update_node(current_point)
+                for neighbour in self._neighbours(current_point):
+                    self._update_node(neighbour)
+
+        return nodes_expanded
+
+    def _update_node(self, point: tuple[int, int]) -> None:
+        """ Recomputes rhs(x) (and the parent) of a node from its open
+        neighbours, and queues the node if it is now inconsistent.
+        """
+        self._updates += 1
+        if point == self.goal_point:
+            best_cost = 0 if self._is_open(point) else INFINITY
+        else:
+            best_cost = INFINITY
+            # Takes the first of the cheapest neighbours, in up, right, down,
+            # left order
+            for neighbour in self._neighbours(point):
+                neighbour_cost = self.node_cost.get(neighbour, INFINITY) + 1
+                if neighbour_cost < best_cost:
+                    best_cost = neighbour_cost
+                    self.parent_dict[point] = neighbour
+            # A node that can't reach the goal has no parent
+            if best_cost == INFINITY:
+                self.parent_dict.pop(point, None)
+        self.lookahead_cost[point] = best_cost
+
+        if self.priority_queue.in_queue(point):
+            self.priority_queue.remove(point)
+        if self.node_cost.get(point, INFINITY) != best_cost:
+            self.priority_queue.insert((point, self._calculate_key(point)))
+
+    def _calculate_key(self, point: tuple[int, int]) -> tuple[float, float]:
+        """ Works out the priority of a node, [min(g, rhs) + h(x) + k_m,
+        min(g, rhs)], where lower keys are expanded first.
+        """
+        best_cost = min(self.node_cost.get(point, INFINITY),
+                        self.lookahead_cost.get(point, INFINITY))
+        return (best_cost + heuristic_calculator(point, self.start_point,
+                                                 self.heuristic, weight=1)
+                + self.key_modifier, best_cost)
+
+    def _neighbours(self, point: tuple[int, int]) -> list[(int, int)]:
+        """ Finds the open neighbours a node can move to, none if the node is
+        a wall.
+        """
+        if not self._is_open(point):
+            return []
+        return self.maze_grid.open_neighbours(point)
+
+    def _is_open(self, point: tuple[int, int]) -> bool:
+        """ Checks if a coordinate is an open cell of the maze.
+        """
+        return (point in self.maze_grid
+                and self.maze_grid.cells[self.maze_grid.index(point)]
+                == MazeGrid.PATH)
+
+
+def random_flips(maze_grid: MazeGrid, count: int, generator: random.Random,
+                 protected=()) -> dict:
+    """ Picks cells at random to flip between open and closed, keeping the
+    outer wall of the maze and any protected cells as they are.
+
+    Args:
+        maze_grid (MazeGrid): The maze to pick the cells from.
+        count (int): The number of cells to flip.
+        generator (random.Random): The source of randomness.
+        protected (iterable of (int, int), optional): Cells to leave alone,
+            such as the start and goal.
+
+    Returns:
+        dict of (int, int): bool: (changes). Each cell to flip along with
+            whether it should be open, see IncrementalPlanner.update_cells().
+    """
+    protected = set(protected)
+    changes = {}
+    while len(changes) < count:
+        point = (generator.randrange(1, maze_grid.height - 1),
+                 generator.randrange(1, maze_grid.width - 1))
+        if point not in protected:
+            changes[point] = maze_grid[point] == '#'
+    return changes
+
+
+def main(arguments: list[str] = None) -> int:
+    """ Solves a maze, then flips random cells for a number of rounds and
+    replans after each, printing how many nodes each replan touched compared
+    with a full A* search of the changed maze.
+
+    Returns:
+        int: (exit_code). 0 if every replan found a path as short as the full
+            search's, otherwise 1.
+    """
+    parser = argparse.ArgumentParser(
+        description="Replan a maze's shortest path as its cells change.")
+    parser.add_argument("maze", help="maze file to solve")
+    parser.add_argument("-r", "--rounds", type=int, default=5,
+                        help="rounds of changes to make (default: 5)")
+    parser.add_argument("-f", "--flips", type=int, default=10,
+                        help="cells flipped in each round (default: 10)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="random seed for the flips (default: 0)")
+    options = parser.parse_args(arguments)
+
+    (maze_grid, start_point, goal_point) = load_maze_cached(options.maze)
+    planner = IncrementalPlanner(maze_grid, start_point, goal_point)
+    generator = random.Random(options.seed)
+    mismatches = 0
+
+    print(f"{'round':>5} {'steps':>6} {'expanded':>9} {'updated':>8} "
+          f"{'a_star':>8}")
+    for round_number in range(options.rounds + 1):
+        if round_number:
+            planner.update_cells(random_flips(planner.maze_grid,
+                                              options.flips, generator,
+                                              (start_point, goal_point)))
+        (path_taken, nodes_expanded) = planner.plan()
+        # The full search on the changed maze, for comparison
+        (full_path, full_nodes_expanded) = a_star_search(
+            planner.maze_grid, start_point, goal_point, weight=1)
+
+        steps = len(path_taken) - 1 if path_taken is not None else None
+        full_steps = len(full_path) - 1 if full_path is not None else None
+        mismatches += steps != full_steps
+        print(f"{round_number:>5} {str(steps):>6} {nodes_expanded:>9} "
+              f"{planner.nodes_updated:>8} {full_nodes_expanded:>8}")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,17 @@
 """ Solves a maze using an iterative depth first search algorithm """
+import sys
 import time
+from maze_grid import open_neighbours
+from maze_binary import load_maze_cached
+from maze_components import load_components_cached, search_if_reachable
+from maze_output import maze_output_to_file, solver_arguments, write_path
+from search_statistics import InstrumentedStack, SearchStatistics
+from search_statistics import tracking_memory
+from search_progress import SearchProgress, run_to_completion
 
 
-def maze_solver(file_name: str) -> None:
+def maze_solver(file_name: str, path_format: str = None,
+                collect_statistics: bool = False) -> None:
     """ Uses the depth first search algorithm to solve a maze and prints out
     statistics about the algorithm's performance solving the maze, incl the
     number of nodes explored, the execution time and the number of steps in
@@ -10,104 +19,130 @@ def maze_solver(file_name: str) -> None:
 
     Args:
         file_name (str): The file name of the maze to be solved, provided as a
-            string so that it can be used to open the maze file directly, with
-            no error checking required.
+            string so that it can be used to open the maze file directly.
+        path_format (str, optional): How to print the path taken, one of
+            maze_output.PATH_FORMATS, or None (the default) to skip printing
+            it.
+        collect_statistics (bool, optional): Whether to collect and print
+            the search statistics (see search_statistics.SearchStatistics),
+            including the peak memory used, which slows the search down.
     """
-    # Track the column and row number of a given position
-    row = 0
-    column = 0
-    # Stores the maze and maps each position to a wall/path value.
-    maze_dictionary = {}
-
-    # Opens the desired maze file and stores its contents in a string
-    with open(file_name, "r", encoding="utf-8") as file_pointer:
-        maze_string = file_pointer.readlines()
-
-    # Getting the coordinates of the starting node
-    start_point = (0, int(maze_string[0].index('-')/2))
-
-    # Iterates through each character on each line in the provided text file
-    for line in maze_string:
-        num_dashes = line.count('-')
-        # The goal node is the only node in the final row whose value is '-'
-        if num_dashes == 1 and row > 0:
-            # Removes the spaces from the line (is always a multiple of two)
-            # And gets the index of the end node
-            goal_point = (row, int(line.index('-')/2))
-
-        for position in line:
-            # Only storing values if they are a path or a wall
-            if position in '#' or position in '-':
-                maze_dictionary[(row, column)] = position
-                column += 1
-
-        # Moves down to the start of the next row
-        column = 0
-        row += 1
+    # Loads the maze (from the binary cache if it is fresh) into a flat grid
+    # along with its start and goal points
+    (maze_grid, start_point, goal_point) = load_maze_cached(file_name)
+    # Loads the maze's connected components (from the cache if they are
+    # fresh), so an unreachable goal is answered without searching
+    components = load_components_cached(file_name)
 
     # Stores the path taken through the maze, along with the number of nodes
     # Explored by the algorithm
+    statistics = SearchStatistics() if collect_statistics else None
     start_time = time.time()
-    (maze_path_iterative_dfs, nodes_expanded) = iterative_dfs(maze_dictionary,
-                                                              start_point,
-                                                              goal_point
-                                                              )
+    with tracking_memory(statistics):
+        (maze_path_iterative_dfs,
+         nodes_expanded) = search_if_reachable(components, iterative_dfs,
+                                               maze_grid, start_point,
+                                               goal_point,
+                                               statistics=statistics)
     end_time = time.time()
 
-    # Converts the path taken into a more readable string, with arrows between
-    # the points
-    maze_path_string = ''
-    for item in maze_path_iterative_dfs:
-        if item == goal_point:
-            maze_path_string += str(goal_point)
-        else:
-            maze_path_string += str(item) + " -> "
-
     # Prints out all the algorithm's performance statistics
     # Finds the difference between the time at the start and end of the search
     # and rounds it to five decimal places
-    performance_statistics(len(maze_path_iterative_dfs),
+    performance_statistics((len(maze_path_iterative_dfs) - 1
+                            if maze_path_iterative_dfs is not None else None),
                            nodes_expanded,
                            round(end_time - start_time, 5),
-                           maze_path_string
+                           (maze_path_iterative_dfs if path_format is not None
+                            else None),
+                           path_format,
+                           statistics
                            )
 
-    # Outputs the algorithms path through the maze to the file mazePath.txt
-    maze_output_to_file(maze_dictionary, file_name, maze_path_iterative_dfs)
+    # Outputs the algorithms path through the maze to the file maze_path.txt
+    maze_output_to_file(maze_grid, maze_path_iterative_dfs)
 
 
 def iterative_dfs(maze_dictionary: dict,
                   start_point: tuple[int, int],
-                  goal_point: tuple[int, int]
+                  goal_point: tuple[int, int],
+                  statistics: SearchStatistics = None
                   ) -> tuple[list[(int, int)], int]:
     """ Executes an iterative depth first search on the provided maze and
     returns the path taken by the algorithm from the start to the goal node.
 
     Args:
-        maze_dictionary (dict of (int, int): str): A mapping of each coordinate
-            in the maze to a string representation of a wall or path. This
-            simplifies the representation and makes accessing parts of the
-            maze more efficient.
+        maze_dictionary (dict of (int, int): str or MazeGrid): A mapping of
+            each coordinate in the maze to a string representation of a wall
+            or path, or a MazeGrid holding the same maze as a flat array of
+            cells (which uses far less memory on large mazes).
         start_point (tuple[int, int]): A coordinate (int, int) tuple indicating
             when the algorithm starts when solving the maze.
         goal_point (tuple[int, int]): A coordinate (int, int) tuple indicating
             when the algorithm ends when solving the maze.
+        statistics (SearchStatistics, optional): If provided, the search
+            records the largest size of the stack, the size of the visited
+            set and the number of neighbours checked into it.
 
     Returns:
         tuple[list[(int, int)], int]: (path_taken, nodes_expanded). A packaged
             tuple containing the number of nodes visited by the algorithm
             along with the path it took through the maze, as represented by
-            a list of coordinates ((int, int) tuples). Doing this allows for
-            multiple values to be returned in one go and simplifies the data
-            collection process.
+            a list of coordinates ((int, int) tuples), or None if the goal
+            can't be reached. Doing this allows for multiple values to be
+            returned in one go and simplifies the data collection process.
+    """
+    return run_to_completion(iterative_dfs_steps(
+        maze_dictionary, start_point, goal_point, statistics, batch_size=0))
+
+
+def iterative_dfs_steps(maze_dictionary: dict,
+                        start_point: tuple[int, int],
+                        goal_point: tuple[int, int],
+                        statistics: SearchStatistics = None,
+                        batch_size: int = 1):
+    """ Executes an iterative depth first search on the provided maze one
+    step at a time, as a generator that yields its progress after every
+    batch of expansions, so the caller can watch the search or stop it part
+    way (see search_progress.run_with_budget()). iterative_dfs() runs it to
+    the end.
+
+    Args:
+        maze_dictionary (dict of (int, int): str or MazeGrid): The maze being
+            solved, see iterative_dfs().
+        start_point (tuple[int, int]): A coordinate (int, int) tuple indicating
+            when the algorithm starts when solving the maze.
+        goal_point (tuple[int, int]): A coordinate (int, int) tuple indicating
+            when the algorithm ends when solving the maze.
+        statistics (SearchStatistics, optional): See iterative_dfs().
+        batch_size (int, optional): The number of expansions between each
+            yield, 0 to never yield.
+
+    Yields:
+        SearchProgress: (progress). A snapshot of the search after the last
+            expansion of each batch.
+
+    Returns:
+        tuple[list[(int, int)], int]: (path_taken, nodes_expanded). The result
+            of the search, as the value of the StopIteration raised when the
+            generator finishes.
     """
     nodes_expanded = 0
+    # The number of expansions at which the progress is next yielded
+    next_progress = batch_size if batch_size > 0 else -1
     path_taken = []
     visited_nodes = set()
     # Stores the parent of each node as a dictionary
     parent_dict = {}
-    # Initialises the stack to be used by the algorithm
-    dfs_stack = [start_point]
+    # Initialises the stack to be used by the algorithm, swapping in the
+    # instrumented stack and neighbour function when the statistics are
+    # being collected, so the search loop itself is unchanged
+    if statistics is None:
+        dfs_stack = [start_point]
+        neighbours = open_neighbours
+    else:
+        dfs_stack = InstrumentedStack(statistics, [start_point])
+        neighbours = statistics.counting_neighbours(open_neighbours)
 
     # While there are still nodes to explore, search through the maze
     while len(dfs_stack) > 0:
@@ -125,101 +160,82 @@ def iterative_dfs(maze_dictionary: dict,
                 (current_row, current_column) = parent_dict[(current_row,
                                                              current_column)]
 
+            if statistics is not None:
+                statistics.visited_nodes = len(visited_nodes)
             # Returns the path taken (Reversed as moving from goal to start)
             return (list(reversed(path_taken)), nodes_expanded)
 
-        # Calculates each potential neighbouring node
+        # Finds each neighbouring node that is a valid path
         # As a stack is being used, the nodes need to be added in the reverse
         # order to which they are to be searched
-        next_nodes = [
-            (current_row - 1, current_column),  # Up
-            (current_row, current_column + 1),  # Right
-            (current_row + 1, current_column),  # Down
-            (current_row, current_column - 1)   # Left
-        ]
-
-        for (row, column) in next_nodes:
-            # Only explores the next node if it is a valid path
-            if row >= 0 and column >= 0 and maze_dictionary[(row,
-                                                            column)] == '-':
-                if (row, column) not in visited_nodes:
-                    visited_nodes.add((row, column))
-                    dfs_stack.append((row, column))
-                    parent_dict[(row, column)] = (current_row, current_column)
-
-    # If the stack is empty, return the path so far
-    return path_taken
+        for (row, column) in neighbours(maze_dictionary,
+                                        (current_row, current_column)):
+            if (row, column) not in visited_nodes:
+                visited_nodes.add((row, column))
+                dfs_stack.append((row, column))
+                parent_dict[(row, column)] = (current_row, current_column)
+
+        # Hands control back to the caller after every batch of expansions
+        if nodes_expanded == next_progress:
+            next_progress += batch_size
+            yield SearchProgress((current_row, current_column),
+                                 nodes_expanded, len(dfs_stack),
+                                 len(visited_nodes), statistics)
+
+    # If the whole maze is explored and the goal node isn't found
+    # return an empty path
+    if statistics is not None:
+        statistics.visited_nodes = len(visited_nodes)
+    return (None, nodes_expanded)
 
 
 def performance_statistics(num_steps: int, num_nodes: int, time_taken: float,
-                           full_path: str) -> None:
+                           full_path: list[(int, int)] = None,
+                           path_format: str = "arrows",
+                           statistics: SearchStatistics = None) -> None:
     """ Outputs the performance statistics for a given algorithm, including
     the number of steps the algorithm takes, the number of nodes it explores,
-    the time it takes to execute and the full path from start to finish.
+    the time it takes to execute and (if provided) the full path from start to
+    finish.
 
     Args:
-        num_steps (int): The total number of steps the algorithm takes to solve
-            the maze, provided as an int for convenience.
+        num_steps (int): The number of steps (moves between cells) in the
+            path the algorithm found, one less than the number of cells in
+            it, or None if no path was found.
         num_nodes (int): The total number of nodes the algorithm visited whilst
             solving the maze, provided as an int for convenience.
         time_taken (float): The time taken by the algorithm to solve the maze,
             provided as a float (most applicable) and rounded to five decimal
             places for readability.
-        full_path (str): A string representation of path the algorithm took
-            through the maze, done to improve readability and improve error
-            checking.
+        full_path (list[(int, int)], optional): The path the algorithm took
+            through the maze, which is streamed to the output in the path
+            format. The path isn't printed if it isn't provided, as printing
+            a long path can take longer than finding it.
+        path_format (str, optional): How the path is printed, one of
+            maze_output.PATH_FORMATS.
+        statistics (SearchStatistics, optional): Any further statistics
+            collected during the search, printed after the others.
     """
-    print("The full path taken by the algorithm is:         \n" + full_path)
-    print("The number of steps in the path taken:             ", num_steps)
+    if full_path is not None:
+        print("The full path taken by the algorithm is:         ")
+        write_path(full_path, sys.stdout, path_format)
+    if num_steps is None:
+        print("No path from the start to the goal was found")
+    else:
+        print("The number of steps in the path taken:             ",
+              num_steps)
     print("The number of nodes explored by the algorithm was: ", num_nodes)
     print("The time taken to solve the maze was:              ", time_taken,
           " seconds")
-
-
-def maze_output_to_file(maze_dictionary: dict, file_name: str,
-                        path_taken: list[(int, int)]) -> None:
-    """ Outputs the path the algorithm took through the maze to a text file,
-    named mazePath.txt, where the path is indicated with X's over the normal
-    maze file.
-
-    Args:
-        maze_dictionary (dict of (int, int): str): A mapping of each coordinate
-            in the maze to a string representation of a wall or path. This
-            simplifies the representation and makes accessing parts of the
-            maze more efficient.
-        file_name (str): The file name of the maze that's been solved, provided
-            as a string so that it can be used to open the maze file directly,
-            with no error checking required.
-        path_taken (list[(int, int)])): A list of the coordinates (tuple of int
-            for convenience) that the algorithm passed through when solving
-            the maze.
-    """
-    # Opens the file, reads its contents to a string and closes it
-    with open(file_name, "r", encoding="utf-8") as maze_file:
-        maze_string = maze_file.readlines()
-
-    # Finds the total number of columns in the maze (excl spaces)
-    num_columns = int(len(maze_string[0])/2) - 1
-    maze_string_with_path = ""
-
-    # Overwrite any coordinates that are in the dictionary and path taken and
-    # set their value to X
-    for (row, column) in path_taken:
-        maze_dictionary[(row, column)] = "X"
-
-    # Rewrites the maze as a string from the altered dictionary
-    for (row, column) in maze_dictionary:
-        maze_string_with_path += " " + maze_dictionary[(row, column)]
-
-        if column == num_columns:
-            maze_string_with_path += "\n"
-
-    # Writes the string to the file mazePath.txt
-    with open("maze_path.txt", "w", encoding="utf-8") as file_pointer:
-        file_pointer.writelines(maze_string_with_path)
+    if statistics is not None:
+        print(statistics)
 
 
 if __name__ == '__main__':
+    # The path and statistics are only printed if asked for on the command
+    # line
+    OPTIONS = solver_arguments(statistics=True)
     MAZE_FILE_NAME = str(input(
         "Enter the file_name of the maze you would like solved: "))
-    maze_solver("../docs/mazes/" + MAZE_FILE_NAME)
+    maze_solver("../docs/mazes/" + MAZE_FILE_NAME, OPTIONS.path_format,
+                OPTIONS.statistics)
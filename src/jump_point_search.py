@@ -0,0 +1,309 @@
+"""Solves a maze using Jump Point Search (for 4-connected grids)
+
+Jump Point Search is A* with most of the nodes along straight runs removed.
+Instead of adding every neighbour to the frontier, the search "jumps" along
+each direction until it reaches a cell where the route could usefully turn
+(a jump point), and only those cells are added to the frontier. On a
+4-connected grid the jumps work as follows:
+    - A horizontal jump stops at the goal, or at a cell with an open cell
+      above or below it where the cell it came from had a wall (a forced
+      neighbour).
+    - A vertical jump stops at the goal, at a cell with a forced neighbour to
+      its left or right, or at a cell from which a horizontal jump would find
+      a jump point.
+"""
+import time
+from priority_queue import MazePriorityQueue
+from search_statistics import InstrumentedPriorityQueue, SearchStatistics
+from search_statistics import tracking_memory
+from maze_grid import MazeGrid
+from maze_binary import load_maze_cached
+from maze_components import load_components_cached, search_if_reachable
+from a_star_search import DEFAULT_HEURISTIC_WEIGHT
+from heuristics import resolve_heuristic, search_optimality
+from iterative_depth_first_search import performance_statistics
+from maze_output import maze_output_to_file, solver_arguments
+
+# The (row, column) steps for up, right, down and left
+DIRECTIONS = ((-1, 0), (0, 1), (1, 0), (0, -1))
+
+
+def maze_solver(file_name: str, path_format: str = None,
+                collect_statistics: bool = False, heuristic="manhattan",
+                weight: float = DEFAULT_HEURISTIC_WEIGHT) -> None:
+    """ Uses Jump Point Search to solve a maze and prints out statistics about
+    the algorithm's performance when solving the maze, including the number
+    of nodes explored, the execution time and the number of steps in the
+    path.
+
+    Args:
+        file_name (str): The file name of the maze to be solved, provided as a
+            string so that it can be used to open the maze file directly.
+        path_format (str, optional): How to print the path taken, one of
+            maze_output.PATH_FORMATS, or None (the default) to skip printing
+            it.
+        collect_statistics (bool, optional): Whether to collect and print
+            the search statistics (see search_statistics.SearchStatistics),
+            including the number of jump points found and cells scanned.
+        heuristic (str or callable, optional): The heuristic used to estimate
+            the distance to the goal, see heuristics.py.
+        weight (float, optional): The weight the heuristic is multiplied by.
+    """
+    # Loads the maze (from the binary cache if it is fresh) into a flat grid
+    # along with its start and goal points
+    (maze_grid, start_point, goal_point) = load_maze_cached(file_name)
+    # Loads the maze's connected components (from the cache if they are
+    # fresh), so an unreachable goal is answered without searching
+    components = load_components_cached(file_name)
+
+    statistics = SearchStatistics() if collect_statistics else None
+
+    # Stores both the path taken and the number of nodes explored by the
+    # algorithm
+    start_time = time.time()
+    with tracking_memory(statistics):
+        (maze_path_jps,
+         nodes_expanded) = search_if_reachable(components, jump_point_search,
+                                               maze_grid, start_point,
+                                               goal_point,
+                                               heuristic=heuristic,
+                                               weight=weight,
+                                               statistics=statistics)
+    end_time = time.time()
+
+    # Prints out all the algorithm's performance statistics
+    performance_statistics((len(maze_path_jps) - 1
+                            if maze_path_jps is not None else None),
+                           nodes_expanded,
+                           round(end_time - start_time, 5),
+                           (maze_path_jps if path_format is not None
+                            else None),
+                           path_format,
+                           statistics
+                           )
+
+    # Describes how close to the shortest path the path found is guaranteed
+    # to be, with the heuristic and weight that were actually used
+    if maze_path_jps is not None:
+        print("The path found by the algorithm is:                ",
+              search_optimality(heuristic, weight))
+
+    # Outputs the algorithms path through the maze to the file maze_path.txt
+    maze_output_to_file(maze_grid, maze_path_jps)
+
+
+def jump_point_search(maze_dictionary, start_point: tuple[int, int],
+                      goal_point: tuple[int, int], heuristic="manhattan",
+                      weight: float = DEFAULT_HEURISTIC_WEIGHT,
+                      statistics: SearchStatistics = None
+                      ) -> tuple[list[(int, int)], int]:
+    """ Executes a Jump Point Search on the provided maze and returns the path
+    taken by the algorithm from the start to the goal node (every cell on it,
+    not just the jump points), along with the number of nodes that have been
+    expanded by the algorithm.
+
+    Args:
+        maze_dictionary (dict of (int, int): str or MazeGrid): The maze being
+            solved, either as a maze dictionary or as a MazeGrid.
+        start_point (tuple[int, int]): A coordinate (int, int) tuple indicating
+            when the algorithm starts when solving the maze.
+        goal_point (tuple[int, int]): A coordinate (int, int) tuple indicating
+            when the algorithm ends when solving the maze.
+        heuristic (str or callable, optional): The heuristic used to estimate
+            the distance to the goal, see heuristics.py.
+        weight (float, optional): The weight the heuristic is multiplied by.
+            With an admissible heuristic and a weight of 1 the path found is
+            a shortest path, see heuristics.search_optimality().
+        statistics (SearchStatistics, optional): If provided, the search
+            records the largest size of the frontier, the size of the visited
+            set, the number of distinct jump points added to the frontier
+            and the number of cells looked at while jumping, so the search
+            can be compared with plain A*.
+
+    Returns:
+        tuple[list[(int, int)], int]: (path_taken, nodes_expanded). A packaged
+            tuple containing the full path through the maze (or None if the
+            goal can't be reached) along with the number of jump points that
+            were expanded.
+    """
+    if not isinstance(maze_dictionary, MazeGrid):
+        maze_dictionary = MazeGrid.from_dictionary(maze_dictionary)
+    jumper = _Jumper(maze_dictionary, goal_point)
+    heuristic_function = resolve_heuristic(heuristic)
+
+    nodes_expanded = 0
+    # The instrumented queue is only used when statistics are being collected
+    frontier = (MazePriorityQueue() if statistics is None
+                else InstrumentedPriorityQueue(statistics))
+    frontier.insert((start_point,
+                     weight * heuristic_function(start_point, goal_point)))
+    visited_nodes = set()
+    # Stores the parent of each jump point, the cost from the start to it and
+    # the direction it was reached in
+    parent_dict = {}
+    node_cost = {start_point: 0}
+    arrival_direction = {start_point: None}
+    path_taken = None
+
+    while frontier.is_empty() is False:
+        (current_point, _) = frontier.queue_pop()
+        nodes_expanded += 1
+
+        if current_point == goal_point:
+            path_taken = _expand_path(parent_dict, start_point, goal_point)
+            break
+
+        visited_nodes.add(current_point)
+
+        for direction in _pruned_directions(arrival_direction[current_point]):
+            jump_point = jumper.jump(current_point, direction)
+            if jump_point is None or jump_point in visited_nodes:
+                continue
+
+            # Jumps are straight lines, so their length is the distance
+            # between the two points
+            interimnode_cost = (node_cost[current_point]
+                                + abs(jump_point[0] - current_point[0])
+                                + abs(jump_point[1] - current_point[1]))
+            function_cost = (weight * heuristic_function(jump_point,
+                                                         goal_point)
+                             + interimnode_cost)
+
+            if frontier.in_queue(jump_point) is False:
+                frontier.insert((jump_point, function_cost))
+            elif interimnode_cost < node_cost[jump_point]:
+                frontier.change_node_cost((jump_point, function_cost))
+            else:
+                continue
+
+            node_cost[jump_point] = interimnode_cost
+            parent_dict[jump_point] = current_point
+            arrival_direction[jump_point] = direction
+
+    if statistics is not None:
+        statistics.visited_nodes = len(visited_nodes)
+        # Every jump point that made it into the frontier has a cost
+        statistics.jump_points = len(node_cost) - 1
+        statistics.cells_scanned = jumper.cells_scanned
+
+    return (path_taken, nodes_expanded)
+
+
+class _Jumper():
+    """ Performs the jumps for a single search, keeping track of the number of
+    cells that have been scanned.
+    """
+    def __init__(self, maze_grid: MazeGrid, goal_point: tuple[int, int]):
+        self.cells = maze_grid.cells
+        self.width = maze_grid.width
+        self.height = maze_grid.height
+        self.goal_point = goal_point
+        self.cells_scanned = 0
+
+    def is_path(self, row: int, column: int) -> bool:
+        """ Checks if a coordinate is inside the maze and is a path.
+        """
+        return (0 <= row < self.height and 0 <= column < self.width
+                and self.cells[row * self.width + column] == MazeGrid.PATH)
+
+    def jump(self, point: tuple[int, int],
+             direction: tuple[int, int]) -> tuple[int, int]:
+        """ Jumps from a point in the given direction, returning the jump
+        point that is reached, or None if the jump runs into a wall first.
+        """
+        (row, column) = point
+        (row_step, column_step) = direction
+        if row_step == 0:
+            return self.jump_horizontally(row, column, column_step)
+        return self.jump_vertically(row, column, row_step)
+
+    def jump_horizontally(self, row: int, column: int,
+                          column_step: int) -> tuple[int, int]:
+        """ Jumps along a row, see the module docstring for where it stops.
+        """
+        is_path = self.is_path
+        while True:
+            column += column_step
+            self.cells_scanned += 1
+            if not is_path(row, column):
+                return None
+            if (row, column) == self.goal_point:
+                return (row, column)
+
+            # Forced neighbour above or below
+            if ((is_path(row - 1, column)
+                 and not is_path(row - 1, column - column_step))
+                    or (is_path(row + 1, column)
+                        and not is_path(row + 1, column - column_step))):
+                return (row, column)
+
+    def jump_vertically(self, row: int, column: int,
+                        row_step: int) -> tuple[int, int]:
+        """ Jumps along a column, see the module docstring for where it stops.
+        """
+        is_path = self.is_path
+        while True:
+            row += row_step
+            self.cells_scanned += 1
+            if not is_path(row, column):
+                return None
+            if (row, column) == self.goal_point:
+                return (row, column)
+
+            # Forced neighbour to the left or right
+            if ((is_path(row, column - 1)
+                 and not is_path(row - row_step, column - 1))
+                    or (is_path(row, column + 1)
+                        and not is_path(row - row_step, column + 1))):
+                return (row, column)
+
+            # A jump point that can be reached by turning here
+            if (self.jump_horizontally(row, column, -1) is not None
+                    or self.jump_horizontally(row, column, 1) is not None):
+                return (row, column)
+
+
+def _pruned_directions(arrival_direction: tuple[int, int]
+                       ) -> list[(int, int)]:
+    """ Finds the directions to jump in from a jump point. The start point
+    jumps in every direction, and any other jump point jumps in every
+    direction other than straight back the way it came.
+    """
+    if arrival_direction is None:
+        return list(DIRECTIONS)
+
+    backwards = (-arrival_direction[0], -arrival_direction[1])
+    return [direction for direction in DIRECTIONS if direction != backwards]
+
+
+def _expand_path(parent_dict: dict, start_point: tuple[int, int],
+                 goal_point: tuple[int, int]) -> list[(int, int)]:
+    """ Backtracks from the goal to the start through the jump points, filling
+    in every cell of the straight line between each pair of jump points.
+    """
+    path_taken = [goal_point]
+    current_point = goal_point
+
+    while current_point != start_point:
+        parent_point = parent_dict[current_point]
+        # Steps one cell at a time from the current jump point to its parent
+        row_step = (parent_point[0] > current_point[0]) - (
+            parent_point[0] < current_point[0])
+        column_step = (parent_point[1] > current_point[1]) - (
+            parent_point[1] < current_point[1])
+        while current_point != parent_point:
+            current_point = (current_point[0] + row_step,
+                             current_point[1] + column_step)
+            path_taken.append(current_point)
+
+    return list(reversed(path_taken))
+
+
+if __name__ == '__main__':
+    # The path and statistics are only printed if asked for on the command
+    # line
+    OPTIONS = solver_arguments(statistics=True)
+    MAZE_FILE_NAME = str(input(
+                    "Enter the file_name of the maze you would like solved: "))
+    maze_solver("../docs/mazes/" + MAZE_FILE_NAME, OPTIONS.path_format,
+                OPTIONS.statistics)
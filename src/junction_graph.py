@@ -0,0 +1,728 @@
+"""Solves a maze by searching a graph of its junctions instead of its cells
+
+Most of the open cells in a maze are corridor cells with exactly two open
+neighbours, where a search has no choice to make. The maze is compressed into
+a weighted graph whose nodes are the junctions (three or four open
+neighbours) and the dead ends (one), and whose edges are the corridors between
+them, weighted by the number of steps along them. The cells of each corridor
+are kept so that a path through the graph can be expanded back into the cell
+by cell path the rest of the project uses.
+
+A start or goal in the middle of a corridor is joined onto the graph for each
+search by splitting that corridor's edge in two at it, so the same graph
+answers queries between any cells of the maze.
+
+The graph only depends on the maze, so it is cached on disk next to the binary
+copy of the maze (see maze_binary.py) and reused until the maze file changes,
+and kept in memory for each maze it has been built for. A cached graph file is
+a fixed size header followed by arrays of the node indices, edge endpoints,
+corridor offsets and corridor cells, all as flat (row * width + column)
+indices.
+"""
+import os
+import struct
+import time
+import weakref
+from array import array
+from collections import ChainMap
+from priority_queue import MazePriorityQueue
+from maze_grid import MazeGrid
+from maze_io import MazeFormatError
+from maze_binary import cache_path, load_maze_cached
+from maze_components import load_components_cached, search_if_reachable
+from heuristics import resolve_heuristic
+from a_star_search import DEFAULT_HEURISTIC_WEIGHT
+from iterative_depth_first_search import performance_statistics
+from maze_output import maze_output_to_file, solver_arguments
+
+MAGIC = b'MAZJ'
+VERSION = 2
+# Magic, version, padding, width, height, the modification time and size of
+# the maze text file, the number of nodes and the number of edges
+HEADER = struct.Struct('<4sHH2I4Q')
+# File extension used for cached junction graphs
+EXTENSION = '.mazj'
+
+# The graph of each maze grid searched in this process, dropped along with
+# the grid
+_GRAPHS = weakref.WeakKeyDictionary()
+
+
+class JunctionGraph():
+    """ A class that stores a maze compressed into a weighted graph of its
+    junctions and dead ends. Edge i joins the cells edge_from[i] and
+    edge_to[i] (flat indices) through the corridor cells
+    corridor_cells[edge_offsets[i]:edge_offsets[i + 1]], listed in order from
+    edge_from[i], and its weight is the number of steps along it.
+
+    The adjacency dictionary maps each node's (row, column) coordinate to a
+    list of (neighbour, weight, edge) tuples, so the graph can be searched in
+    the same way as the maze itself.
+    """
+    def __init__(self, width: int, height: int, nodes: array,
+                 edge_from: array, edge_to: array, edge_offsets: array,
+                 corridor_cells: array):
+        """ A basic constructor that stores the arrays making up the graph and
+        builds the adjacency dictionary from them.
+
+        Args:
+            width (int): The number of columns in the maze.
+            height (int): The number of rows in the maze.
+            nodes (array): The flat index of every node.
+            edge_from (array): The flat index of the first end of each edge.
+            edge_to (array): The flat index of the other end of each edge.
+            edge_offsets (array): Where each edge's corridor cells start in
+                corridor_cells, with one extra entry at the end.
+            corridor_cells (array): The flat indices of the corridor cells of
+                every edge, one edge after another.
+        """
+        self.width = width
+        self.height = height
+        self.nodes = nodes
+        self.edge_from = edge_from
+        self.edge_to = edge_to
+        self.edge_offsets = edge_offsets
+        self.corridor_cells = corridor_cells
+
+        # Each node's coordinate is only worked out once, as the same nodes
+        # are the ends of many edges
+        node_points = {node: divmod(node, width) for node in nodes}
+        self.adjacency = {point: [] for point in node_points.values()}
+        for (edge, first, second, start, end) in zip(
+                range(len(edge_from)), edge_from, edge_to, edge_offsets,
+                edge_offsets[1:]):
+            (first, second) = (node_points[first], node_points[second])
+            self.adjacency[first].append((second, end - start + 1, edge))
+            self.adjacency[second].append((first, end - start + 1, edge))
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def edge_count(self) -> int:
+        """ Finds the number of edges (corridors) in the graph.
+
+        Returns:
+            int: (edge_count). The number of edges.
+        """
+        return len(self.edge_from)
+
+    def expand_path(self, node_path: list[(int, int)], edge_path: list[int],
+                    extra_corridors: dict = None) -> list[(int, int)]:
+        """ Expands a path through the graph into the path through every cell
+        of the maze.
+
+        Args:
+            node_path (list[(int, int)]): The coordinates of the nodes on the
+                path, in order.
+            edge_path (list[int]): The edge taken between each pair of nodes,
+                one fewer than there are nodes.
+            extra_corridors (dict, optional): The edges added for a search
+                (see join_endpoints()), mapping each one's number onto the
+                flat index of its first end and its corridor cells in order
+                from there.
+
+        Returns:
+            list[(int, int)]: (path_taken). The coordinates of every cell on
+                the path, from the first node to the last.
+        """
+        width = self.width
+        extra_corridors = extra_corridors or {}
+        path_taken = [node_path[0]]
+
+        for (from_point, to_point, edge) in zip(node_path, node_path[1:],
+                                                edge_path):
+            if edge in extra_corridors:
+                (first_end, corridor) = extra_corridors[edge]
+            else:
+                first_end = self.edge_from[edge]
+                corridor = self.corridor_cells[self.edge_offsets[edge]:
+                                               self.edge_offsets[edge + 1]]
+            # Corridors are stored in order from their first end, so are
+            # reversed when the edge is taken the other way
+            if first_end != from_point[0] * width + from_point[1]:
+                corridor = reversed(corridor)
+            path_taken.extend(divmod(cell, width) for cell in corridor)
+            path_taken.append(to_point)
+
+        return path_taken
+
+
+def build_junction_graph(maze) -> JunctionGraph:
+    """ Compresses a maze into a graph of its junctions and dead ends, walking
+    each corridor between them once. The graph doesn't depend on the start or
+    goal, which are joined onto it for each search (see join_endpoints()).
+
+    Args:
+        maze (dict of (int, int): str or MazeGrid): The maze to compress.
+
+    Returns:
+        JunctionGraph: (junction_graph). The compressed maze.
+    """
+    if not isinstance(maze, MazeGrid):
+        maze = MazeGrid.from_dictionary(maze)
+    # Works on a padded copy of the maze, so neighbours can be checked without
+    # any bounds checks
+    (padded, padded_width) = maze.padded_cells()
+    offsets = (-padded_width, 1, padded_width, -1)
+
+    # Every open cell that doesn't have exactly two open neighbours is a node
+    is_node = bytearray(len(padded))
+    for index in range(padded_width, len(padded) - padded_width):
+        if padded[index] and (padded[index - padded_width] + padded[index + 1]
+                              + padded[index + padded_width]
+                              + padded[index - 1]) != 2:
+            is_node[index] = 1
+    padded_nodes = [index for index in range(len(padded)) if is_node[index]]
+
+    edge_from = []
+    edge_to = []
+    edge_offsets = array('q', [0])
+    corridor_cells = []
+    # Marks the corridor cells that already belong to an edge, so each
+    # corridor is only walked from one of its ends
+    in_corridor = bytearray(len(padded))
+
+    for node in padded_nodes:
+        for offset in offsets:
+            first_step = node + offset
+            if not padded[first_step] or in_corridor[first_step]:
+                continue
+
+            # Follows the corridor until it reaches another node
+            (previous, current) = (node, first_step)
+            corridor_start = len(corridor_cells)
+            while not is_node[current]:
+                in_corridor[current] = 1
+                corridor_cells.append(current)
+                for offset_along in offsets:
+                    next_cell = current + offset_along
+                    if padded[next_cell] and next_cell != previous:
+                        (previous, current) = (current, next_cell)
+                        break
+
+            # Nodes next to each other are joined once (from the lower one),
+            # and corridors that loop back to where they started are dropped
+            if (current == node or
+                    (len(corridor_cells) == corridor_start and
+                     current < node)):
+                del corridor_cells[corridor_start:]
+                continue
+
+            edge_from.append(node)
+            edge_to.append(current)
+            edge_offsets.append(len(corridor_cells))
+
+    # Converts the padded indices back into flat indices of the maze
+    def unpadded(indices: list[int]) -> array:
+        return array('i', [index - padded_width - index // padded_width + 1
+                           for index in indices])
+
+    (nodes, edge_from, edge_to, corridor_cells) = (
+        unpadded(padded_nodes), unpadded(edge_from), unpadded(edge_to),
+        unpadded(corridor_cells))
+
+    return JunctionGraph(maze.width, maze.height, nodes, edge_from, edge_to,
+                         edge_offsets, corridor_cells)
+
+
+def junction_a_star(maze, start_point: tuple[int, int],
+                    goal_point: tuple[int, int], heuristic="manhattan",
+                    weight: float = DEFAULT_HEURISTIC_WEIGHT,
+                    junction_graph: JunctionGraph = None
+                    ) -> tuple[list[(int, int)], int]:
+    """ Executes an A* search over the junction graph of the maze, expanding
+    the path it finds back into every cell along it.
+
+    Args:
+        maze (dict of (int, int): str or MazeGrid): The maze being solved,
+            used to join the start and goal onto the graph (and to build the
+            graph if one isn't provided or already built for it).
+        start_point (tuple[int, int]): A coordinate (int, int) tuple indicating
+            when the algorithm starts when solving the maze.
+        goal_point (tuple[int, int]): A coordinate (int, int) tuple indicating
+            when the algorithm ends when solving the maze.
+        heuristic (str or callable, optional): The heuristic used to estimate
+            the distance to the goal, see heuristics.py.
+        weight (float, optional): The weight the heuristic is multiplied by.
+        junction_graph (JunctionGraph, optional): The maze's graph, such as
+            from load_junction_graph_cached(), which is found with
+            junction_graph_for() if not given.
+
+    Raises:
+        ValueError: If the graph was built for a maze of a different size.
+
+    Returns:
+        tuple[list[(int, int)], int]: (path_taken, nodes_expanded). A packaged
+            tuple containing the path through every cell from the start to
+            the goal (or None if there isn't one) along with the number of
+            graph nodes expanded.
+    """
+    (maze_grid, junction_graph) = _graph_for(maze, junction_graph)
+    (adjacency, extra_corridors) = join_endpoints(junction_graph, maze_grid,
+                                                  start_point, goal_point)
+    heuristic_function = resolve_heuristic(heuristic)
+
+    nodes_expanded = 0
+    frontier = MazePriorityQueue()
+    frontier.insert((start_point,
+                     weight * heuristic_function(start_point, goal_point)))
+    visited_nodes = set()
+    # The g(x) of each node reached, and the (node, edge) it was reached from
+    node_cost = {start_point: 0}
+    parent_dict = {}
+
+    while frontier.is_empty() is False:
+        (current_point, _) = frontier.queue_pop()
+        nodes_expanded += 1
+
+        if current_point == goal_point:
+            return (_expand_parents(junction_graph, parent_dict, start_point,
+                                    goal_point, extra_corridors),
+                    nodes_expanded)
+
+        visited_nodes.add(current_point)
+
+        for (next_point, edge_weight, edge) in adjacency[current_point]:
+            if next_point in visited_nodes:
+                continue
+
+            # The cost of reaching the neighbouring node along this corridor
+            interimnode_cost = node_cost[current_point] + edge_weight
+            function_cost = (weight * heuristic_function(next_point,
+                                                         goal_point)
+                             + interimnode_cost)
+
+            if frontier.in_queue(next_point) is False:
+                frontier.insert((next_point, function_cost))
+            elif interimnode_cost < node_cost[next_point]:
+                frontier.change_node_cost((next_point, function_cost))
+            else:
+                continue
+
+            node_cost[next_point] = interimnode_cost
+            parent_dict[next_point] = (current_point, edge)
+
+    return (None, nodes_expanded)
+
+
+def junction_dfs(maze, start_point: tuple[int, int],
+                 goal_point: tuple[int, int],
+                 junction_graph: JunctionGraph = None
+                 ) -> tuple[list[(int, int)], int]:
+    """ Executes an iterative depth first search over the junction graph of
+    the maze, expanding the path it finds back into every cell along it.
+
+    Args:
+        maze (dict of (int, int): str or MazeGrid): The maze being solved,
+            used to join the start and goal onto the graph (and to build the
+            graph if one isn't provided or already built for it).
+        start_point (tuple[int, int]): A coordinate (int, int) tuple indicating
+            when the algorithm starts when solving the maze.
+        goal_point (tuple[int, int]): A coordinate (int, int) tuple indicating
+            when the algorithm ends when solving the maze.
+        junction_graph (JunctionGraph, optional): The maze's graph, such as
+            from load_junction_graph_cached(), which is found with
+            junction_graph_for() if not given.
+
+    Raises:
+        ValueError: If the graph was built for a maze of a different size.
+
+    Returns:
+        tuple[list[(int, int)], int]: (path_taken, nodes_expanded). A packaged
+            tuple containing the path through every cell from the start to
+            the goal (or None if there isn't one) along with the number of
+            graph nodes expanded.
+    """
+    (maze_grid, junction_graph) = _graph_for(maze, junction_graph)
+    (adjacency, extra_corridors) = join_endpoints(junction_graph, maze_grid,
+                                                  start_point, goal_point)
+
+    nodes_expanded = 0
+    visited_nodes = {start_point}
+    parent_dict = {}
+    dfs_stack = [start_point]
+
+    while len(dfs_stack) > 0:
+        current_point = dfs_stack.pop()
+        nodes_expanded += 1
+
+        if current_point == goal_point:
+            return (_expand_parents(junction_graph, parent_dict, start_point,
+                                    goal_point, extra_corridors),
+                    nodes_expanded)
+
+        for (next_point, _, edge) in adjacency[current_point]:
+            if next_point not in visited_nodes:
+                visited_nodes.add(next_point)
+                dfs_stack.append(next_point)
+                parent_dict[next_point] = (current_point, edge)
+
+    return (None, nodes_expanded)
+
+
+def join_endpoints(junction_graph: JunctionGraph, maze_grid: MazeGrid,
+                   start_point: tuple[int, int],
+                   goal_point: tuple[int, int]) -> tuple[ChainMap, dict]:
+    """ Joins a start and goal onto a junction graph for one search. A start
+    or goal that is a corridor cell splits the corridor's edge in two: the
+    edge is left out, and the cell is joined to the nodes at either end of
+    the corridor (or to the other of the start and goal, if that is on the
+    same corridor) by new edges. The graph itself isn't changed.
+
+    Args:
+        junction_graph (JunctionGraph): The maze's graph.
+        maze_grid (MazeGrid): The maze the graph was built from.
+        start_point (tuple[int, int]): The coordinate the search starts at.
+        goal_point (tuple[int, int]): The coordinate the search ends at.
+
+    Returns:
+        tuple[ChainMap, dict]: (adjacency, extra_corridors). The graph's
+            adjacency with the start and goal joined on, and the corridors
+            of the new edges (see JunctionGraph.expand_path()).
+    """
+    neighbour_indices = maze_grid.neighbour_indices
+    width = maze_grid.width
+    stops = {maze_grid.index(start_point), maze_grid.index(goal_point)}
+    # The adjacency lists that are changed, copied from the graph's
+    changed = {}
+    extra_corridors = {}
+    split_edges = set()
+    # The start and goal once they have been joined on
+    joined = set()
+
+    def changed_neighbours(point: tuple[int, int]) -> list:
+        if point not in changed:
+            changed[point] = list(junction_graph.adjacency.get(point, ()))
+        return changed[point]
+
+    for point in dict.fromkeys((start_point, goal_point)):
+        index = maze_grid.index(point)
+        # Junctions and dead ends are already in the graph
+        if len(neighbour_indices(index)) != 2:
+            continue
+        changed_neighbours(point)
+
+        for first_step in neighbour_indices(index):
+            # Follows the corridor until it reaches a node, the start or the
+            # goal, keeping the cells along the way
+            (previous, current) = (index, first_step)
+            corridor = []
+            while current not in stops:
+                neighbours = neighbour_indices(current)
+                if len(neighbours) != 2:
+                    break
+                corridor.append(current)
+                (previous, current) = (current, neighbours[1]
+                                       if neighbours[0] == previous
+                                       else neighbours[0])
+
+            end_point = divmod(current, width)
+            # A corridor that loops back to the point joins nothing, and a
+            # corridor between the start and goal is only joined once
+            if current == index or end_point in joined:
+                continue
+
+            if end_point in junction_graph.adjacency:
+                # The graph's edge along this corridor is the one that starts
+                # with the cell next to the node
+                split_edges.add(_corridor_edge(
+                    junction_graph, current,
+                    corridor[-1] if corridor else index))
+
+            edge = junction_graph.edge_count() + len(extra_corridors)
+            extra_corridors[edge] = (index, corridor)
+            changed_neighbours(point).append(
+                (end_point, len(corridor) + 1, edge))
+            changed_neighbours(end_point).append(
+                (point, len(corridor) + 1, edge))
+        joined.add(point)
+
+    # The split edges are replaced by the new ones
+    for (point, neighbours) in changed.items():
+        changed[point] = [neighbour for neighbour in neighbours
+                          if neighbour[2] not in split_edges]
+
+    return (ChainMap(changed, junction_graph.adjacency), extra_corridors)
+
+
+def junction_graph_for(maze_grid: MazeGrid,
+                       file_name: str = None) -> JunctionGraph:
+    """ Finds the junction graph of a maze, building it only the first time
+    it is asked for. Later calls with the same maze_grid object return the
+    same graph from memory.
+
+    Args:
+        maze_grid (MazeGrid): The maze.
+        file_name (str, optional): The file name of the maze's text file, in
+            which case the graph is loaded through its cache on disk (see
+            load_junction_graph_cached()) rather than built.
+
+    Returns:
+        JunctionGraph: (junction_graph). The compressed maze.
+    """
+    junction_graph = _GRAPHS.get(maze_grid)
+    if junction_graph is None:
+        junction_graph = (build_junction_graph(maze_grid) if file_name is None
+                          else load_junction_graph_cached(file_name,
+                                                          maze_grid))
+        _GRAPHS[maze_grid] = junction_graph
+    return junction_graph
+
+
+def junction_cache_path(file_name: str) -> str:
+    """ Finds where the cached junction graph of a maze text file lives, next
+    to its cached binary copy (see maze_binary.cache_path()).
+
+    Args:
+        file_name (str): The file name of the maze text file.
+
+    Returns:
+        str: (cached_file_name). The file name of the cached graph.
+    """
+    return os.path.splitext(cache_path(file_name))[0] + EXTENSION
+
+
+def write_junction_graph(output_path: str, junction_graph: JunctionGraph,
+                         source_mtime_ns: int = 0,
+                         source_size: int = 0) -> None:
+    """ Writes a junction graph to a file, under a temporary name first so a
+    reader never sees a half-written file.
+
+    Args:
+        output_path (str): The file name to write the graph to.
+        junction_graph (JunctionGraph): The graph being written.
+        source_mtime_ns (int, optional): The modification time of the text
+            file the maze came from, in nanoseconds.
+        source_size (int, optional): The size of the text file the maze came
+            from, in bytes.
+    """
+    header = HEADER.pack(MAGIC, VERSION, 0,
+                         junction_graph.width, junction_graph.height,
+                         source_mtime_ns, source_size,
+                         len(junction_graph.nodes),
+                         junction_graph.edge_count())
+
+    temporary_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as file_pointer:
+        file_pointer.write(header)
+        for values in _graph_arrays(junction_graph):
+            values.tofile(file_pointer)
+    os.replace(temporary_path, output_path)
+
+
+def read_junction_graph(file_name: str) -> tuple[JunctionGraph, int, int]:
+    """ Loads a junction graph file.
+
+    Args:
+        file_name (str): The file name of the graph.
+
+    Raises:
+        MazeFormatError: If the file isn't a valid junction graph.
+
+    Returns:
+        tuple[JunctionGraph, int, int]: (junction_graph, source_mtime_ns,
+            source_size). The graph along with the modification time and size
+            of the maze text file it was built from.
+    """
+    with open(file_name, "rb") as file_pointer:
+        header = file_pointer.read(HEADER.size)
+        if len(header) < HEADER.size or header[:4] != MAGIC:
+            raise MazeFormatError(f"{file_name} is not a junction graph file")
+
+        (_, version, _, width, height, source_mtime_ns, source_size,
+         node_count, edge_count) = HEADER.unpack(header)
+        if version != VERSION:
+            raise MazeFormatError(f"{file_name} uses an unsupported junction "
+                                  f"graph version ({version})")
+
+        try:
+            (nodes, edge_from, edge_to, edge_offsets) = (
+                _read_array(file_pointer, 'i', node_count),
+                _read_array(file_pointer, 'i', edge_count),
+                _read_array(file_pointer, 'i', edge_count),
+                _read_array(file_pointer, 'q', edge_count + 1))
+            corridor_cells = _read_array(file_pointer, 'i', edge_offsets[-1])
+        except EOFError:
+            raise MazeFormatError(f"{file_name} is truncated") from None
+
+    junction_graph = JunctionGraph(width, height, nodes, edge_from, edge_to,
+                                   edge_offsets, corridor_cells)
+    return (junction_graph, source_mtime_ns, source_size)
+
+
+def load_junction_graph_cached(file_name: str,
+                               maze_grid: MazeGrid = None) -> JunctionGraph:
+    """ Loads the junction graph of a maze text file, using the cached copy if
+    it was built from the file as it is now (same modification time and
+    size). Otherwise the graph is built and the cache is refreshed. A cache
+    that can't be written is skipped.
+
+    Args:
+        file_name (str): The file name of the maze text file.
+        maze_grid (MazeGrid, optional): The maze, if it has already been
+            loaded, which the graph is built from instead of loading it
+            again.
+
+    Returns:
+        JunctionGraph: (junction_graph). The compressed maze.
+    """
+    source_stat = os.stat(file_name)
+    cached_file_name = junction_cache_path(file_name)
+
+    try:
+        (junction_graph, mtime_ns, size) = read_junction_graph(
+            cached_file_name)
+        if (mtime_ns, size) == (source_stat.st_mtime_ns, source_stat.st_size):
+            return junction_graph
+    except (OSError, MazeFormatError):
+        # A missing or unreadable cache is simply rebuilt
+        pass
+
+    if maze_grid is None:
+        (maze_grid, _, _) = load_maze_cached(file_name)
+    junction_graph = build_junction_graph(maze_grid)
+
+    try:
+        os.makedirs(os.path.dirname(cached_file_name), exist_ok=True)
+        write_junction_graph(cached_file_name, junction_graph,
+                             source_stat.st_mtime_ns, source_stat.st_size)
+    except OSError:
+        pass
+
+    return junction_graph
+
+
+def maze_solver(file_name: str, path_format: str = None,
+                search_function=None) -> None:
+    """ Solves a maze by searching its junction graph and prints out
+    statistics about the algorithm's performance when solving the maze,
+    including the size of the graph, the number of nodes explored, the
+    execution time and the number of steps in the path.
+
+    Args:
+        file_name (str): The file name of the maze to be solved, provided as a
+            string so that it can be used to open the maze file directly.
+        path_format (str, optional): How to print the path taken, one of
+            maze_output.PATH_FORMATS, or None (the default) to skip printing
+            it.
+        search_function (callable, optional): The graph search to use, either
+            junction_a_star (the default) or junction_dfs.
+    """
+    if search_function is None:
+        search_function = junction_a_star
+
+    (maze_grid, start_point, goal_point) = load_maze_cached(file_name)
+    # Loads the maze's connected components (from the cache if they are
+    # fresh), so an unreachable goal is answered without searching
+    components = load_components_cached(file_name)
+
+    # Loads the graph (from the cache if it is fresh) separately from the
+    # search, as it only has to be built once per maze
+    load_start_time = time.time()
+    junction_graph = load_junction_graph_cached(file_name)
+    load_end_time = time.time()
+
+    start_time = time.time()
+    (maze_path_junction,
+     nodes_expanded) = search_if_reachable(components, search_function,
+                                           maze_grid, start_point, goal_point,
+                                           junction_graph=junction_graph)
+    end_time = time.time()
+
+    # Prints out all the algorithm's performance statistics
+    performance_statistics((len(maze_path_junction) - 1
+                            if maze_path_junction is not None else None),
+                           nodes_expanded,
+                           round(end_time - start_time, 5),
+                           (maze_path_junction if path_format is not None
+                            else None),
+                           path_format
+                           )
+    print("The number of nodes and edges in the graph was:    ",
+          len(junction_graph), junction_graph.edge_count())
+    print("The time taken to load the junction graph was:     ",
+          round(load_end_time - load_start_time, 5), " seconds")
+
+    # Outputs the algorithms path through the maze to the file maze_path.txt
+    maze_output_to_file(maze_grid, maze_path_junction)
+
+
+def _graph_for(maze, junction_graph: JunctionGraph
+               ) -> tuple[MazeGrid, JunctionGraph]:
+    """ Finds the junction graph of the maze if one wasn't provided, and
+    checks that a provided one is the same size as the maze.
+    """
+    if not isinstance(maze, MazeGrid):
+        maze = MazeGrid.from_dictionary(maze)
+    if junction_graph is None:
+        return (maze, junction_graph_for(maze))
+
+    if (junction_graph.width, junction_graph.height) != (maze.width,
+                                                        maze.height):
+        raise ValueError("The junction graph was built for a "
+                         f"{junction_graph.height}x{junction_graph.width} "
+                         f"maze, not a {maze.height}x{maze.width} one")
+    return (maze, junction_graph)
+
+
+def _corridor_edge(junction_graph: JunctionGraph, node: int,
+                   first_cell: int) -> int:
+    """ Finds the edge from a node (flat index) whose corridor starts with
+    the given cell, or None if the corridor has no edge (as it loops back
+    to the node).
+    """
+    (edge_from, edge_offsets) = (junction_graph.edge_from,
+                                 junction_graph.edge_offsets)
+    for (_, _, edge) in junction_graph.adjacency[divmod(
+            node, junction_graph.width)]:
+        (start, end) = (edge_offsets[edge], edge_offsets[edge + 1])
+        if start != end and first_cell == junction_graph.corridor_cells[
+                start if edge_from[edge] == node else end - 1]:
+            return edge
+    return None
+
+
+def _expand_parents(junction_graph: JunctionGraph, parent_dict: dict,
+                    start_point: tuple[int, int],
+                    goal_point: tuple[int, int],
+                    extra_corridors: dict) -> list[(int, int)]:
+    """ Backtracks from the goal to the start through the (node, edge)
+    parents of a graph search, then expands the nodes and edges into the
+    path through every cell.
+    """
+    node_path = [goal_point]
+    edge_path = []
+    while node_path[-1] != start_point:
+        (parent_point, edge) = parent_dict[node_path[-1]]
+        node_path.append(parent_point)
+        edge_path.append(edge)
+
+    node_path.reverse()
+    edge_path.reverse()
+    return junction_graph.expand_path(node_path, edge_path, extra_corridors)
+
+
+def _graph_arrays(junction_graph: JunctionGraph) -> tuple[array, ...]:
+    """ Lists the arrays making up a graph, in the order they are stored in a
+    graph file.
+    """
+    return (junction_graph.nodes, junction_graph.edge_from,
+            junction_graph.edge_to, junction_graph.edge_offsets,
+            junction_graph.corridor_cells)
+
+
+def _read_array(file_pointer, type_code: str, count: int) -> array:
+    """ Reads count values of the given type from a graph file, raising
+    EOFError if the file ends too early.
+    """
+    values = array(type_code)
+    values.fromfile(file_pointer, count)
+    return values
+
+
+if __name__ == '__main__':
+    # The path is only printed if a format is given on the command line
+    OPTIONS = solver_arguments()
+    MAZE_FILE_NAME = str(input(
+                    "Enter the file_name of the maze you would like solved: "))
+    maze_solver("../docs/mazes/" + MAZE_FILE_NAME, OPTIONS.path_format)
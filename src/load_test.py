@@ -0,0 +1,179 @@
+"""Load tests the maze solving server in solve_server.py
+
+Sends a number of solve requests over several connections, each with a few
+requests in flight at once, and reports the throughput, the client side
+latency percentiles, how many requests were refused as overloaded and the
+server's own statistics. With --retries, requests refused as overloaded are
+sent again after an exponentially growing delay. With --spawn the server is
+started in this process on a free port, so no separate server is needed.
+
+Example, 200 requests over 8 connections against a spawned server with two
+workers:
+    python3 load_test.py --spawn --workers 2 --requests 200 --connections 8
+"""
+import argparse
+import asyncio
+import itertools
+import sys
+import time
+from solve_client import SolveClient
+from solve_server import DEFAULT_HOST, DEFAULT_PORT, SolveServer, percentile
+
+DEFAULT_MAZES = ["maze-Easy.txt", "maze-Medium.txt", "maze-Large.txt"]
+# The wait before the first retry of an overloaded request, doubled for each
+# retry after it
+RETRY_DELAY = 0.005
+
+
+async def run_load_test(host: str, port: int, requests: int,
+                        connections: int, depth: int, mazes: list[str],
+                        algorithms: list[str], retries: int = 0) -> dict:
+    """ Sends the requests, cycling through every (maze, algorithm) pair.
+    Requests refused as overloaded are sent again after a growing delay, up
+    to retries times, with their latency counted from the first attempt.
+
+    Args:
+        host (str): The server's address.
+        port (int): The server's port.
+        requests (int): The total number of solve requests to send.
+        connections (int): The number of connections to send them over.
+        depth (int): The number of requests in flight on each connection.
+        mazes (list[str]): The maze file names to solve.
+        algorithms (list[str]): The algorithms to solve them with.
+        retries (int, optional): The most times to resend an overloaded
+            request.
+
+    Returns:
+        dict: (report). The number of final responses by status, the number
+            of retries, the latencies (in seconds) of the successful
+            requests, and the total time taken.
+    """
+    pairs = itertools.cycle([(maze, algorithm) for maze in mazes
+                             for algorithm in algorithms])
+    remaining = itertools.islice(pairs, requests)
+    statuses = {}
+    latencies = []
+    retried = 0
+
+    async def send_requests(client: SolveClient) -> None:
+        nonlocal retried
+        # Each sender takes the next pair until none are left, so the
+        # connection always has depth requests in flight
+        for (maze, algorithm) in remaining:
+            sent = time.perf_counter()
+            for attempt in range(retries + 1):
+                response = await client.solve(maze, algorithm)
+                status = response["status"]
+                if status != "overloaded" or attempt == retries:
+                    break
+                retried += 1
+                await asyncio.sleep(RETRY_DELAY * 2 ** attempt)
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == "ok":
+                latencies.append(time.perf_counter() - sent)
+
+    clients = [await SolveClient.connect(host, port)
+               for _ in range(connections)]
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(send_requests(client) for client in clients
+                               for _ in range(depth)))
+    finally:
+        elapsed = time.perf_counter() - start
+        for client in clients:
+            await client.close()
+
+    return {"statuses": statuses, "retried": retried,
+            "latencies": sorted(latencies), "seconds": elapsed}
+
+
+def print_report(report: dict, server_statistics: dict) -> None:
+    """ Prints the results of a load test.
+
+    Args:
+        report (dict): The results, see run_load_test().
+        server_statistics (dict): The server's statistics afterwards.
+    """
+    total = sum(report["statuses"].values())
+    print(f"Requests:     {total} in {report['seconds']:.3f} s "
+          f"({total / report['seconds']:.1f} per second)")
+    print("By status:    " + ", ".join(
+        f"{status} {count}"
+        for (status, count) in sorted(report["statuses"].items()))
+        + f" ({report['retried']} retries)")
+    if report["latencies"]:
+        print("Latency (ms): " + ", ".join(
+            f"p{percent} {percentile(report['latencies'], percent) * 1e3:.2f}"
+            for percent in (50, 95, 99)))
+    print(f"Server:       {server_statistics}")
+
+
+async def _main(options: argparse.Namespace) -> int:
+    """ Runs the load test asked for on the command line.
+    """
+    server = None
+    (host, port) = (options.host, options.port)
+    if options.spawn:
+        server = SolveServer(workers=options.workers,
+                             max_pending=options.max_pending)
+        (host, port) = await server.start(host, 0)
+
+    try:
+        report = await run_load_test(host, port, options.requests,
+                                     options.connections, options.depth,
+                                     options.mazes, options.algorithms,
+                                     options.retries)
+        client = await SolveClient.connect(host, port)
+        try:
+            server_statistics = await client.stats()
+        finally:
+            await client.close()
+    finally:
+        if server is not None:
+            await server.close()
+
+    print_report(report, server_statistics)
+    return 1 if report["statuses"].get("error") else 0
+
+
+def main(arguments: list[str] = None) -> int:
+    """ Runs the load test from the command line.
+
+    Returns:
+        int: (exit_code). 1 if any request failed with an error (being
+            refused as overloaded doesn't count), otherwise 0.
+    """
+    parser = argparse.ArgumentParser(
+        description="Load test a maze solving server.")
+    parser.add_argument("-n", "--requests", type=int, default=100,
+                        help="solve requests to send (default: 100)")
+    parser.add_argument("-c", "--connections", type=int, default=4,
+                        help="connections to send them over (default: 4)")
+    parser.add_argument("-d", "--depth", type=int, default=2,
+                        help="requests in flight per connection (default: 2)")
+    parser.add_argument("--mazes", nargs="+", default=DEFAULT_MAZES,
+                        help="maze file names, relative to the server's maze "
+                        f"directory (default: {' '.join(DEFAULT_MAZES)})")
+    parser.add_argument("-a", "--algorithms", nargs="+", default=["a_star"],
+                        metavar="ALGORITHM",
+                        help="algorithms to use (default: a_star)")
+    parser.add_argument("-r", "--retries", type=int, default=0,
+                        help="times to resend a request refused as "
+                        "overloaded (default: 0)")
+    parser.add_argument("--host", default=DEFAULT_HOST,
+                        help=f"server address (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help=f"server port (default: {DEFAULT_PORT})")
+    parser.add_argument("--spawn", action="store_true",
+                        help="start a server in this process on a free port")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="worker processes of a spawned server")
+    parser.add_argument("--max-pending", type=int, default=None,
+                        help="pending request limit of a spawned server")
+    options = parser.parse_args(arguments)
+
+    return asyncio.run(_main(options))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,243 @@
+"""A compact binary maze format, along with an on-disk cache of parsed mazes
+
+A binary maze file is a fixed size header followed by the maze's cells, one
+byte per cell in row order (1 for a path, 0 for a wall), so the body can be
+memory-mapped and used directly as the cells of a MazeGrid.
+
+The header (little endian) is made up of:
+    magic (4 bytes), version (uint16), cell format (uint16), width, height,
+    start row, start column, goal row, goal column (uint32 each), and the
+    modification time (nanoseconds) and size of the text file the maze was
+    converted from (uint64 each), which are used to tell if a cached copy is
+    still fresh.
+
+Converting a maze from the command line:
+    python3 maze_binary.py ../docs/mazes/maze-VLarge.txt -o maze-VLarge.mazb
+"""
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+from maze_grid import MazeGrid
+from maze_io import MazeFormatError, load_maze
+
+MAGIC = b'MAZB'
+VERSION = 1
+# The only cell format so far, one byte per cell
+BYTE_PER_CELL = 0
+HEADER = struct.Struct('<4sHH6IQQ')
+# File extension used for binary mazes
+EXTENSION = '.mazb'
+# Environment variable that can be used to move the cache somewhere else
+CACHE_DIRECTORY_VARIABLE = 'MAZE_CACHE_DIR'
+
+
+def write_binary_maze(output_path: str, maze_grid: MazeGrid,
+                      start_point: tuple[int, int],
+                      goal_point: tuple[int, int],
+                      source_mtime_ns: int = 0, source_size: int = 0) -> None:
+    """ Writes a maze to a binary maze file. The file is written under a
+    temporary name first and then moved into place, so a reader never sees a
+    half-written file.
+
+    Args:
+        output_path (str): The file name to write the binary maze to.
+        maze_grid (MazeGrid): The maze being written.
+        start_point (tuple[int, int]): The coordinate the maze starts at.
+        goal_point (tuple[int, int]): The coordinate the maze ends at.
+        source_mtime_ns (int, optional): The modification time of the text
+            file the maze came from, in nanoseconds.
+        source_size (int, optional): The size of the text file the maze came
+            from, in bytes.
+    """
+    header = HEADER.pack(MAGIC, VERSION, BYTE_PER_CELL,
+                         maze_grid.width, maze_grid.height,
+                         start_point[0], start_point[1],
+                         goal_point[0], goal_point[1],
+                         source_mtime_ns, source_size)
+
+    temporary_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as file_pointer:
+        file_pointer.write(header)
+        file_pointer.write(maze_grid.cells)
+    os.replace(temporary_path, output_path)
+
+
+def read_binary_header(file_name: str) -> tuple:
+    """ Reads and validates the header of a binary maze file.
+
+    Args:
+        file_name (str): The file name of the binary maze.
+
+    Raises:
+        MazeFormatError: If the file isn't a binary maze, or was written in a
+            version or cell format that isn't supported.
+
+    Returns:
+        tuple: (width, height, start_point, goal_point, source_mtime_ns,
+            source_size). The values stored in the header.
+    """
+    with open(file_name, "rb") as file_pointer:
+        return _unpack_header(file_pointer.read(HEADER.size), file_name)
+
+
+def read_binary_maze(file_name: str) -> tuple[MazeGrid, tuple[int, int],
+                                              tuple[int, int]]:
+    """ Loads a binary maze file. The file is memory-mapped and the cells of
+    the returned MazeGrid are a read-only view of the mapping, so no copy of
+    the maze is made and only the pages the search touches are read.
+
+    Args:
+        file_name (str): The file name of the binary maze.
+
+    Raises:
+        MazeFormatError: If the file isn't a valid binary maze.
+
+    Returns:
+        tuple[MazeGrid, tuple[int, int], tuple[int, int]]: (maze_grid,
+            start_point, goal_point). A packaged tuple containing the maze
+            along with the coordinates of its start and goal points.
+    """
+    with open(file_name, "rb") as file_pointer:
+        try:
+            maze_map = mmap.mmap(file_pointer.fileno(), 0,
+                                 access=mmap.ACCESS_READ)
+        except ValueError as error:
+            # mmap refuses to map an empty file
+            raise MazeFormatError(f"{file_name} is empty") from error
+
+    # The mapping is closed before raising, so a bad file isn't left mapped
+    try:
+        (width, height, start_point, goal_point,
+         _, _) = _unpack_header(maze_map[:HEADER.size], file_name)
+    except MazeFormatError:
+        maze_map.close()
+        raise
+
+    file_size = len(maze_map)
+    if file_size != HEADER.size + width * height:
+        maze_map.close()
+        raise MazeFormatError(f"{file_name} should hold {width * height} "
+                              f"cells, but is {file_size} bytes long")
+
+    # The memoryview keeps the mapping open for as long as the grid exists
+    cells = memoryview(maze_map)[HEADER.size:]
+    return (MazeGrid(width, height, cells), start_point, goal_point)
+
+
+def _unpack_header(header: bytes, file_name: str) -> tuple:
+    """ Unpacks the raw bytes of a header, see read_binary_header().
+    """
+    if len(header) < HEADER.size or header[:4] != MAGIC:
+        raise MazeFormatError(f"{file_name} is not a binary maze file")
+
+    (_, version, cell_format, width, height, start_row, start_column,
+     goal_row, goal_column, source_mtime_ns,
+     source_size) = HEADER.unpack(header[:HEADER.size])
+
+    if version != VERSION or cell_format != BYTE_PER_CELL:
+        raise MazeFormatError(f"{file_name} uses an unsupported binary maze "
+                              f"version ({version}) or format ({cell_format})")
+
+    return (width, height, (start_row, start_column),
+            (goal_row, goal_column), source_mtime_ns, source_size)
+
+
+def cache_path(file_name: str) -> str:
+    """ Finds where the cached binary copy of a maze text file lives. By
+    default this is a .maze_cache folder next to the maze, but it can be
+    moved by setting the MAZE_CACHE_DIR environment variable.
+
+    Args:
+        file_name (str): The file name of the maze text file.
+
+    Returns:
+        str: (cached_file_name). The file name of the cached copy, which is
+            unique to the absolute path of the maze.
+    """
+    absolute_path = os.path.abspath(file_name)
+    cache_directory = os.environ.get(
+        CACHE_DIRECTORY_VARIABLE,
+        os.path.join(os.path.dirname(absolute_path), '.maze_cache'))
+    path_hash = hashlib.sha1(absolute_path.encode("utf-8")).hexdigest()[:16]
+    base_name = os.path.splitext(os.path.basename(absolute_path))[0]
+
+    return os.path.join(cache_directory,
+                        f"{base_name}-{path_hash}{EXTENSION}")
+
+
+def load_maze_cached(file_name: str) -> tuple[MazeGrid, tuple[int, int],
+                                              tuple[int, int]]:
+    """ Loads a maze text file, using its cached binary copy if there is one
+    that was made from the file as it is now (same modification time and
+    size). Otherwise the text file is parsed and the cache is refreshed.
+    A cache that can't be written (e.g. a read-only folder) is skipped.
+
+    Args:
+        file_name (str): The file name of the maze text file.
+
+    Returns:
+        tuple[MazeGrid, tuple[int, int], tuple[int, int]]: (maze_grid,
+            start_point, goal_point). A packaged tuple containing the maze
+            along with the coordinates of its start and goal points.
+    """
+    source_stat = os.stat(file_name)
+    cached_file_name = cache_path(file_name)
+
+    try:
+        (_, _, _, _, mtime_ns, size) = read_binary_header(cached_file_name)
+        if (mtime_ns, size) == (source_stat.st_mtime_ns, source_stat.st_size):
+            return read_binary_maze(cached_file_name)
+    except (OSError, MazeFormatError):
+        # A missing or unreadable cache is simply rebuilt
+        pass
+
+    (maze_grid, start_point, goal_point) = load_maze(file_name)
+
+    try:
+        os.makedirs(os.path.dirname(cached_file_name), exist_ok=True)
+        write_binary_maze(cached_file_name, maze_grid, start_point,
+                          goal_point, source_stat.st_mtime_ns,
+                          source_stat.st_size)
+    except OSError:
+        pass
+
+    return (maze_grid, start_point, goal_point)
+
+
+def main() -> None:
+    """ Converts maze text files into binary maze files from the command line.
+    """
+    parser = argparse.ArgumentParser(
+        description="Convert maze text files into the binary maze format.")
+    parser.add_argument("mazes", nargs="+",
+                        help="maze text files to convert")
+    parser.add_argument("-o", "--output",
+                        help="output file name (only with a single maze, "
+                        "defaults to the maze name with a .mazb extension)")
+    parser.add_argument("--cache", action="store_true",
+                        help="write to the parse cache used by the solvers "
+                        "instead of next to the maze")
+    arguments = parser.parse_args()
+
+    if arguments.output and len(arguments.mazes) > 1:
+        parser.error("--output can only be used with a single maze")
+
+    for file_name in arguments.mazes:
+        if arguments.cache:
+            load_maze_cached(file_name)
+            print(f"{file_name} -> {cache_path(file_name)}")
+            continue
+
+        output_path = (arguments.output or
+                       os.path.splitext(file_name)[0] + EXTENSION)
+        source_stat = os.stat(file_name)
+        (maze_grid, start_point, goal_point) = load_maze(file_name)
+        write_binary_maze(output_path, maze_grid, start_point, goal_point,
+                          source_stat.st_mtime_ns, source_stat.st_size)
+        print(f"{file_name} -> {output_path}")
+
+
+if __name__ == '__main__':
+    main()
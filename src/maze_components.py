@@ -0,0 +1,276 @@
+"""Labels the connected components (areas reachable from each other) of a maze
+
+Two open cells are in the same component if there is a path between them, so
+comparing their labels answers whether a path exists without searching. The
+solvers check this before they start, so a maze whose goal can't be reached
+is answered straight away instead of after exploring everything reachable
+from the start.
+
+The labels only depend on the maze, so they are cached on disk next to the
+binary copy of the maze (see maze_binary.py) and reused until the maze file
+changes. A cached file is a fixed size header followed by the size of each
+component and the label of every cell.
+"""
+import os
+import struct
+from array import array
+from maze_grid import MazeGrid
+from maze_io import MazeFormatError
+from maze_binary import cache_path, load_maze_cached
+
+# The label given to walls, which aren't in any component
+WALL_LABEL = -1
+MAGIC = b'MAZC'
+VERSION = 1
+# Magic, version, padding, width, height, the number of components and the
+# modification time and size of the maze text file
+HEADER = struct.Struct('<4sHH3I2Q')
+# File extension used for cached component labels
+EXTENSION = '.mazc'
+
+
+class MazeComponents():
+    """ A class that stores the connected component of every cell of a maze,
+    as an array of labels by flat index (WALL_LABEL for walls), along with
+    the number of cells in each component.
+    """
+    def __init__(self, width: int, height: int, labels: array,
+                 component_sizes: array):
+        """ A basic constructor that stores the labels of a maze.
+
+        Args:
+            width (int): The number of columns in the maze.
+            height (int): The number of rows in the maze.
+            labels (array): The component of every cell, by flat index.
+            component_sizes (array): The number of cells in each component.
+        """
+        self.width = width
+        self.height = height
+        self.labels = labels
+        self.component_sizes = component_sizes
+
+    def __len__(self) -> int:
+        """ Returns the number of components in the maze.
+        """
+        return len(self.component_sizes)
+
+    def label(self, point: tuple[int, int]) -> int:
+        """ Finds the component of a cell.
+
+        Args:
+            point (tuple[int, int]): The coordinate of the cell.
+
+        Returns:
+            int: (label). The component's number, or WALL_LABEL if the cell
+                is a wall or outside the maze.
+        """
+        (row, column) = point
+        if 0 <= row < self.height and 0 <= column < self.width:
+            return self.labels[row * self.width + column]
+        return WALL_LABEL
+
+    def reachable(self, start_point: tuple[int, int],
+                  goal_point: tuple[int, int]) -> bool:
+        """ Checks if there is a path between two cells in O(1), by comparing
+        their components.
+
+        Args:
+            start_point (tuple[int, int]): The coordinate of the first cell.
+            goal_point (tuple[int, int]): The coordinate of the second cell.
+
+        Returns:
+            bool: (True, False). Whether both cells are open and connected.
+        """
+        start_label = self.label(start_point)
+        return (start_label != WALL_LABEL
+                and start_label == self.label(goal_point))
+
+
+def label_components(maze_grid: MazeGrid) -> MazeComponents:
+    """ Labels every open cell of a maze with the number of its connected
+    component, by flood filling from each cell that hasn't been labelled yet.
+    Components are numbered in the order their first cell appears in the
+    maze (row by row).
+
+    Args:
+        maze_grid (MazeGrid): The maze to label.
+
+    Returns:
+        MazeComponents: (components). The labels of the maze's cells.
+    """
+    (width, height) = (maze_grid.width, maze_grid.height)
+    # Works on a padded copy of the maze, so neighbours can be checked without
+    # any bounds checks. Cells are walled off in the copy once they are
+    # labelled, so it doubles as the visited set
+    (padded, padded_width) = maze_grid.padded_cells()
+    padded_labels = array('i', [WALL_LABEL]) * len(padded)
+    component_sizes = array('q')
+
+    # Finds the first open cell that hasn't been labelled yet (in C)
+    first_cell = padded.find(1)
+    while first_cell != -1:
+        label = len(component_sizes)
+        padded[first_cell] = 0
+        padded_labels[first_cell] = label
+        stack = [first_cell]
+        component_size = 0
+
+        while stack:
+            index = stack.pop()
+            component_size += 1
+            for next_index in (index - padded_width, index + 1,
+                               index + padded_width, index - 1):
+                if padded[next_index]:
+                    padded[next_index] = 0
+                    padded_labels[next_index] = label
+                    stack.append(next_index)
+
+        component_sizes.append(component_size)
+        first_cell = padded.find(1, first_cell)
+
+    # Drops the padding from the labels, a row at a time
+    labels = array('i')
+    for row in range(height):
+        start = (row + 1) * padded_width
+        labels.extend(padded_labels[start:start + width])
+
+    return MazeComponents(width, height, labels, component_sizes)
+
+
+def components_cache_path(file_name: str) -> str:
+    """ Finds where the cached component labels of a maze text file live,
+    next to its cached binary copy (see maze_binary.cache_path()).
+
+    Args:
+        file_name (str): The file name of the maze text file.
+
+    Returns:
+        str: (cached_file_name). The file name of the cached labels.
+    """
+    return os.path.splitext(cache_path(file_name))[0] + EXTENSION
+
+
+def write_components(output_path: str, components: MazeComponents,
+                     source_mtime_ns: int = 0, source_size: int = 0) -> None:
+    """ Writes the component labels of a maze to a file, under a temporary
+    name first so a reader never sees a half-written file.
+
+    Args:
+        output_path (str): The file name to write the labels to.
+        components (MazeComponents): The labels being written.
+        source_mtime_ns (int, optional): The modification time of the text
+            file the maze came from, in nanoseconds.
+        source_size (int, optional): The size of the text file the maze came
+            from, in bytes.
+    """
+    header = HEADER.pack(MAGIC, VERSION, 0, components.width,
+                         components.height, len(components),
+                         source_mtime_ns, source_size)
+
+    temporary_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as file_pointer:
+        file_pointer.write(header)
+        components.component_sizes.tofile(file_pointer)
+        components.labels.tofile(file_pointer)
+    os.replace(temporary_path, output_path)
+
+
+def read_components(file_name: str) -> tuple[MazeComponents, int, int]:
+    """ Loads a component labels file.
+
+    Args:
+        file_name (str): The file name of the labels.
+
+    Raises:
+        MazeFormatError: If the file isn't a valid component labels file.
+
+    Returns:
+        tuple[MazeComponents, int, int]: (components, source_mtime_ns,
+            source_size). The labels along with the modification time and
+            size of the maze text file they were found from.
+    """
+    with open(file_name, "rb") as file_pointer:
+        header = file_pointer.read(HEADER.size)
+        if len(header) < HEADER.size or header[:4] != MAGIC:
+            raise MazeFormatError(f"{file_name} is not a component labels "
+                                  "file")
+
+        (_, version, _, width, height, component_count, source_mtime_ns,
+         source_size) = HEADER.unpack(header)
+        if version != VERSION:
+            raise MazeFormatError(f"{file_name} uses an unsupported component "
+                                  f"labels version ({version})")
+
+        try:
+            component_sizes = array('q')
+            component_sizes.fromfile(file_pointer, component_count)
+            labels = array('i')
+            labels.fromfile(file_pointer, width * height)
+        except EOFError:
+            raise MazeFormatError(f"{file_name} is truncated") from None
+
+    components = MazeComponents(width, height, labels, component_sizes)
+    return (components, source_mtime_ns, source_size)
+
+
+def load_components_cached(file_name: str) -> MazeComponents:
+    """ Loads the component labels of a maze text file, using the cached copy
+    if they were found from the file as it is now (same modification time and
+    size). Otherwise the maze is labelled and the cache is refreshed. A cache
+    that can't be written is skipped.
+
+    Args:
+        file_name (str): The file name of the maze text file.
+
+    Returns:
+        MazeComponents: (components). The labels of the maze's cells.
+    """
+    source_stat = os.stat(file_name)
+    cached_file_name = components_cache_path(file_name)
+
+    try:
+        (components, mtime_ns, size) = read_components(cached_file_name)
+        if (mtime_ns, size) == (source_stat.st_mtime_ns, source_stat.st_size):
+            return components
+    except (OSError, MazeFormatError):
+        # A missing or unreadable cache is simply rebuilt
+        pass
+
+    (maze_grid, _, _) = load_maze_cached(file_name)
+    components = label_components(maze_grid)
+
+    try:
+        os.makedirs(os.path.dirname(cached_file_name), exist_ok=True)
+        write_components(cached_file_name, components,
+                         source_stat.st_mtime_ns, source_stat.st_size)
+    except OSError:
+        pass
+
+    return components
+
+
+def search_if_reachable(components: MazeComponents, search_function, maze,
+                        start_point: tuple[int, int],
+                        goal_point: tuple[int, int], **options
+                        ) -> tuple[list[(int, int)], int]:
+    """ Runs a search only if the goal can be reached from the start, so an
+    unsolvable maze is answered in O(1) instead of after exploring everything
+    reachable from the start.
+
+    Args:
+        components (MazeComponents): The component labels of the maze.
+        search_function (callable): The search to run, taking (maze,
+            start_point, goal_point) and returning (path_taken,
+            nodes_expanded).
+        maze (dict of (int, int): str or MazeGrid): The maze being solved.
+        start_point (tuple[int, int]): The coordinate the search starts at.
+        goal_point (tuple[int, int]): The coordinate the search ends at.
+        **options: Passed on to the search function.
+
+    Returns:
+        tuple[list[(int, int)], int]: (path_taken, nodes_expanded). The result
+            of the search, or (None, 0) if the goal can't be reached.
+    """
+    if not components.reachable(start_point, goal_point):
+        return (None, 0)
+    return search_function(maze, start_point, goal_point, **options)
@@ -0,0 +1,481 @@
+"""Distances from many sources at once, and distance matrices between points
+
+All of these are breadth first searches over a padded copy of the maze (see
+MazeGrid.padded_cells()), expanded a layer at a time so a cell's distance is
+simply the number of the layer it was reached in:
+    - multi_source_distances() searches from every source at once, finding
+      each cell's distance to its nearest source and which source that is
+    - nearest_goals() uses it to assign every start to its nearest goal in
+      one search, rather than one search per (start, goal) pair
+    - distance_matrix() finds the distances between every pair of a set of
+      points, one search per point spread across a pool of worker processes
+      (which share one copy of the maze, see shared_maze.py)
+
+Every step costs the same, so these distances are the lengths (in steps) of
+the shortest paths, the same as a_star_search() finds with an admissible
+heuristic (a weight of 1). Distances are held in array('i') arrays, or for a
+distance matrix in a memory-mapped file, with UNREACHED for cells and points
+that can't be reached.
+
+A distance matrix file is a fixed size header followed by the points (as
+uint32 row and column pairs) and then the int32 distances row by row.
+
+Example, the distances between 50 random open cells of maze-VLarge.txt found
+on four workers and saved to distances.mazx:
+    python3 maze_distances.py ../docs/mazes/maze-VLarge.txt --points 50 \\
+        -w 4 -o distances.mazx
+"""
+import argparse
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from maze_grid import MazeGrid
+from maze_io import MazeFormatError
+from shared_maze import SharedMaze, attached_maze
+
+# The distance of a cell that can't be reached from any source, and the
+# source of such a cell
+UNREACHED = -1
+MAGIC = b'MAZX'
+VERSION = 1
+# Magic, version, padding and the number of points
+HEADER = struct.Struct('<4sHHQ')
+# File extension used for distance matrix files
+EXTENSION = '.mazx'
+
+# The maze and points of the distance matrix this worker process is helping
+# to find, set up by _set_matrix_task()
+_MATRIX_TASK = {}
+
+
+class DistanceMatrix():
+    """ A class that holds the distances between every pair of a set of
+    points, as a flat int32 array in row order (which may be a view of a
+    memory-mapped file).
+    """
+    def __init__(self, points: list[tuple[int, int]], distances,
+                 backing=None):
+        """ A basic constructor that stores the distances.
+
+        Args:
+            points (list[tuple[int, int]]): The points, in the order of the
+                rows and columns of the matrix.
+            distances (array or memoryview): The len(points) ** 2 distances,
+                row by row, with UNREACHED for points that can't reach each
+                other.
+            backing (mmap.mmap, optional): The memory-mapped file the
+                distances are a view of, closed by close().
+        """
+        self.points = points
+        self.distances = distances
+        self.backing = backing
+
+    def __len__(self) -> int:
+        """ Returns the number of points in the matrix.
+        """
+        return len(self.points)
+
+    def __getitem__(self, pair: tuple[int, int]) -> int:
+        """ Looks up the distance between the points at two positions, such
+        as matrix[0, 3].
+        """
+        (row, column) = pair
+        return self.distances[row * len(self.points) + column]
+
+    def row(self, position: int):
+        """ Gives the distances from one point to every point.
+
+        Args:
+            position (int): The position of the point in points.
+
+        Returns:
+            array or memoryview: (distances). The row of the matrix.
+        """
+        size = len(self.points)
+        return self.distances[position * size:(position + 1) * size]
+
+    @classmethod
+    def open(cls, file_name: str) -> "DistanceMatrix":
+        """ Memory-maps a distance matrix file, so rows are only read from
+        disk as they are used.
+
+        Args:
+            file_name (str): The file name of the matrix.
+
+        Raises:
+            MazeFormatError: If the file isn't a valid distance matrix file.
+
+        Returns:
+            DistanceMatrix: (matrix). The matrix, which should be closed once
+                it is no longer needed.
+        """
+        with open(file_name, "rb") as file_pointer:
+            backing = mmap.mmap(file_pointer.fileno(), 0,
+                                access=mmap.ACCESS_READ)
+
+        header = backing[:HEADER.size]
+        if len(header) < HEADER.size or header[:4] != MAGIC:
+            backing.close()
+            raise MazeFormatError(f"{file_name} is not a distance matrix "
+                                  "file")
+        (_, version, _, size) = HEADER.unpack(header)
+        if version != VERSION:
+            backing.close()
+            raise MazeFormatError(f"{file_name} uses an unsupported distance "
+                                  f"matrix version ({version})")
+        if len(backing) != _matrix_file_size(size):
+            backing.close()
+            raise MazeFormatError(f"{file_name} should hold {size} points, "
+                                  f"but is {len(backing)} bytes long")
+
+        coordinates = memoryview(backing)[HEADER.size:
+                                          HEADER.size + 8 * size].cast('I')
+        points = [(coordinates[2 * position], coordinates[2 * position + 1])
+                  for position in range(size)]
+        coordinates.release()
+        distances = memoryview(backing)[HEADER.size + 8 * size:].cast('i')
+        return cls(points, distances, backing)
+
+    def close(self) -> None:
+        """ Closes the memory-mapped file behind the matrix, if there is one.
+        The distances can't be used afterwards.
+        """
+        if self.backing is not None:
+            self.distances.release()
+            self.backing.close()
+            self.backing = None
+
+    def __enter__(self) -> "DistanceMatrix":
+        return self
+
+    def __exit__(self, *exception) -> None:
+        self.close()
+
+
+def multi_source_distances(maze_grid: MazeGrid,
+                           sources: list[tuple[int, int]]
+                           ) -> tuple[array, array]:
+    """ Finds the distance from every cell to its nearest source, searching
+    from all of the sources at once. A cell the same distance from several
+    sources is given to the first of them in the list.
+
+    Args:
+        maze_grid (MazeGrid): The maze being searched.
+        sources (list[tuple[int, int]]): The coordinates of the sources.
+
+    Raises:
+        ValueError: If a source isn't an open cell of the maze.
+
+    Returns:
+        tuple[array, array]: (distances, nearest_sources). The distance of
+            every cell to its nearest source and the position of that source
+            in the list, both by flat index, with UNREACHED for walls and
+            cells no source can reach.
+    """
+    (unvisited, padded_width) = maze_grid.padded_cells()
+    source_cells = _source_cells(maze_grid, padded_width, sources)
+    padded_distances = array('i', [UNREACHED]) * len(unvisited)
+    owners = array('i', [UNREACHED]) * len(unvisited)
+    for (position, cell) in enumerate(source_cells):
+        if owners[cell] == UNREACHED:
+            owners[cell] = position
+
+    for (distance, layer) in enumerate(_breadth_first_layers(
+            unvisited, padded_width, source_cells, owners)):
+        for cell in layer:
+            padded_distances[cell] = distance
+
+    # Drops the padding, a row at a time
+    (width, height) = (maze_grid.width, maze_grid.height)
+    distances = array('i')
+    nearest_sources = array('i')
+    for row in range(height):
+        start = (row + 1) * padded_width
+        distances.extend(padded_distances[start:start + width])
+        nearest_sources.extend(owners[start:start + width])
+    return (distances, nearest_sources)
+
+
+def nearest_goals(maze_grid: MazeGrid, starts: list[tuple[int, int]],
+                  goals: list[tuple[int, int]]) -> tuple[array, array]:
+    """ Assigns every start to its nearest goal, with one search outwards from
+    all of the goals at once (moves can be reversed, so the distance from a
+    goal to a start is the distance from the start to the goal). The search
+    stops as soon as every start has been reached.
+
+    Args:
+        maze_grid (MazeGrid): The maze being searched.
+        starts (list[tuple[int, int]]): The coordinates of the starts.
+        goals (list[tuple[int, int]]): The coordinates of the goals.
+
+    Raises:
+        ValueError: If a start or goal isn't an open cell of the maze.
+
+    Returns:
+        tuple[array, array]: (assigned_goals, distances). For each start, the
+            position of its nearest goal in goals (the first of them if there
+            is a tie) and the distance to it, or UNREACHED if no goal can be
+            reached.
+    """
+    (unvisited, padded_width) = maze_grid.padded_cells()
+    goal_cells = _source_cells(maze_grid, padded_width, goals)
+    start_cells = _source_cells(maze_grid, padded_width, starts)
+    owners = array('i', [UNREACHED]) * len(unvisited)
+    for (position, cell) in enumerate(goal_cells):
+        if owners[cell] == UNREACHED:
+            owners[cell] = position
+
+    # The starts waiting to be reached, by cell
+    waiting = {}
+    for (position, cell) in enumerate(start_cells):
+        waiting.setdefault(cell, []).append(position)
+    assigned_goals = array('i', [UNREACHED]) * len(starts)
+    distances = array('i', [UNREACHED]) * len(starts)
+
+    for (distance, layer) in enumerate(_breadth_first_layers(
+            unvisited, padded_width, goal_cells, owners)):
+        for cell in layer:
+            for position in waiting.pop(cell, ()):
+                assigned_goals[position] = owners[cell]
+                distances[position] = distance
+        if not waiting:
+            break
+
+    return (assigned_goals, distances)
+
+
+def distance_matrix(shared_maze: SharedMaze, points: list[tuple[int, int]],
+                    workers: int = None, output_file: str = None,
+                    chunksize: int = 1) -> DistanceMatrix:
+    """ Finds the distance between every pair of points, with one search from
+    each point run as a task in a pool of worker processes. As distances are
+    symmetric, the search from each point only has to reach the points after
+    it in the list, and stops once it has.
+
+    Args:
+        shared_maze (SharedMaze): The maze, which the workers attach to
+            rather than each loading a copy.
+        points (list[tuple[int, int]]): The coordinates of the points.
+        workers (int, optional): The number of worker processes, which
+            defaults to the number of CPUs. With 1 the searches are run in
+            this process instead.
+        output_file (str, optional): A file to build the matrix in, which is
+            memory-mapped rather than held in memory. See
+            DistanceMatrix.open().
+        chunksize (int, optional): The number of searches sent to a worker at
+            a time.
+
+    Raises:
+        ValueError: If a point isn't an open cell of the maze.
+
+    Returns:
+        DistanceMatrix: (matrix). The distances between the points.
+    """
+    points = [tuple(point) for point in points]
+    size = len(points)
+    # Checks the points up front, rather than in the workers
+    _source_cells(shared_maze.maze_grid, shared_maze.maze_grid.width + 1,
+                  points)
+    matrix = (_create_matrix_file(output_file, points)
+              if output_file is not None else
+              DistanceMatrix(points, array('i', [UNREACHED]) * size * size))
+
+    try:
+        if workers == 1:
+            _set_matrix_task(None, points, shared_maze.maze_grid)
+            try:
+                _fill_rows(matrix, map(_matrix_row, range(size)))
+            finally:
+                _MATRIX_TASK.clear()
+        else:
+            with ProcessPoolExecutor(
+                    max_workers=workers, initializer=_set_matrix_task,
+                    initargs=(shared_maze.name, points)) as executor:
+                _fill_rows(matrix, executor.map(_matrix_row, range(size),
+                                                chunksize=chunksize))
+    except BaseException:
+        matrix.close()
+        raise
+
+    return matrix
+
+
+def _breadth_first_layers(unvisited: bytearray, padded_width: int,
+                          sources: list[int], owners: array = None):
+    """ Searches outwards from the source cells of a padded maze, yielding
+    each layer of cells (starting with the sources themselves) as a list of
+    cell ids, so the cells of the nth layer are n steps from their nearest
+    source. Cells are walled off in unvisited once they have been reached.
+    If owners is given, each newly reached cell's entry is copied from the
+    cell it was reached from.
+    """
+    offsets = (-padded_width, 1, padded_width, -1)
+    layer = []
+    for cell in sources:
+        if unvisited[cell]:
+            unvisited[cell] = 0
+            layer.append(cell)
+
+    while layer:
+        yield layer
+        next_layer = []
+        append = next_layer.append
+        if owners is None:
+            for cell in layer:
+                for offset in offsets:
+                    next_cell = cell + offset
+                    if unvisited[next_cell]:
+                        unvisited[next_cell] = 0
+                        append(next_cell)
+        else:
+            for cell in layer:
+                owner = owners[cell]
+                for offset in offsets:
+                    next_cell = cell + offset
+                    if unvisited[next_cell]:
+                        unvisited[next_cell] = 0
+                        owners[next_cell] = owner
+                        append(next_cell)
+        layer = next_layer
+
+
+def _source_cells(maze_grid: MazeGrid, padded_width: int,
+                  points: list[tuple[int, int]]) -> list[int]:
+    """ Converts coordinates into cell ids in the padded maze, checking that
+    each one is an open cell.
+    """
+    cells = []
+    for point in points:
+        (row, column) = point
+        if (not (0 <= row < maze_grid.height and 0 <= column < maze_grid.width)
+                or not maze_grid.cells[row * maze_grid.width + column]):
+            raise ValueError(f"{point} is not an open cell of the maze")
+        cells.append((row + 1) * padded_width + column)
+    return cells
+
+
+def _set_matrix_task(name: str, points: list[tuple[int, int]],
+                     maze_grid: MazeGrid = None) -> None:
+    """ Sets up the maze and points the matrix rows are found for in this
+    process, attaching to the shared maze by name unless the grid is given.
+    """
+    if maze_grid is None:
+        maze_grid = attached_maze(name).maze_grid
+    padded_width = maze_grid.width + 1
+    _MATRIX_TASK.update({
+        "maze_grid": maze_grid,
+        "cells": [(row + 1) * padded_width + column
+                  for (row, column) in points]})
+
+
+def _matrix_row(position: int) -> array:
+    """ Finds the distances from the point at a position to it and every
+    point after it. This runs in a worker process.
+    """
+    targets = _MATRIX_TASK["cells"][position:]
+    # Each search walls off the cells it reaches, so works on its own padded
+    # copy of the (shared) maze
+    (unvisited, padded_width) = _MATRIX_TASK["maze_grid"].padded_cells()
+
+    waiting = {}
+    for (offset, cell) in enumerate(targets):
+        waiting.setdefault(cell, []).append(offset)
+    row = array('i', [UNREACHED]) * len(targets)
+
+    for (distance, layer) in enumerate(_breadth_first_layers(
+            unvisited, padded_width, targets[:1])):
+        for cell in layer:
+            for offset in waiting.pop(cell, ()):
+                row[offset] = distance
+        if not waiting:
+            break
+
+    return row
+
+
+def _fill_rows(matrix: DistanceMatrix, rows) -> None:
+    """ Fills in each row of the matrix found by _matrix_row(), along with
+    the column it mirrors.
+    """
+    (distances, size) = (matrix.distances, len(matrix))
+    for (position, row) in enumerate(rows):
+        for (offset, distance) in enumerate(row):
+            distances[position * size + position + offset] = distance
+            distances[(position + offset) * size + position] = distance
+
+
+def _matrix_file_size(size: int) -> int:
+    """ Works out the length of a distance matrix file holding size points.
+    """
+    return HEADER.size + 8 * size + 4 * size * size
+
+
+def _create_matrix_file(file_name: str,
+                        points: list[tuple[int, int]]) -> DistanceMatrix:
+    """ Creates a distance matrix file with every distance UNREACHED, and
+    memory-maps it for writing.
+    """
+    size = len(points)
+    with open(file_name, "w+b") as file_pointer:
+        file_pointer.write(HEADER.pack(MAGIC, VERSION, 0, size))
+        file_pointer.write(array('I', [coordinate for point in points
+                                       for coordinate in point]).tobytes())
+        # Every byte of UNREACHED (-1) is 0xff
+        file_pointer.write(b'\xff' * (4 * size * size))
+        file_pointer.flush()
+        backing = mmap.mmap(file_pointer.fileno(), _matrix_file_size(size))
+
+    distances = memoryview(backing)[HEADER.size + 8 * size:].cast('i')
+    return DistanceMatrix(points, distances, backing)
+
+
+def main(arguments: list[str] = None) -> int:
+    """ Finds the distances between random open cells of a maze from the
+    command line, printing the matrix or writing it to a file.
+
+    Returns:
+        int: (exit_code). Always 0.
+    """
+    parser = argparse.ArgumentParser(
+        description="Find the distances between points of a maze.")
+    parser.add_argument("maze", help="maze file to search")
+    parser.add_argument("-p", "--points", type=int, default=10,
+                        help="random open cells to use, along with the "
+                        "maze's start and goal (default: 10)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="random seed for the points (default: 0)")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="number of worker processes (default: the "
+                        "number of CPUs)")
+    parser.add_argument("-o", "--output", default=None,
+                        help=f"distance matrix file to write (such as "
+                        f"distances{EXTENSION}), instead of printing it")
+    options = parser.parse_args(arguments)
+
+    with SharedMaze.from_file(options.maze) as shared_maze:
+        maze_grid = shared_maze.maze_grid
+        generator = random.Random(options.seed)
+        open_cells = [index for (index, cell) in enumerate(maze_grid.cells)
+                      if cell]
+        points = [shared_maze.start_point, shared_maze.goal_point] + [
+            maze_grid.point(generator.choice(open_cells))
+            for _ in range(options.points)]
+
+        with distance_matrix(shared_maze, points, options.workers,
+                             options.output) as matrix:
+            if options.output is not None:
+                print(f"Wrote the distances between {len(matrix)} points to "
+                      f"{os.path.abspath(options.output)}")
+                return 0
+            for (position, point) in enumerate(points):
+                print(f"{str(point):>14} " + " ".join(
+                    f"{distance:6}" for distance in matrix.row(position)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
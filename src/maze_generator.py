@@ -0,0 +1,333 @@
+"""Generates mazes in the bundled text format, for testing at larger scales
+
+Mazes are generated in horizontal bands of cells that are carved one at a
+time and streamed straight to disk, so only one band (a few hundred rows)
+is ever held in memory, as a bytearray, no matter how large the maze is.
+Each band is seeded from the overall seed and its position, so the same
+arguments always produce the same maze.
+
+The maze is laid out like the bundled mazes: walls ('#') and paths ('-')
+separated by spaces, with the start in the first row and the goal in the
+last row. Cells sit at odd (row, column) coordinates with walls between
+them, so both dimensions are rounded up to odd numbers.
+
+Algorithms:
+    backtracker - a randomised depth first search, giving long, winding
+                  corridors and a single path between any two cells.
+    prim        - randomised Prim's algorithm, giving many short dead ends
+                  and a single path between any two cells.
+    braided     - a backtracker maze with its dead ends knocked through, so
+                  there are loops and many routes to the goal.
+    rooms       - a backtracker maze with open rectangular rooms carved into
+                  it and extra openings between bands.
+
+Example, a 10001 x 10001 maze:
+    python3 maze_generator.py maze-10k.txt --rows 10001 --columns 10001 \\
+        --algorithm backtracker --seed 7
+"""
+import argparse
+import random
+
+ALGORITHMS = ("backtracker", "prim", "braided", "rooms")
+WALL = ord('#')
+PATH = ord('-')
+# The number of rows of cells carved at a time
+DEFAULT_BAND_CELLS = 64
+# The share of the cells along the boundary between two bands that get an
+# opening, for the algorithms that allow loops
+LOOP_OPENING_RATE = 1 / 8
+
+
+def generate_maze(file_name: str, rows: int, columns: int,
+                  algorithm: str = "backtracker", seed: int = 0,
+                  band_cells: int = DEFAULT_BAND_CELLS
+                  ) -> tuple[(int, int), (int, int)]:
+    """ Generates a maze and writes it to a file in the bundled text format.
+
+    Args:
+        file_name (str): The file name to write the maze to.
+        rows (int): The number of rows, rounded up to an odd number (at least
+            three).
+        columns (int): The number of columns, rounded up to an odd number (at
+            least three).
+        algorithm (str, optional): One of ALGORITHMS.
+        seed (int, optional): The seed the maze is generated from.
+        band_cells (int, optional): The number of rows of cells generated at
+            a time, which bounds the memory used.
+
+    Returns:
+        tuple[(int, int), (int, int)]: (start_point, goal_point). The
+            coordinates of the start and goal of the maze.
+    """
+    (rows, columns) = (_odd_size(rows), _odd_size(columns))
+    # Every character is followed by a space, as in the bundled mazes
+    line = bytearray(b' ' * (2 * columns) + b'\n')
+
+    with open(file_name, "wb", buffering=1 << 20) as file_pointer:
+        for row in generate_rows(rows, columns, algorithm, seed, band_cells):
+            line[0:2 * columns:2] = row
+            file_pointer.write(line)
+
+    return ((0, 1), (rows - 1, columns - 2))
+
+
+def generate_rows(rows: int, columns: int, algorithm: str = "backtracker",
+                  seed: int = 0, band_cells: int = DEFAULT_BAND_CELLS):
+    """ Generates a maze one row at a time, without the space separators.
+
+    Args:
+        rows (int): The number of rows, rounded up to an odd number.
+        columns (int): The number of columns, rounded up to an odd number.
+        algorithm (str, optional): One of ALGORITHMS.
+        seed (int, optional): The seed the maze is generated from.
+        band_cells (int, optional): The number of rows of cells generated at
+            a time.
+
+    Raises:
+        ValueError: If the algorithm isn't one of ALGORITHMS.
+
+    Yields:
+        bytearray: (row). Each row of the maze as '#' and '-' characters. The
+            same bytearray may be reused for later rows, so copy it if it
+            needs to be kept.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm {algorithm!r}, expected one of "
+                         f"{', '.join(ALGORITHMS)}")
+
+    (rows, columns) = (_odd_size(rows), _odd_size(columns))
+    cell_rows = (rows - 1) // 2
+    band_cells = max(1, band_cells)
+
+    for first_cell_row in range(0, cell_rows, band_cells):
+        band_index = first_cell_row // band_cells
+        band_height = min(band_cells, cell_rows - first_cell_row)
+        generator = random.Random(f"{seed}:{algorithm}:{band_index}")
+        band = _carve_band(band_height, columns, algorithm, generator)
+
+        if first_cell_row == 0:
+            # The start is the gap above the top left cell
+            band[1] = PATH
+        else:
+            _open_band_boundary(band, columns, algorithm, generator)
+
+        # The bottom wall of a band is the top wall of the next one, so it is
+        # only written after the last band
+        for row in range(2 * band_height):
+            yield band[row * columns:(row + 1) * columns]
+
+    last_row = bytearray(b'#' * columns)
+    # The goal is the gap below the bottom right cell
+    last_row[columns - 2] = PATH
+    yield last_row
+
+
+def _odd_size(size: int) -> int:
+    """ Rounds a size up to an odd number of at least three.
+    """
+    return max(3, size + 1 - size % 2)
+
+
+def _carve_band(band_height: int, columns: int, algorithm: str,
+                generator: random.Random) -> bytearray:
+    """ Carves one band of the maze, returning its rows (including the walls
+    above and below it) as a flat bytearray of '#' and '-' characters.
+    """
+    band = bytearray(b'#' * ((2 * band_height + 1) * columns))
+
+    if algorithm == "prim":
+        _carve_prim(band, band_height, columns, generator)
+    else:
+        _carve_backtracker(band, band_height, columns, generator)
+
+    if algorithm == "braided":
+        _braid(band, band_height, columns, generator)
+    elif algorithm == "rooms":
+        _carve_rooms(band, band_height, columns, generator)
+
+    return band
+
+
+def _cell_neighbours(index: int, band_height: int, columns: int) -> list:
+    """ Finds the flat index offsets to the neighbouring cells (two steps
+    away, across a wall) that are inside the band.
+    """
+    (row, column) = divmod(index, columns)
+    offsets = []
+    if row > 1:
+        offsets.append(-2 * columns)
+    if column < columns - 2:
+        offsets.append(2)
+    if row < 2 * band_height - 1:
+        offsets.append(2 * columns)
+    if column > 1:
+        offsets.append(-2)
+    return offsets
+
+
+def _carve_backtracker(band: bytearray, band_height: int, columns: int,
+                       generator: random.Random) -> None:
+    """ Carves a perfect maze through the band with a randomised depth first
+    search (the recursive backtracker, using an explicit stack).
+    """
+    random_number = generator.random
+    start = ((2 * int(random_number() * band_height) + 1) * columns
+             + 2 * int(random_number() * ((columns - 1) // 2)) + 1)
+    band[start] = PATH
+    stack = [start]
+    # The neighbour checks are written out in full (rather than calling
+    # _cell_neighbours()) as this loop runs for every cell of the maze
+    row_step = 2 * columns
+    last_row_start = (2 * band_height - 1) * columns
+
+    while stack:
+        index = stack[-1]
+        column = index % columns
+        unvisited = []
+        if index > row_step and band[index - row_step] == WALL:
+            unvisited.append(-row_step)
+        if column < columns - 2 and band[index + 2] == WALL:
+            unvisited.append(2)
+        if index < last_row_start and band[index + row_step] == WALL:
+            unvisited.append(row_step)
+        if column > 1 and band[index - 2] == WALL:
+            unvisited.append(-2)
+
+        if not unvisited:
+            stack.pop()
+            continue
+
+        offset = unvisited[int(random_number() * len(unvisited))]
+        # Knocks down the wall between the two cells
+        band[index + offset // 2] = PATH
+        band[index + offset] = PATH
+        stack.append(index + offset)
+
+
+def _carve_prim(band: bytearray, band_height: int, columns: int,
+                generator: random.Random) -> None:
+    """ Carves a perfect maze through the band with randomised Prim's
+    algorithm, growing the maze from a random cell by repeatedly joining a
+    random cell next to it.
+    """
+    random_number = generator.random
+    in_frontier = bytearray(len(band))
+    start = ((2 * int(random_number() * band_height) + 1) * columns
+             + 2 * int(random_number() * ((columns - 1) // 2)) + 1)
+    band[start] = PATH
+    frontier = []
+
+    def add_to_frontier(index: int) -> None:
+        for offset in _cell_neighbours(index, band_height, columns):
+            next_index = index + offset
+            if band[next_index] == WALL and not in_frontier[next_index]:
+                in_frontier[next_index] = 1
+                frontier.append(next_index)
+
+    add_to_frontier(start)
+    while frontier:
+        # Removes a random cell from the frontier (by swapping it to the end)
+        position = int(random_number() * len(frontier))
+        frontier[position], frontier[-1] = frontier[-1], frontier[position]
+        index = frontier.pop()
+
+        joined = [offset for offset
+                  in _cell_neighbours(index, band_height, columns)
+                  if band[index + offset] == PATH]
+        offset = joined[int(random_number() * len(joined))]
+        band[index + offset // 2] = PATH
+        band[index] = PATH
+        add_to_frontier(index)
+
+
+def _braid(band: bytearray, band_height: int, columns: int,
+           generator: random.Random) -> None:
+    """ Removes the dead ends from a carved band by knocking down a random
+    wall of every cell that only has one opening.
+    """
+    random_number = generator.random
+    last_row = 2 * band_height - 1
+    for row in range(1, 2 * band_height, 2):
+        for index in range(row * columns + 1, (row + 1) * columns - 1, 2):
+            column = index % columns
+            # The walls next to the cell that face another cell of the band
+            walls = []
+            if row > 1:
+                walls.append(-columns)
+            if column < columns - 2:
+                walls.append(1)
+            if row < last_row:
+                walls.append(columns)
+            if column > 1:
+                walls.append(-1)
+            closed = [offset for offset in walls
+                      if band[index + offset] == WALL]
+            if len(walls) - len(closed) == 1 and closed:
+                band[index + closed[int(random_number() * len(closed))]] = (
+                    PATH)
+
+
+def _carve_rooms(band: bytearray, band_height: int, columns: int,
+                 generator: random.Random) -> None:
+    """ Clears open rectangular rooms (of three to twelve cells a side) out of
+    a carved band, roughly one for every 400 cells.
+    """
+    cell_columns = (columns - 1) // 2
+    for _ in range(max(1, band_height * cell_columns // 400)):
+        room_height = min(band_height, generator.randint(3, 12))
+        room_width = min(cell_columns, generator.randint(3, 12))
+        top = 2 * generator.randrange(band_height - room_height + 1) + 1
+        left = 2 * generator.randrange(cell_columns - room_width + 1) + 1
+
+        for row in range(top, top + 2 * room_height - 1):
+            start = row * columns + left
+            band[start:start + 2 * room_width - 1] = (
+                b'-' * (2 * room_width - 1))
+
+
+def _open_band_boundary(band: bytearray, columns: int, algorithm: str,
+                        generator: random.Random) -> None:
+    """ Opens the wall at the top of a band, joining it to the band above.
+    Perfect mazes get a single opening (so there is still exactly one path
+    between any two cells), the others get one every few cells.
+    """
+    cell_columns = (columns - 1) // 2
+    openings = 1
+    if algorithm in ("braided", "rooms"):
+        openings = max(1, int(cell_columns * LOOP_OPENING_RATE))
+
+    for cell_column in generator.sample(range(cell_columns), openings):
+        band[2 * cell_column + 1] = PATH
+
+
+def main() -> None:
+    """ Generates a maze from the command line.
+    """
+    parser = argparse.ArgumentParser(
+        description="Generate a maze in the bundled text format.")
+    parser.add_argument("output", help="file to write the maze to")
+    parser.add_argument("--rows", type=int, default=101,
+                        help="number of rows, rounded up to odd "
+                        "(default: 101)")
+    parser.add_argument("--columns", type=int, default=101,
+                        help="number of columns, rounded up to odd "
+                        "(default: 101)")
+    parser.add_argument("--algorithm", choices=ALGORITHMS,
+                        default="backtracker",
+                        help="generation algorithm (default: backtracker)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="random seed (default: 0)")
+    parser.add_argument("--band-cells", type=int, default=DEFAULT_BAND_CELLS,
+                        help="rows of cells generated at a time (default: "
+                        f"{DEFAULT_BAND_CELLS})")
+    arguments = parser.parse_args()
+
+    (start_point, goal_point) = generate_maze(
+        arguments.output, arguments.rows, arguments.columns,
+        arguments.algorithm, arguments.seed, arguments.band_cells)
+    print(f"Wrote {arguments.output}: start {start_point}, "
+          f"goal {goal_point}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""A compact, flat representation of a maze grid"""
+
+
+class MazeGrid():
+    """ A class that stores a maze as a flat array of bytes (one byte per
+    cell, 1 for a path and 0 for a wall) along with its width and height.
+    Positions can be addressed either by (row, column) coordinate or by flat
+    index (row * width + column), which makes passability checks O(1) and lets
+    neighbouring cells be found with simple arithmetic instead of building
+    a dictionary entry for every cell in the maze.
+
+    The grid also behaves like the read-only parts of the old maze dictionary
+    (indexing by coordinate returns '-' or '#', iteration yields coordinates
+    in row order), so code written against the dictionary keeps working.
+    """
+    PATH = 1
+    WALL = 0
+
+    def __init__(self, width: int, height: int, cells=None):
+        """ A basic constructor that stores the dimensions of the maze along
+        with the cells that make it up.
+
+        Args:
+            width (int): The number of columns in the maze.
+            height (int): The number of rows in the maze.
+            cells (bytearray, optional): The cells of the maze in row order,
+                1 for a path and 0 for a wall. Any object supporting the
+                buffer protocol (such as a memoryview) can be used, and if
+                none is provided a maze made up entirely of walls is created.
+        """
+        if cells is None:
+            cells = bytearray(width * height)
+        if len(cells) != width * height:
+            raise ValueError(f"Expected {width * height} cells for a "
+                             f"{height}x{width} maze, got {len(cells)}")
+
+        self.width = width
+        self.height = height
+        self.cells = cells
+        # Flat index offsets of the neighbouring cells, in the same order the
+        # solvers explore them in (up, right, down, left)
+        self.neighbour_offsets = (-width, 1, width, -1)
+
+    @classmethod
+    def from_dictionary(cls, maze_dictionary: dict) -> "MazeGrid":
+        """ Builds a grid from a maze dictionary.
+
+        Args:
+            maze_dictionary (dict of (int, int): str): A mapping of each
+                coordinate in the maze to a string representation of a wall
+                or path.
+
+        Returns:
+            MazeGrid: (maze_grid). The same maze stored as a flat grid.
+        """
+        height = max(row for (row, _) in maze_dictionary) + 1
+        width = max(column for (_, column) in maze_dictionary) + 1
+        maze_grid = cls(width, height)
+
+        for ((row, column), value) in maze_dictionary.items():
+            if value == '-':
+                maze_grid.cells[row * width + column] = cls.PATH
+
+        return maze_grid
+
+    def to_dictionary(self) -> dict:
+        """ Converts the grid back into a maze dictionary.
+
+        Returns:
+            dict of (int, int): str: (maze_dictionary). A mapping of each
+                coordinate in the maze to '-' for a path or '#' for a wall.
+        """
+        return dict(self.items())
+
+    def padded_cells(self) -> tuple[bytearray, int]:
+        """ Copies the cells with a wall column on the right (which is also to
+        the left of the next row) and a wall row above and below, so the
+        neighbours of any open cell can be found by adding the offsets
+        (-padded_width, 1, padded_width, -1) without any bounds checks. The
+        cell at (row, column) is at (row + 1) * padded_width + column.
+
+        Returns:
+            tuple[bytearray, int]: (padded, padded_width). The padded copy of
+                the cells along with the width of its rows.
+        """
+        (width, padded_width) = (self.width, self.width + 1)
+        padded = bytearray(padded_width * (self.height + 2))
+        for row in range(self.height):
+            start = (row + 1) * padded_width
+            padded[start:start + width] = self.cells[row * width:
+                                                     (row + 1) * width]
+        return (padded, padded_width)
+
+    def index(self, point: tuple[int, int]) -> int:
+        """ Converts a (row, column) coordinate into a flat index.
+
+        Args:
+            point (tuple[int, int]): The coordinate to convert.
+
+        Returns:
+            int: (index). The position of the coordinate in the cells array.
+        """
+        (row, column) = point
+        return row * self.width + column
+
+    def point(self, index: int) -> tuple[int, int]:
+        """ Converts a flat index into a (row, column) coordinate.
+
+        Args:
+            index (int): The position of a cell in the cells array.
+
+        Returns:
+            tuple[int, int]: (row, column). The coordinate of the cell.
+        """
+        return divmod(index, self.width)
+
+    def is_path(self, index: int) -> bool:
+        """ Checks if the cell at a flat index is a path.
+
+        Args:
+            index (int): The position of a cell in the cells array.
+
+        Returns:
+            bool: (True, False). Whether the cell can be moved through.
+        """
+        return self.cells[index] == self.PATH
+
+    def neighbour_indices(self, index: int) -> list[int]:
+        """ Finds the flat indices of the neighbouring cells that are paths,
+        in up, right, down, left order. Cells on the edge of the maze only
+        have the neighbours that are inside the maze.
+
+        Args:
+            index (int): The position of a cell in the cells array.
+
+        Returns:
+            list[int]: (neighbours). The flat indices of the open neighbours.
+        """
+        cells = self.cells
+        width = self.width
+        column = index % width
+        neighbours = []
+
+        # Up
+        if index >= width and cells[index - width]:
+            neighbours.append(index - width)
+        # Right
+        if column < width - 1 and cells[index + 1]:
+            neighbours.append(index + 1)
+        # Down
+        if index + width < len(cells) and cells[index + width]:
+            neighbours.append(index + width)
+        # Left
+        if column > 0 and cells[index - 1]:
+            neighbours.append(index - 1)
+
+        return neighbours
+
+    def open_neighbours(self, point: tuple[int, int]) -> list[(int, int)]:
+        """ Finds the coordinates of the neighbouring cells that are paths, in
+        up, right, down, left order.
+
+        Args:
+            point (tuple[int, int]): The coordinate of the current cell.
+
+        Returns:
+            list[(int, int)]: (neighbours). The coordinates of the open
+                neighbours.
+        """
+        width = self.width
+        return [divmod(index, width)
+                for index in self.neighbour_indices(self.index(point))]
+
+    def __contains__(self, point) -> bool:
+        (row, column) = point
+        return 0 <= row < self.height and 0 <= column < self.width
+
+    def __getitem__(self, point: tuple[int, int]) -> str:
+        if point not in self:
+            raise KeyError(point)
+        return '-' if self.cells[self.index(point)] else '#'
+
+    def get(self, point: tuple[int, int], default=None):
+        """ Returns the '-'/'#' value at a coordinate, or the default if the
+        coordinate is outside of the maze (mirroring dict.get()).
+        """
+        if point not in self:
+            return default
+        return self[point]
+
+    def __iter__(self):
+        for row in range(self.height):
+            for column in range(self.width):
+                yield (row, column)
+
+    def __len__(self) -> int:
+        return self.width * self.height
+
+    def items(self):
+        """ Yields ((row, column), '-'/'#') pairs in row order, mirroring
+        dict.items().
+        """
+        for point in self:
+            yield (point, self[point])
+
+
+def open_neighbours(maze, point: tuple[int, int]) -> list[(int, int)]:
+    """ Finds the neighbouring coordinates of a point that are paths, in up,
+    right, down, left order, for either a maze dictionary or a MazeGrid (or
+    any other grid with its own open_neighbours(), such as a TiledMaze).
+
+    Args:
+        maze (dict of (int, int): str or MazeGrid): The maze being searched.
+        point (tuple[int, int]): The coordinate of the current cell.
+
+    Returns:
+        list[(int, int)]: (neighbours). The coordinates of the open
+            neighbours.
+    """
+    if isinstance(maze, MazeGrid) or hasattr(maze, "open_neighbours"):
+        return maze.open_neighbours(point)
+
+    (row, column) = point
+    next_nodes = [
+        (row - 1, column),  # Up
+        (row, column + 1),  # Right
+        (row + 1, column),  # Down
+        (row, column - 1)   # Left
+    ]
+    return [(next_row, next_column) for (next_row, next_column) in next_nodes
+            if next_row >= 0 and next_column >= 0
+            and maze.get((next_row, next_column)) == '-']
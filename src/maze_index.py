@@ -0,0 +1,264 @@
+"""Answers many shortest path queries against one maze, reusing the work
+
+A MazeIndex loads a maze once and then answers shortest_path(a, b) queries
+between any two open cells. It keeps:
+    - the maze's connected components, so a query between cells that can't
+      reach each other is answered instantly without searching
+    - optionally, distance tables from a few landmark cells, which give A* a
+      much tighter (but still admissible) heuristic than the Manhattan
+      distance (the ALT technique: A*, landmarks and the triangle inequality)
+    - a least recently used cache of the results of recent queries
+
+Example, answering queries typed as 'start_row start_column goal_row
+goal_column' lines:
+    python3 maze_index.py ../docs/mazes/maze-VLarge.txt --landmarks 4
+"""
+import argparse
+import sys
+from array import array
+from collections import OrderedDict
+from a_star_search import a_star_search
+from heuristics import manhattan_distance, search_optimality
+from maze_binary import load_maze_cached
+from maze_components import MazeComponents, label_components
+from maze_components import load_components_cached
+from maze_grid import MazeGrid
+from maze_distances import UNREACHED, multi_source_distances
+
+# The number of query results kept by default
+DEFAULT_CACHE_CAPACITY = 256
+
+
+class MazeIndex():
+    """ A class that holds a maze along with the structures precomputed from
+    it, and answers shortest path queries between its cells.
+
+    optimality tags the paths it finds (see heuristics.search_optimality()),
+    and is always "optimal".
+    """
+    # The searches use a weight of 1, and the landmark bounds are admissible
+    # just like the Manhattan distance they are combined with
+    optimality = search_optimality("manhattan", 1)
+
+    def __init__(self, maze_grid: MazeGrid, landmarks: int = 0,
+                 cache_capacity: int = DEFAULT_CACHE_CAPACITY,
+                 components: MazeComponents = None):
+        """ Precomputes the connected components (and landmark distance
+        tables, if any) of a maze.
+
+        Args:
+            maze_grid (MazeGrid): The maze to answer queries on.
+            landmarks (int, optional): The number of landmark cells to build
+                distance tables from, each of which takes one breadth first
+                search of the maze and 4 bytes per cell. 0 uses the
+                Manhattan distance alone.
+            cache_capacity (int, optional): The number of query results to
+                keep, 0 to turn the cache off.
+            components (MazeComponents, optional): The maze's component
+                labels, if they have already been found (such as from the
+                cache), which are found here otherwise.
+        """
+        self.maze_grid = maze_grid
+        self.cache_capacity = cache_capacity
+        # Query results, ordered from least to most recently used
+        self.cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        if components is None:
+            components = label_components(maze_grid)
+        self.components = components
+        self.landmarks = []
+        self.landmark_distances = []
+        if landmarks > 0:
+            self._choose_landmarks(landmarks)
+
+    @classmethod
+    def from_file(cls, file_name: str, **options) -> "MazeIndex":
+        """ Loads a maze text file and its component labels (through their
+        caches) and indexes it.
+
+        Args:
+            file_name (str): The file name of the maze.
+            **options: Passed on to the constructor.
+
+        Returns:
+            MazeIndex: (maze_index). The indexed maze.
+        """
+        (maze_grid, _, _) = load_maze_cached(file_name)
+        return cls(maze_grid, components=load_components_cached(file_name),
+                   **options)
+
+    def reachable(self, start_point: tuple[int, int],
+                  goal_point: tuple[int, int]) -> bool:
+        """ Checks if there is a path between two open cells, using their
+        connected components.
+
+        Args:
+            start_point (tuple[int, int]): The coordinate of the first cell.
+            goal_point (tuple[int, int]): The coordinate of the second cell.
+
+        Raises:
+            ValueError: If either coordinate isn't an open cell of the maze.
+
+        Returns:
+            bool: (True, False). Whether the cells are connected.
+        """
+        labels = self.components.labels
+        return (labels[self._open_index(start_point)] ==
+                labels[self._open_index(goal_point)])
+
+    def shortest_path(self, start_point: tuple[int, int],
+                      goal_point: tuple[int, int]
+                      ) -> tuple[list[(int, int)], int]:
+        """ Finds the shortest path between two open cells, from the cache if
+        the same query was answered recently.
+
+        Args:
+            start_point (tuple[int, int]): The coordinate the path starts at.
+            goal_point (tuple[int, int]): The coordinate the path ends at.
+
+        Raises:
+            ValueError: If either coordinate isn't an open cell of the maze.
+
+        Returns:
+            tuple[list[(int, int)], int]: (path_taken, nodes_expanded). The
+                shortest path (or None if there isn't one) along with the
+                number of nodes the search expanded, which is 0 for cached
+                and unreachable queries. Each call returns its own copy of
+                the path.
+        """
+        key = (start_point, goal_point)
+        if key in self.cache:
+            self.cache_hits += 1
+            self.cache.move_to_end(key)
+            cached_path = self.cache[key]
+            return (None if cached_path is None else list(cached_path), 0)
+        self.cache_misses += 1
+
+        nodes_expanded = 0
+        if not self.reachable(start_point, goal_point):
+            path_taken = None
+        else:
+            (path_taken, nodes_expanded) = a_star_search(
+                self.maze_grid, start_point, goal_point,
+                heuristic=self._heuristic_for(goal_point), weight=1)
+
+        if self.cache_capacity > 0:
+            # Paths are cached as tuples and copied back out, so a caller
+            # changing the path it was given can't change later answers
+            self.cache[key] = (None if path_taken is None
+                               else tuple(path_taken))
+            if len(self.cache) > self.cache_capacity:
+                # Evicts the least recently used result
+                self.cache.popitem(last=False)
+
+        return (path_taken, nodes_expanded)
+
+    def _open_index(self, point: tuple[int, int]) -> int:
+        """ Converts a coordinate into a flat index, checking that it is an
+        open cell of the maze.
+        """
+        if point not in self.maze_grid or self.maze_grid[point] != '-':
+            raise ValueError(f"{point} is not an open cell of the maze")
+        return self.maze_grid.index(point)
+
+    def _choose_landmarks(self, count: int) -> None:
+        """ Picks landmarks spread across the largest component of the maze,
+        each one as far as possible from those already chosen, and builds a
+        distance table from each of them.
+        """
+        component_sizes = self.components.component_sizes
+        largest = max(range(len(component_sizes)),
+                      key=component_sizes.__getitem__, default=None)
+        if largest is None:
+            return
+
+        # Starts from the cell furthest from an arbitrary cell of the
+        # component, which is usually near one of its extremes
+        first_cell = self.components.labels.index(largest)
+        (closest, _) = multi_source_distances(
+            self.maze_grid, [self.maze_grid.point(first_cell)])
+
+        for _ in range(min(count, component_sizes[largest])):
+            landmark = max(range(len(closest)), key=closest.__getitem__)
+            (distances, _) = multi_source_distances(
+                self.maze_grid, [self.maze_grid.point(landmark)])
+            self.landmarks.append(self.maze_grid.point(landmark))
+            self.landmark_distances.append(distances)
+            # Tracks each cell's distance to its closest landmark so far. The
+            # arbitrary starting cell isn't a landmark, so its distances are
+            # replaced by the first landmark's rather than merged with them
+            if len(self.landmark_distances) == 1:
+                closest = distances
+            else:
+                closest = array('i', [min(old, new) if new != UNREACHED
+                                      else old for (old, new)
+                                      in zip(closest, distances)])
+
+    def _heuristic_for(self, goal_point: tuple[int, int]):
+        """ Builds the heuristic used for queries towards a goal: the largest
+        of the Manhattan distance and the landmark lower bounds.
+        """
+        goal_index = self.maze_grid.index(goal_point)
+        # Landmarks that can't reach the goal give no bound
+        tables = [(distances, distances[goal_index])
+                  for distances in self.landmark_distances
+                  if distances[goal_index] != UNREACHED]
+        if not tables:
+            return manhattan_distance
+
+        width = self.maze_grid.width
+
+        def landmark_heuristic(current_position: tuple[int, int],
+                               goal_point: tuple[int, int]) -> float:
+            # By the triangle inequality, the distance to the goal is at
+            # least the difference between the two cells' landmark distances
+            index = current_position[0] * width + current_position[1]
+            return max(manhattan_distance(current_position, goal_point),
+                       *(abs(goal_distance - distances[index])
+                         for (distances, goal_distance) in tables))
+
+        return landmark_heuristic
+
+
+def main(arguments: list[str] = None) -> None:
+    """ Indexes a maze and answers queries read from standard input, one
+    'start_row start_column goal_row goal_column' line at a time, printing
+    the length of each shortest path (or 'unreachable').
+    """
+    parser = argparse.ArgumentParser(
+        description="Answer shortest path queries against one maze.")
+    parser.add_argument("maze", help="maze file to load")
+    parser.add_argument("--landmarks", type=int, default=0,
+                        help="number of landmark distance tables to build "
+                        "(default: 0)")
+    parser.add_argument("--cache-capacity", type=int,
+                        default=DEFAULT_CACHE_CAPACITY,
+                        help="number of query results to keep (default: "
+                        f"{DEFAULT_CACHE_CAPACITY})")
+    options = parser.parse_args(arguments)
+
+    maze_index = MazeIndex.from_file(options.maze,
+                                     landmarks=options.landmarks,
+                                     cache_capacity=options.cache_capacity)
+
+    for line in sys.stdin:
+        try:
+            (start_row, start_column, goal_row,
+             goal_column) = (int(value) for value in line.split())
+            (path_taken, nodes_expanded) = maze_index.shortest_path(
+                (start_row, start_column), (goal_row, goal_column))
+        except ValueError as error:
+            print(f"error: {error}")
+            continue
+
+        if path_taken is None:
+            print("unreachable")
+        else:
+            print(f"{len(path_taken) - 1} steps ({maze_index.optimality}), "
+                  f"{nodes_expanded} nodes expanded")
+
+
+if __name__ == '__main__':
+    main()
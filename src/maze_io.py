@@ -0,0 +1,119 @@
+"""Loads maze text files into a MazeGrid in bulk"""
+import mmap
+from maze_grid import MazeGrid
+
+# Maps the characters of a maze file onto MazeGrid cell values once the
+# space separators have been removed
+CELL_TABLE = bytes.maketrans(b'-#', bytes((MazeGrid.PATH, MazeGrid.WALL)))
+# Characters that only separate cells and rows and are stripped out
+SEPARATORS = b' \t\r'
+
+
+class MazeFormatError(ValueError):
+    """ Raised when a maze file can't be turned into a valid maze, such as
+    when its rows are of different widths, it contains characters other than
+    '#' and '-', or it has no gap in its first or last row.
+    """
+
+
+def load_maze(file_name: str) -> tuple[MazeGrid, tuple[int, int],
+                                       tuple[int, int]]:
+    """ Loads a maze file into a MazeGrid, finding the start and goal points
+    in the same pass. The file is memory-mapped and the separators removed
+    with bytes.translate(), so the only per-row work done in Python is
+    validating each row's width.
+
+    The start point is the first gap ('-') in the first row of the maze and
+    the goal point is the first gap in the last row. Blank lines at the end
+    of the file are ignored.
+
+    Args:
+        file_name (str): The file name of the maze to be loaded.
+
+    Raises:
+        MazeFormatError: If the file is empty, has rows of different widths,
+            contains characters other than '#' and '-', or has no gap in its
+            first or last row.
+
+    Returns:
+        tuple[MazeGrid, tuple[int, int], tuple[int, int]]: (maze_grid,
+            start_point, goal_point). A packaged tuple containing the maze
+            along with the coordinates of its start and goal points.
+    """
+    with open(file_name, "rb") as file_pointer:
+        try:
+            with mmap.mmap(file_pointer.fileno(), 0,
+                           access=mmap.ACCESS_READ) as maze_map:
+                maze_bytes = maze_map.read()
+        except ValueError as error:
+            # mmap refuses to map an empty file
+            raise MazeFormatError(f"{file_name} is empty") from error
+
+    return parse_maze(maze_bytes, file_name)
+
+
+def parse_maze(maze_bytes: bytes, file_name: str = "<maze>"
+               ) -> tuple[MazeGrid, tuple[int, int], tuple[int, int]]:
+    """ Parses the raw contents of a maze file into a MazeGrid along with the
+    start and goal points. See load_maze() for the rules that are applied.
+
+    Args:
+        maze_bytes (bytes): The contents of a maze file.
+        file_name (str, optional): The name used to describe the maze in any
+            error messages.
+
+    Raises:
+        MazeFormatError: If the maze is malformed.
+
+    Returns:
+        tuple[MazeGrid, tuple[int, int], tuple[int, int]]: (maze_grid,
+            start_point, goal_point).
+    """
+    # Strips every separator in one go and breaks the maze into its rows
+    rows = maze_bytes.translate(None, SEPARATORS).split(b'\n')
+    # Ignores the blank lines at the end of the file
+    while rows and not rows[-1]:
+        rows.pop()
+
+    if not rows:
+        raise MazeFormatError(f"{file_name} does not contain a maze")
+
+    width = len(rows[0])
+    malformed_rows = [row for (row, line) in enumerate(rows)
+                      if len(line) != width]
+    if malformed_rows:
+        raise MazeFormatError(
+            f"{file_name}: row(s) {_describe_rows(malformed_rows)} do not "
+            f"have the same number of cells ({width}) as the first row")
+
+    body = b''.join(rows)
+    # Anything left after removing the valid characters is invalid
+    if body.translate(None, b'#-'):
+        invalid_rows = [row for (row, line) in enumerate(rows)
+                        if line.translate(None, b'#-')]
+        raise MazeFormatError(
+            f"{file_name}: row(s) {_describe_rows(invalid_rows)} contain "
+            f"characters other than '#' and '-'")
+
+    start_column = rows[0].find(b'-')
+    if start_column == -1:
+        raise MazeFormatError(f"{file_name}: the first row has no gap to "
+                              f"start the maze from")
+    goal_column = rows[-1].find(b'-')
+    if goal_column == -1:
+        raise MazeFormatError(f"{file_name}: the last row has no gap to "
+                              f"finish the maze at")
+
+    maze_grid = MazeGrid(width, len(rows),
+                         bytearray(body.translate(CELL_TABLE)))
+    return (maze_grid, (0, start_column), (len(rows) - 1, goal_column))
+
+
+def _describe_rows(rows: list[int]) -> str:
+    """ Formats a list of row numbers for an error message, only listing the
+    first few when there are many of them.
+    """
+    described = ", ".join(str(row) for row in rows[:10])
+    if len(rows) > 10:
+        described += f" (and {len(rows) - 10} more)"
+    return described
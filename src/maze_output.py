@@ -0,0 +1,324 @@
+"""Writes the path a solver took through a maze to a text file or an image
+
+The maze is written one row at a time, with the path overlaid onto each row
+from the path's cells as they are reached, so the output is never built up
+in memory as one large string and the maze passed in is left unchanged.
+
+The text output matches the bundled maze format, with every cell preceded by
+a space and the path marked with X's:
+     # X # # #
+     # X X - #
+     # # X # #
+An image can be written as well, either as a PNG (one pixel per cell, using a
+three colour palette) or as a binary greyscale PGM, chosen by the extension.
+
+The path itself can be streamed to any file-like object, either as every
+coordinate with arrows between them or compressed into runs of moves in the
+same direction:
+    arrows - (0, 1) -> (1, 1) -> (2, 1) -> (2, 2)
+    runs   - (0, 1) D×2 R×1
+"""
+import argparse
+import struct
+import zlib
+from itertools import islice
+from maze_grid import MazeGrid
+
+# The values each cell takes in a rendered row
+WALL = 0
+PATH = 1
+ROUTE = 2
+# The characters written to the text output for each cell value
+TEXT_CELLS = b'#-X'
+# The colours (red, green, blue) of each cell value in a PNG image, and the
+# grey levels of each cell value in a PGM image
+PNG_PALETTE = bytes((0, 0, 0, 255, 255, 255, 220, 30, 30))
+PGM_LEVELS = bytes((0, 255, 128))
+# The number of bytes written to a file at a time
+BUFFER_SIZE = 1 << 20
+# The ways the path can be written out by write_path()
+PATH_FORMATS = ("arrows", "runs")
+# The letter used for each (row, column) step in the runs format
+DIRECTION_LETTERS = {(-1, 0): "U", (0, 1): "R", (1, 0): "D", (0, -1): "L"}
+# The number of points or runs joined into one string before being written
+PATH_BATCH_SIZE = 4096
+
+
+def maze_output_to_file(maze, path_taken: list[(int, int)],
+                        output_path: str = "maze_path.txt",
+                        image_path: str = None) -> None:
+    """ Outputs the path the algorithm took through the maze to a text file,
+    maze_path.txt by default, where the path is indicated with X's over the
+    normal maze file. The maze is not modified.
+
+    Args:
+        maze (dict of (int, int): str or MazeGrid): The maze that's been
+            solved, either as a maze dictionary or as a MazeGrid.
+        path_taken (list[(int, int)]): A list of the coordinates (tuple of
+            int for convenience) that the algorithm passed through when
+            solving the maze, or None if no path was found.
+        output_path (str, optional): The file name to write the text output
+            to.
+        image_path (str, optional): A file name ending in .png or .pgm to
+            also write an image of the maze and path to.
+
+    Raises:
+        ValueError: If the image file name has an unsupported extension.
+    """
+    maze_grid = _as_grid(maze)
+    # Checks the image format before writing anything
+    if image_path is not None:
+        image_writer = _image_writer(image_path)
+
+    # Every cell is preceded by a space, and each row ends in a new line
+    line = bytearray(b' ' * (2 * maze_grid.width) + b'\n')
+    with open(output_path, "wb", buffering=BUFFER_SIZE) as file_pointer:
+        for row in rendered_rows(maze_grid, path_taken):
+            line[1:2 * maze_grid.width:2] = row.translate(_TEXT_TABLE)
+            file_pointer.write(line)
+
+    if image_path is not None:
+        image_writer(image_path, maze_grid, path_taken)
+
+
+def rendered_rows(maze_grid: MazeGrid, path_taken: list[(int, int)]):
+    """ Renders a maze one row at a time with the path overlaid on it.
+
+    Args:
+        maze_grid (MazeGrid): The maze that's been solved.
+        path_taken (list[(int, int)]): The coordinates of the path through
+            the maze, or None if no path was found.
+
+    Yields:
+        bytearray: (row). Each row of the maze as cell values, WALL, PATH or
+            ROUTE (a cell on the path). The rows are new copies, so the maze
+            itself is never changed.
+    """
+    # Groups the path's columns by row, so each row only looks at its own
+    # part of the path
+    route_columns = {}
+    for (row, column) in path_taken or ():
+        route_columns.setdefault(row, []).append(column)
+
+    width = maze_grid.width
+    cells = maze_grid.cells
+    for row in range(maze_grid.height):
+        rendered = bytearray(cells[row * width:(row + 1) * width])
+        for column in route_columns.get(row, ()):
+            rendered[column] = ROUTE
+        yield rendered
+
+
+def write_png(image_path: str, maze_grid: MazeGrid,
+              path_taken: list[(int, int)]) -> None:
+    """ Writes an image of the maze and path as an 8-bit palette PNG, with one
+    pixel per cell. The image data is compressed and written as the rows are
+    rendered, one IDAT chunk per block of compressed output.
+
+    Args:
+        image_path (str): The file name to write the image to.
+        maze_grid (MazeGrid): The maze that's been solved.
+        path_taken (list[(int, int)]): The coordinates of the path through
+            the maze, or None if no path was found.
+    """
+    with open(image_path, "wb", buffering=BUFFER_SIZE) as file_pointer:
+        file_pointer.write(b'\x89PNG\r\n\x1a\n')
+        # Width, height, bit depth 8, colour type 3 (palette), default
+        # compression, filtering and no interlacing
+        _write_png_chunk(file_pointer, b'IHDR', struct.pack(
+            '>IIBBBBB', maze_grid.width, maze_grid.height, 8, 3, 0, 0, 0))
+        _write_png_chunk(file_pointer, b'PLTE', PNG_PALETTE)
+
+        # Level 9 is many times slower on these long runs for little gain
+        compressor = zlib.compressobj(6)
+        for row in rendered_rows(maze_grid, path_taken):
+            # Each row starts with its filter type, 0 for none
+            compressed = compressor.compress(b'\x00' + row)
+            if compressed:
+                _write_png_chunk(file_pointer, b'IDAT', compressed)
+        _write_png_chunk(file_pointer, b'IDAT', compressor.flush())
+        _write_png_chunk(file_pointer, b'IEND', b'')
+
+
+def write_pgm(image_path: str, maze_grid: MazeGrid,
+              path_taken: list[(int, int)]) -> None:
+    """ Writes an image of the maze and path as a binary (P5) greyscale PGM,
+    with one pixel per cell, walls in black, paths in white and the path
+    taken in grey.
+
+    Args:
+        image_path (str): The file name to write the image to.
+        maze_grid (MazeGrid): The maze that's been solved.
+        path_taken (list[(int, int)]): The coordinates of the path through
+            the maze, or None if no path was found.
+    """
+    with open(image_path, "wb", buffering=BUFFER_SIZE) as file_pointer:
+        file_pointer.write(
+            f"P5\n{maze_grid.width} {maze_grid.height}\n255\n".encode())
+        for row in rendered_rows(maze_grid, path_taken):
+            file_pointer.write(row.translate(_PGM_TABLE))
+
+
+def write_path(path_taken: list[(int, int)], file_pointer,
+               path_format: str = "arrows") -> None:
+    """ Streams the path to a file-like object (such as sys.stdout) in
+    batches, followed by a new line, so a long path is never built up into one
+    large string.
+
+    Args:
+        path_taken (list[(int, int)]): The coordinates of the path through
+            the maze.
+        file_pointer (file-like): Anything with a write() method taking a
+            string.
+        path_format (str, optional): One of PATH_FORMATS, "arrows" to write
+            every coordinate or "runs" to write the start followed by runs of
+            moves in one direction.
+
+    Raises:
+        ValueError: If the path format isn't one of PATH_FORMATS.
+    """
+    if path_format == "arrows":
+        (separator, pieces) = (" -> ", map(str, path_taken))
+    elif path_format == "runs":
+        (separator, pieces) = (" ", _run_pieces(path_taken))
+    else:
+        raise ValueError(f"Unknown path format {path_format!r}, expected "
+                         f"one of {', '.join(PATH_FORMATS)}")
+
+    batch = separator.join(islice(pieces, PATH_BATCH_SIZE))
+    while batch:
+        file_pointer.write(batch)
+        batch = separator.join(islice(pieces, PATH_BATCH_SIZE))
+        if batch:
+            file_pointer.write(separator)
+    file_pointer.write("\n")
+
+
+def direction_runs(path_taken: list[(int, int)]):
+    """ Compresses a path into runs of moves in the same direction.
+
+    Args:
+        path_taken (list[(int, int)]): The coordinates of the path through
+            the maze, each one step away from the one before.
+
+    Raises:
+        ValueError: If two points next to each other in the path aren't
+            neighbouring cells.
+
+    Yields:
+        tuple[str, int]: (direction, length). The direction of each run (U,
+            R, D or L) and the number of steps in it.
+    """
+    (direction, length) = (None, 0)
+    for (previous, current) in zip(path_taken, islice(path_taken, 1, None)):
+        step = (current[0] - previous[0], current[1] - previous[1])
+        try:
+            next_direction = DIRECTION_LETTERS[step]
+        except KeyError:
+            raise ValueError(f"The path jumps from {previous} to {current}, "
+                             "which aren't neighbouring cells") from None
+
+        if next_direction == direction:
+            length += 1
+        else:
+            if direction is not None:
+                yield (direction, length)
+            (direction, length) = (next_direction, 1)
+
+    if direction is not None:
+        yield (direction, length)
+
+
+def solver_arguments(arguments: list[str] = None,
+                     statistics: bool = False,
+                     checkpoint: bool = False) -> argparse.Namespace:
+    """ Reads the optional command line arguments of a solver, so the path is
+    only printed when it is asked for, e.g. 'python3 a_star_search.py runs'.
+
+    Args:
+        arguments (list[str], optional): The arguments to read, which default
+            to the command line.
+        statistics (bool, optional): Whether the solver accepts --statistics
+            to collect and print its search statistics.
+        checkpoint (bool, optional): Whether the solver accepts --checkpoint
+            and --node-budget to pause its search and resume it later.
+
+    Returns:
+        argparse.Namespace: (options). path_format, one of PATH_FORMATS or
+            None if the path shouldn't be printed, statistics, whether the
+            search statistics were asked for, and checkpoint and node_budget,
+            the checkpoint file and the most nodes to expand (or None).
+    """
+    parser = argparse.ArgumentParser(
+        description="Solve a maze, prompting for its file name.")
+    parser.add_argument("path_format", nargs="?", choices=PATH_FORMATS,
+                        help="print the path taken in this format (default: "
+                        "don't print it)")
+    if statistics:
+        parser.add_argument("--statistics", action="store_true",
+                            help="collect and print search statistics, "
+                            "including the peak memory (slows the search "
+                            "down)")
+    if checkpoint:
+        parser.add_argument("--checkpoint", metavar="FILE",
+                            help="resume the search from this file if it "
+                            "exists, and save it here if it pauses")
+        parser.add_argument("--node-budget", type=int,
+                            help="pause the search after expanding this many "
+                            "nodes")
+    options = parser.parse_args(arguments)
+    options.statistics = getattr(options, "statistics", False)
+    options.checkpoint = getattr(options, "checkpoint", None)
+    options.node_budget = getattr(options, "node_budget", None)
+    return options
+
+
+def _run_pieces(path_taken: list[(int, int)]):
+    """ Yields the start of the path and then each run as text, such as D×12.
+    """
+    if path_taken:
+        yield str(path_taken[0])
+    for (direction, length) in direction_runs(path_taken):
+        yield f"{direction}×{length}"
+
+
+def _as_grid(maze) -> MazeGrid:
+    """ Returns the maze as a MazeGrid, converting a maze dictionary.
+    """
+    if isinstance(maze, MazeGrid):
+        return maze
+    return MazeGrid.from_dictionary(maze)
+
+
+def _image_writer(image_path: str):
+    """ Finds the function that writes an image in the format given by the
+    file name's extension.
+    """
+    extension = image_path.rsplit(".", 1)[-1].lower()
+    if extension == "png":
+        return write_png
+    if extension == "pgm":
+        return write_pgm
+    raise ValueError(f"Unsupported image format for {image_path!r}, "
+                     "expected a .png or .pgm file name")
+
+
+def _write_png_chunk(file_pointer, chunk_type: bytes, data: bytes) -> None:
+    """ Writes one PNG chunk: its length, type, data and CRC.
+    """
+    file_pointer.write(struct.pack('>I', len(data)) + chunk_type)
+    file_pointer.write(data)
+    file_pointer.write(struct.pack('>I', zlib.crc32(chunk_type + data)))
+
+
+def _translation_table(values: bytes) -> bytes:
+    """ Builds a bytes.translate() table mapping the cell values WALL, PATH
+    and ROUTE onto the given bytes.
+    """
+    table = bytearray(range(256))
+    table[WALL:ROUTE + 1] = values
+    return bytes(table)
+
+
+_TEXT_TABLE = _translation_table(TEXT_CELLS)
+_PGM_TABLE = _translation_table(PGM_LEVELS)
@@ -1,21 +1,37 @@
 """A custom implementation of a priority queue"""
+import heapq
+import itertools
 
 
 class MazePriorityQueue():
     """ A class that implements a custom priority queue (represented as a
-    dictionary for efficiency - provides direct access to elements) along with
-    a number of methods for performing operations on the queue, such as
-    insert(), is_empty(), in_queue(), pop() and changing the cost value of a
+    binary heap with lazy deletion, alongside a dictionary that provides
+    direct access to the current cost of each node) along with a number of
+    methods for performing operations on the queue, such as insert(),
+    is_empty(), in_queue(), pop(), remove() and changing the cost value of a
     node.
+
+    Ties between nodes with the same cost are broken in favour of the node
+    that was inserted into the queue most recently, so the order in which
+    nodes are expanded (and therefore the number of nodes expanded) is always
+    reproducible.
     """
     def __init__(self):
-        """ A basic constructor that initialises the priority queue as a
-        dictionary
+        """ A basic constructor that initialises the priority queue as an
+        empty heap, along with the dictionaries used to find the entries for
+        a given node.
         """
+        # Maps each (row, column) coordinate in the queue to its current cost
         self.priority_queue = {}
+        # Maps each coordinate in the queue to the order it was inserted in
+        self.insertion_order = {}
+        # The heap itself, stored as [cost, -insertion order, point] entries
+        self.heap = []
+        # Hands out increasing insertion numbers for tie-breaking
+        self.counter = itertools.count()
 
     def change_node_cost(self, data: tuple[(int, int), float]) -> None:
-        """ Finds the index of a (row, column) coordinate that is already in
+        """ Finds the entry of a (row, column) coordinate that is already in
         the queue, if the provided cost is lower than the cost that is already
         stored in the queue, it is changed to the new value.
 
@@ -27,11 +43,15 @@ class MazePriorityQueue():
         """
         # Breaks the provided data into a (point, cost) tuple
         ((current_row, current_column), new_cost_function) = data
+        point = (current_row, current_column)
 
-        if self.priority_queue[(current_row,
-                                current_column)] < new_cost_function:
-            self.priority_queue[(current_row,
-                                 current_column)] = new_cost_function
+        if new_cost_function < self.priority_queue[point]:
+            self.priority_queue[point] = new_cost_function
+            # The stale entry is left in the heap and skipped when popped,
+            # the node keeps its original insertion order for tie-breaking
+            heapq.heappush(self.heap, (new_cost_function,
+                                       -self.insertion_order[point],
+                                       point))
 
     def insert(self, data: tuple[(int, int), float]) -> None:
         """ Inserts the provided data into the priority queue.
@@ -43,8 +63,12 @@ class MazePriorityQueue():
         """
         # Breaks the provided data into a (point, cost) tuple
         ((row, column), cost) = data
+        order = next(self.counter)
         # Adds a new key (point) value (cost) pair to the priority queue
         self.priority_queue[row, column] = cost
+        self.insertion_order[row, column] = order
+        # Negating the insertion order makes the newest node win any ties
+        heapq.heappush(self.heap, (cost, -order, (row, column)))
 
     def in_queue(self, data: tuple[int, int]) -> bool:
         """ Checks if the provided coordinate is in the priority queue
@@ -66,6 +90,23 @@ class MazePriorityQueue():
 
         return False
 
+    def remove(self, data: tuple[int, int]) -> None:
+        """ Removes the provided coordinate from the priority queue, such as
+        before inserting it again with a higher cost.
+
+        Args:
+            data (tuple[int, int]): A packaged tuple containing the row and
+                column of the coordinate being removed, which must be in the
+                queue.
+        """
+        # Breaks the provided data into a tuple of the coordinate
+        (row, column) = data
+
+        # The node's entry is left in the heap and skipped when popped, as it
+        # no longer matches a node in the queue
+        del self.priority_queue[row, column]
+        del self.insertion_order[row, column]
+
     def is_empty(self) -> bool:
         """ Checks if the priority queue is empty.
 
@@ -78,6 +119,24 @@ class MazePriorityQueue():
 
         return False
 
+    def queue_peek(self) -> tuple[(int, int), float]:
+        """ Returns the element in the priority queue with the highest
+        priority (lowest f(x)) without removing it from the queue.
+
+        Returns:
+            tuple[(int, int), float]: (next_node). A packaged tuple containing
+                the (row, column) coordinates and f(x) of the node that would
+                be returned by queue_pop().
+        """
+        # Discards stale entries from the top of the heap until a live one is
+        # found, so the next pop doesn't have to
+        while True:
+            (cost, negative_order, point) = self.heap[0]
+            if (self.priority_queue.get(point) == cost and
+                    self.insertion_order[point] == -negative_order):
+                return (point, cost)
+            heapq.heappop(self.heap)
+
     def queue_pop(self) -> tuple[(int, int), float]:
         """ Returns and removes the element in the priority queue with the
         highest priority (lowest f(x)).
@@ -87,20 +146,18 @@ class MazePriorityQueue():
                 the f(x) and (row, column) coordinates of the next node to be
                 explored by the algorithm.
         """
-        # Initialises the lowest cost/ point as the first item in the priority
-        # queue
-        lowest_item = next(iter(self.priority_queue))
-        lowest_cost = self.priority_queue[lowest_item]
-
-        # Loops through the entire priority queue until it has found the
-        # coordinate with the lowest cost
-        for item in self.priority_queue:
-            if self.priority_queue[item] <= lowest_cost:
-                lowest_item = item
-                lowest_cost = self.priority_queue[item]
+        while True:
+            (cost, negative_order, point) = heapq.heappop(self.heap)
+
+            # Skips entries that have been superseded by a lower cost, or
+            # whose node has already been removed from the queue
+            if (self.priority_queue.get(point) == cost and
+                    self.insertion_order[point] == -negative_order):
+                break
 
         # Packages the coordinates and respective cost to be returned into a
         # tuple and removes it from the priority queue before returning it
-        next_node = (lowest_item, self.priority_queue[lowest_item])
-        del self.priority_queue[lowest_item]
+        next_node = (point, cost)
+        del self.priority_queue[point]
+        del self.insertion_order[point]
         return next_node
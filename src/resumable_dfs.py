@@ -0,0 +1,507 @@
+"""A recursion free depth first search that can be paused, saved and resumed
+
+The search explores the maze in the same order as a recursive depth first
+search (trying the left, down, right and up neighbours of each cell in turn,
+and going as deep as it can before backtracking), but keeps its own stack of
+frames instead of using Python's call stack, so it works on mazes of any size
+without hitting the recursion limit. Each frame is just a cell id in a padded
+copy of the maze (see MazeGrid.padded_cells()) and the index of the next
+direction to try from it, held in an array and a bytearray, so the memory
+used is a few bytes per cell whatever the maze looks like.
+
+Cells are marked as visited when they are entered and each one is entered at
+most once, so the number of nodes expanded is the number of distinct cells
+entered. The search stops as soon as it enters the goal, and the frames on
+the stack at that point are the path from the start to the goal.
+
+A ResumableDFS can be advanced a number of expansions at a time and its whole
+state saved to a checkpoint file and loaded back later, even in another
+process:
+    search = ResumableDFS(maze_grid, start_point, goal_point)
+    if not search.advance(node_budget=1000000):
+        search.save("maze-VLarge.mazd")
+    ...
+    search = ResumableDFS.load("maze-VLarge.mazd", maze_grid)
+    search.advance()
+    (path_taken, nodes_expanded) = search.result()
+
+A checkpoint file is a fixed size header followed by the frame cells, the
+frame directions and the unvisited cells of the padded maze.
+"""
+import os
+import struct
+import time
+import zlib
+from array import array
+from maze_grid import MazeGrid
+from maze_io import MazeFormatError
+from maze_binary import load_maze_cached
+from maze_components import load_components_cached
+from iterative_depth_first_search import performance_statistics
+from maze_output import maze_output_to_file, solver_arguments
+from search_statistics import SearchStatistics, tracking_memory
+from search_progress import SearchProgress
+
+# The number of directions tried from each cell, after which a frame is done
+DIRECTION_COUNT = 4
+MAGIC = b'MAZD'
+VERSION = 1
+# Magic, version, bytes per frame cell, width, height, the start and goal
+# coordinates, whether the search has finished and found the goal, the
+# number of nodes expanded, the number of frames, the deepest the stack has
+# been and the CRC-32 of the maze's cells
+HEADER = struct.Struct('<4sHH6I2B3QI')
+# File extension used for checkpoint files
+EXTENSION = '.mazd'
+
+
+class ResumableDFS():
+    """ A class that holds the whole state of a depth first search, which can
+    be advanced a budget of expansions at a time and saved to (or loaded
+    from) a checkpoint file between advances.
+    """
+    def __init__(self, maze, start_point: tuple[int, int],
+                 goal_point: tuple[int, int],
+                 statistics: SearchStatistics = None):
+        """ Sets up a search that has only entered the start.
+
+        Args:
+            maze (dict of (int, int): str or MazeGrid): The maze being solved,
+                either as a maze dictionary or as a MazeGrid.
+            start_point (tuple[int, int]): A coordinate (int, int) tuple
+                indicating when the algorithm starts when solving the maze.
+            goal_point (tuple[int, int]): A coordinate (int, int) tuple
+                indicating when the algorithm ends when solving the maze.
+            statistics (SearchStatistics, optional): If provided, the search
+                records the deepest its stack went, the number of nodes in
+                its visited set and the number of open neighbours of the
+                cells it entered (other than the goal) into it.
+        """
+        if not isinstance(maze, MazeGrid):
+            maze = MazeGrid.from_dictionary(maze)
+
+        self.width = maze.width
+        self.height = maze.height
+        self.start_point = start_point
+        self.goal_point = goal_point
+        self.statistics = statistics
+        self.checksum = zlib.crc32(maze.cells)
+
+        # Cells are walled off in the padded copy once they have been entered,
+        # so it doubles as the visited set
+        (self.unvisited, self.padded_width) = maze.padded_cells()
+        start = self._cell_id(start_point)
+        self.goal = self._cell_id(goal_point)
+        self.unvisited[start] = 0
+
+        # The frames of the stack, as the cell of each along with the index
+        # (into the left, down, right, up order) of the next direction to try
+        self.frame_cells = array(_cell_typecode(len(self.unvisited)), [start])
+        self.frame_directions = bytearray(1)
+        self.nodes_expanded = 1
+        self.max_depth = 1
+        self.found = start == self.goal
+        self.finished = self.found
+
+        # The maze's own padded cells are only kept when the statistics are
+        # being collected, to count the open neighbours of each cell entered
+        self.open_cells = None
+        self.neighbour_checks = 0
+        if statistics is not None:
+            (self.open_cells, _) = maze.padded_cells()
+            if not self.found:
+                self.neighbour_checks = self._open_degree(start)
+        self._record_statistics()
+
+    def advance(self, node_budget: int = None) -> bool:
+        """ Continues the search until it finishes or has expanded node_budget
+        more nodes.
+
+        Args:
+            node_budget (int, optional): The most nodes to expand before
+                pausing, or None to run until the search finishes.
+
+        Returns:
+            bool: (True, False). Whether the search has finished.
+        """
+        if self.finished:
+            return True
+
+        padded_width = self.padded_width
+        # Offsets of the neighbouring cells in the order a recursive search
+        # tries them: left, down, right, up
+        offsets = (-1, padded_width, 1, -padded_width)
+        unvisited = self.unvisited
+        frame_cells = self.frame_cells
+        frame_directions = self.frame_directions
+        goal = self.goal
+        nodes_expanded = self.nodes_expanded
+        depth = len(frame_cells)
+        max_depth = self.max_depth
+        open_cells = self.open_cells
+        neighbour_checks = self.neighbour_checks
+        # The number of expansions at which the search pauses
+        pause_at = (nodes_expanded + node_budget if node_budget is not None
+                    else -1)
+
+        while depth:
+            # Tries the remaining directions of the frame on top of the stack
+            # until one leads to an unvisited cell
+            current = frame_cells[-1]
+            direction = frame_directions[-1]
+            while direction < DIRECTION_COUNT:
+                neighbour = current + offsets[direction]
+                direction += 1
+                if unvisited[neighbour]:
+                    break
+            else:
+                # Every direction has been tried, so backtracks to the cell
+                # this one was entered from
+                frame_cells.pop()
+                frame_directions.pop()
+                depth -= 1
+                continue
+
+            # Saves where this frame got up to and enters the neighbour, as
+            # the recursive call would
+            frame_directions[-1] = direction
+            unvisited[neighbour] = 0
+            frame_cells.append(neighbour)
+            frame_directions.append(0)
+            depth += 1
+            nodes_expanded += 1
+            if depth > max_depth:
+                max_depth = depth
+
+            if neighbour == goal:
+                self.found = True
+                break
+            if open_cells is not None:
+                neighbour_checks += (open_cells[neighbour - 1]
+                                     + open_cells[neighbour + padded_width]
+                                     + open_cells[neighbour + 1]
+                                     + open_cells[neighbour - padded_width])
+            if nodes_expanded == pause_at:
+                break
+
+        self.nodes_expanded = nodes_expanded
+        self.max_depth = max_depth
+        self.neighbour_checks = neighbour_checks
+        self.finished = self.found or not depth
+        self._record_statistics()
+        return self.finished
+
+    def progress(self) -> SearchProgress:
+        """ Takes a snapshot of the search.
+
+        Returns:
+            SearchProgress: (progress). The cell on top of the stack, the
+                number of nodes expanded and the number of frames on the
+                stack.
+        """
+        current_point = (self._point(self.frame_cells[-1])
+                         if self.frame_cells else None)
+        return SearchProgress(current_point, self.nodes_expanded,
+                              len(self.frame_cells), self.nodes_expanded,
+                              self.statistics)
+
+    def result(self) -> tuple[list[(int, int)], int]:
+        """ Gives the result of the search so far.
+
+        Returns:
+            tuple[list[(int, int)], int]: (path_taken, nodes_expanded). The
+                path through the maze if the goal has been found (otherwise
+                None) along with the number of nodes expanded.
+        """
+        if not self.found:
+            return (None, self.nodes_expanded)
+        return ([self._point(cell) for cell in self.frame_cells],
+                self.nodes_expanded)
+
+    def save(self, file_name: str) -> None:
+        """ Writes the state of the search to a checkpoint file, under a
+        temporary name first so a reader never sees a half-written file.
+
+        Args:
+            file_name (str): The file name to write the checkpoint to.
+        """
+        header = HEADER.pack(MAGIC, VERSION, self.frame_cells.itemsize,
+                             self.width, self.height, *self.start_point,
+                             *self.goal_point, self.finished, self.found,
+                             self.nodes_expanded, len(self.frame_cells),
+                             self.max_depth, self.checksum)
+
+        temporary_path = f"{file_name}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as file_pointer:
+            file_pointer.write(header)
+            self.frame_cells.tofile(file_pointer)
+            file_pointer.write(self.frame_directions)
+            file_pointer.write(self.unvisited)
+        os.replace(temporary_path, file_name)
+
+    @classmethod
+    def load(cls, file_name: str, maze=None,
+             statistics: SearchStatistics = None) -> "ResumableDFS":
+        """ Loads a search from a checkpoint file, ready to be advanced
+        further.
+
+        Args:
+            file_name (str): The file name of the checkpoint.
+            maze (dict of (int, int): str or MazeGrid, optional): The maze
+                the search is solving, which is checked against the one the
+                checkpoint was saved from if provided.
+            statistics (SearchStatistics, optional): See ResumableDFS(). The
+                neighbours checked are only counted if the maze is provided
+                too.
+
+        Raises:
+            MazeFormatError: If the file isn't a valid checkpoint file.
+            ValueError: If the checkpoint was saved from a different maze.
+
+        Returns:
+            ResumableDFS: (search). The search as it was when it was saved.
+        """
+        with open(file_name, "rb") as file_pointer:
+            header = file_pointer.read(HEADER.size)
+            if len(header) < HEADER.size or header[:4] != MAGIC:
+                raise MazeFormatError(f"{file_name} is not a search "
+                                      "checkpoint file")
+
+            (_, version, cell_size, width, height, start_row, start_column,
+             goal_row, goal_column, finished, found, nodes_expanded,
+             frame_count, max_depth, checksum) = HEADER.unpack(header)
+            if version != VERSION:
+                raise MazeFormatError(f"{file_name} uses an unsupported "
+                                      f"checkpoint version ({version})")
+
+            padded_width = width + 1
+            cell_count = padded_width * (height + 2)
+            frame_cells = array(_cell_typecode(cell_count))
+            if frame_cells.itemsize != cell_size:
+                raise MazeFormatError(f"{file_name} stores its frames in an "
+                                      f"unsupported format ({cell_size})")
+            try:
+                frame_cells.fromfile(file_pointer, frame_count)
+            except EOFError:
+                raise MazeFormatError(f"{file_name} is truncated") from None
+            frame_directions = bytearray(file_pointer.read(frame_count))
+            unvisited = bytearray(file_pointer.read(cell_count))
+            if (len(frame_directions) != frame_count
+                    or len(unvisited) != cell_count):
+                raise MazeFormatError(f"{file_name} is truncated")
+
+        if maze is not None:
+            if not isinstance(maze, MazeGrid):
+                maze = MazeGrid.from_dictionary(maze)
+            if ((maze.width, maze.height) != (width, height)
+                    or zlib.crc32(maze.cells) != checksum):
+                raise ValueError(f"{file_name} was saved from a different "
+                                 "maze")
+
+        # Fills the state in directly, as __init__ starts a new search
+        search = cls.__new__(cls)
+        search.width = width
+        search.height = height
+        search.start_point = (start_row, start_column)
+        search.goal_point = (goal_row, goal_column)
+        search.statistics = statistics
+        search.checksum = checksum
+        search.unvisited = unvisited
+        search.padded_width = padded_width
+        search.goal = search._cell_id(search.goal_point)
+        search.frame_cells = frame_cells
+        search.frame_directions = frame_directions
+        search.nodes_expanded = nodes_expanded
+        search.max_depth = max_depth
+        search.found = bool(found)
+        search.finished = bool(finished)
+
+        # The checkpoint doesn't hold the neighbours checked so far, but they
+        # can be counted again from the cells that have been entered
+        search.open_cells = None
+        search.neighbour_checks = 0
+        if statistics is not None and maze is not None:
+            (search.open_cells, _) = maze.padded_cells()
+            search.neighbour_checks = sum(
+                search._open_degree(cell)
+                for (cell, is_open) in enumerate(search.open_cells)
+                if is_open and not unvisited[cell] and cell != search.goal)
+        search._record_statistics()
+        return search
+
+    def _cell_id(self, point: tuple[int, int]) -> int:
+        """ Converts a coordinate into its cell id in the padded maze.
+        """
+        return (point[0] + 1) * self.padded_width + point[1]
+
+    def _point(self, cell: int) -> tuple[int, int]:
+        """ Converts a cell id in the padded maze back into a coordinate.
+        """
+        return (cell // self.padded_width - 1, cell % self.padded_width)
+
+    def _open_degree(self, cell: int) -> int:
+        """ Counts the open neighbours of a cell in the padded maze.
+        """
+        open_cells = self.open_cells
+        padded_width = self.padded_width
+        return (open_cells[cell - 1] + open_cells[cell + padded_width]
+                + open_cells[cell + 1] + open_cells[cell - padded_width])
+
+    def _record_statistics(self) -> None:
+        """ Copies the stack's deepest point, the size of the visited set and
+        the number of neighbours checked into the statistics, if they are
+        being collected.
+        """
+        if self.statistics is not None:
+            self.statistics.max_frontier_size = self.max_depth
+            self.statistics.visited_nodes = self.nodes_expanded
+            if self.open_cells is not None:
+                self.statistics.neighbour_checks = self.neighbour_checks
+
+
+def resumable_dfs(maze, start_point: tuple[int, int],
+                  goal_point: tuple[int, int],
+                  statistics: SearchStatistics = None
+                  ) -> tuple[list[(int, int)], int]:
+    """ Executes a depth first search in the recursive order on the provided
+    maze, without recursing, and returns the path from the start to the goal
+    node.
+
+    Args:
+        maze (dict of (int, int): str or MazeGrid): The maze being solved,
+            either as a maze dictionary or as a MazeGrid.
+        start_point (tuple[int, int]): A coordinate (int, int) tuple indicating
+            when the algorithm starts when solving the maze.
+        goal_point (tuple[int, int]): A coordinate (int, int) tuple indicating
+            when the algorithm ends when solving the maze.
+        statistics (SearchStatistics, optional): See ResumableDFS().
+
+    Returns:
+        tuple[list[(int, int)], int]: (path_taken, nodes_expanded). A packaged
+            tuple containing the path through the maze (or None if the goal
+            can't be reached) along with the number of nodes expanded.
+    """
+    search = ResumableDFS(maze, start_point, goal_point, statistics)
+    search.advance()
+    return search.result()
+
+
+def resumable_dfs_steps(maze, start_point: tuple[int, int],
+                        goal_point: tuple[int, int],
+                        statistics: SearchStatistics = None,
+                        batch_size: int = 1):
+    """ Executes resumable_dfs() one batch of expansions at a time, as a
+    generator in the same way as iterative_depth_first_search's
+    iterative_dfs_steps() (see search_progress.run_with_budget()).
+
+    Args:
+        maze (dict of (int, int): str or MazeGrid): The maze being solved.
+        start_point (tuple[int, int]): A coordinate (int, int) tuple indicating
+            when the algorithm starts when solving the maze.
+        goal_point (tuple[int, int]): A coordinate (int, int) tuple indicating
+            when the algorithm ends when solving the maze.
+        statistics (SearchStatistics, optional): See ResumableDFS().
+        batch_size (int, optional): The number of expansions between each
+            yield, 0 to never yield.
+
+    Yields:
+        SearchProgress: (progress). A snapshot of the search after each
+            batch of expansions.
+
+    Returns:
+        tuple[list[(int, int)], int]: (path_taken, nodes_expanded). The result
+            of the search, as the value of the StopIteration raised when the
+            generator finishes.
+    """
+    search = ResumableDFS(maze, start_point, goal_point, statistics)
+    while not search.advance(batch_size if batch_size > 0 else None):
+        yield search.progress()
+    return search.result()
+
+
+def maze_solver(file_name: str, path_format: str = None,
+                collect_statistics: bool = False,
+                checkpoint_file: str = None, node_budget: int = None
+                ) -> None:
+    """ Uses the resumable depth first search to solve a maze and prints out
+    statistics about the algorithm's performance solving the maze, incl the
+    number of nodes explored, the execution time and the number of steps in
+    the path. With a checkpoint file and a node budget, a search that runs
+    out of budget is saved and picked up from the same point next time.
+
+    Args:
+        file_name (str): The file name of the maze to be solved, provided as a
+            string so that it can be used to open the maze file directly.
+        path_format (str, optional): How to print the path taken, one of
+            maze_output.PATH_FORMATS, or None (the default) to skip printing
+            it.
+        collect_statistics (bool, optional): Whether to collect and print
+            the search statistics, including the peak memory used.
+        checkpoint_file (str, optional): The file to resume the search from
+            (if it exists) and to save it to if it pauses.
+        node_budget (int, optional): The most nodes to expand in this run.
+    """
+    # Loads the maze (from the binary cache if it is fresh) into a flat grid
+    # along with its start and goal points
+    (maze_grid, start_point, goal_point) = load_maze_cached(file_name)
+    # Loads the maze's connected components (from the cache if they are
+    # fresh), so an unreachable goal is answered without searching
+    components = load_components_cached(file_name)
+
+    statistics = SearchStatistics() if collect_statistics else None
+    start_time = time.time()
+    with tracking_memory(statistics):
+        if checkpoint_file is not None and os.path.exists(checkpoint_file):
+            search = ResumableDFS.load(checkpoint_file, maze_grid, statistics)
+        elif components.reachable(start_point, goal_point):
+            search = ResumableDFS(maze_grid, start_point, goal_point,
+                                  statistics)
+        else:
+            search = None
+        finished = search is None or search.advance(node_budget)
+    end_time = time.time()
+
+    if not finished:
+        if checkpoint_file is None:
+            print(f"The search was stopped after {search.nodes_expanded} "
+                  "nodes")
+        else:
+            search.save(checkpoint_file)
+            print(f"The search was paused after {search.nodes_expanded} "
+                  f"nodes, run again to resume it from {checkpoint_file}")
+        return
+    if checkpoint_file is not None and os.path.exists(checkpoint_file):
+        os.remove(checkpoint_file)
+
+    (maze_path_dfs, nodes_expanded) = (search.result() if search is not None
+                                       else (None, 0))
+
+    # Prints out all the algorithm's performance statistics
+    performance_statistics((len(maze_path_dfs) - 1
+                            if maze_path_dfs is not None else None),
+                           nodes_expanded,
+                           round(end_time - start_time, 5),
+                           (maze_path_dfs if path_format is not None
+                            else None),
+                           path_format,
+                           statistics
+                           )
+
+    # Outputs the algorithms path through the maze to the file maze_path.txt
+    maze_output_to_file(maze_grid, maze_path_dfs)
+
+
+def _cell_typecode(cell_count: int) -> str:
+    """ Picks the smallest array type that can hold every cell id.
+    """
+    return 'i' if cell_count < 2 ** 31 else 'q'
+
+
+if __name__ == '__main__':
+    # The path and statistics are only printed if asked for on the command
+    # line, and the search is only checkpointed if given a file
+    OPTIONS = solver_arguments(statistics=True, checkpoint=True)
+    MAZE_FILE_NAME = str(input(
+                    "Enter the file_name of the maze you would like solved: "))
+    maze_solver("../docs/mazes/" + MAZE_FILE_NAME, OPTIONS.path_format,
+                OPTIONS.statistics, OPTIONS.checkpoint, OPTIONS.node_budget)
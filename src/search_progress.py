@@ -0,0 +1,117 @@
+"""Step by step running of the searches, with budgets and cancellation
+
+a_star_steps() and iterative_dfs_steps() are generator versions of the
+searches that yield a SearchProgress after every batch of expansions and
+return the usual (path_taken, nodes_expanded) tuple when they finish (as the
+value of the StopIteration). a_star_search() and iterative_dfs() simply drain
+them with run_to_completion(), so the two always behave the same.
+
+Driving the generator directly lets a caller watch the search's progress on
+a huge maze, or stop it part way, such as with run_with_budget():
+    search_steps = a_star_steps(maze_grid, start_point, goal_point,
+                                batch_size=1000)
+    (path_taken, nodes_expanded, stop_reason) = run_with_budget(
+        search_steps, time_budget=0.5)
+"""
+import time
+
+# The reasons run_with_budget() can stop a search early
+NODE_BUDGET = "node_budget"
+TIME_BUDGET = "time_budget"
+CANCELLED = "cancelled"
+
+
+class SearchProgress():
+    """ A class that holds a snapshot of a search, taken after one of its
+    expansions:
+
+        current_point - the coordinate that was just expanded
+        nodes_expanded - the number of nodes expanded so far
+        frontier_size - the number of nodes waiting to be expanded
+        visited_nodes - the number of nodes in the visited set
+        statistics - the SearchStatistics the search is recording into (as
+                     they are so far), or None
+    """
+    __slots__ = ("current_point", "nodes_expanded", "frontier_size",
+                 "visited_nodes", "statistics")
+
+    def __init__(self, current_point: tuple[int, int], nodes_expanded: int,
+                 frontier_size: int, visited_nodes: int, statistics=None):
+        """ A basic constructor that stores the snapshot.
+        """
+        self.current_point = current_point
+        self.nodes_expanded = nodes_expanded
+        self.frontier_size = frontier_size
+        self.visited_nodes = visited_nodes
+        self.statistics = statistics
+
+    def __repr__(self) -> str:
+        return (f"SearchProgress(current_point={self.current_point}, "
+                f"nodes_expanded={self.nodes_expanded}, "
+                f"frontier_size={self.frontier_size}, "
+                f"visited_nodes={self.visited_nodes})")
+
+
+def run_to_completion(search_steps) -> tuple[list[(int, int)], int]:
+    """ Runs a step by step search until it finishes.
+
+    Args:
+        search_steps (generator): A search generator, such as from
+            a_star_steps().
+
+    Returns:
+        tuple[list[(int, int)], int]: (path_taken, nodes_expanded). The
+            result of the search.
+    """
+    while True:
+        try:
+            next(search_steps)
+        except StopIteration as finished:
+            return finished.value
+
+
+def run_with_budget(search_steps, node_budget: int = None,
+                    time_budget: float = None, should_cancel=None
+                    ) -> tuple[list[(int, int)], int, str]:
+    """ Runs a step by step search until it finishes or goes over a budget.
+    The budgets are checked each time the search yields, so a search may go
+    over them by up to one batch of expansions.
+
+    Args:
+        search_steps (generator): A search generator, such as from
+            a_star_steps().
+        node_budget (int, optional): The most nodes the search may expand.
+        time_budget (float, optional): The most time (in seconds) the search
+            may take.
+        should_cancel (callable, optional): Called with each SearchProgress,
+            returning True stops the search.
+
+    Returns:
+        tuple[list[(int, int)], int, str]: (path_taken, nodes_expanded,
+            stop_reason). The result of the search along with None if it
+            finished, or NODE_BUDGET, TIME_BUDGET or CANCELLED if it was
+            stopped (in which case the path is None).
+    """
+    deadline = (time.perf_counter() + time_budget
+                if time_budget is not None else None)
+    nodes_expanded = 0
+
+    while True:
+        try:
+            progress = next(search_steps)
+        except StopIteration as finished:
+            (path_taken, nodes_expanded) = finished.value
+            return (path_taken, nodes_expanded, None)
+
+        nodes_expanded = progress.nodes_expanded
+        if node_budget is not None and nodes_expanded >= node_budget:
+            stop_reason = NODE_BUDGET
+        elif deadline is not None and time.perf_counter() >= deadline:
+            stop_reason = TIME_BUDGET
+        elif should_cancel is not None and should_cancel(progress):
+            stop_reason = CANCELLED
+        else:
+            continue
+
+        search_steps.close()
+        return (None, nodes_expanded, stop_reason)
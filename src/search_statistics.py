@@ -0,0 +1,187 @@
+"""Optional instrumentation of the searches, collected into one object
+
+A SearchStatistics object is passed to a search to have it record how much
+work it did beyond the number of nodes expanded. The counting is done by
+instrumented versions of the data structures the searches already use (the
+priority queue, the stack and the neighbour function), which the search
+swaps in before it starts. When no statistics object is passed the searches
+use the plain versions, so turning the instrumentation off costs nothing
+inside the search loop.
+"""
+import tracemalloc
+from contextlib import contextmanager
+from priority_queue import MazePriorityQueue
+
+
+class SearchStatistics():
+    """ A class that holds the statistics collected while solving a maze:
+
+        peak_memory - the most memory (in bytes) allocated by Python during
+                      the search, measured with tracemalloc
+        max_frontier_size - the most nodes waiting in the frontier (the
+                            priority queue, the stack or the recursion) at
+                            once
+        visited_nodes - the number of nodes in the visited set at the end of
+                        the search
+        neighbour_checks - the number of open neighbouring nodes looked at
+        cost_improvements - the number of times a cheaper route was found
+                            to a node already in the frontier (A* only)
+        jump_points - the number of distinct jump points added to the
+                      frontier (jump point search only)
+        cells_scanned - the number of cells looked at while jumping (jump
+                        point search only)
+
+    Statistics that a search doesn't collect are left as None.
+    """
+    def __init__(self):
+        """ A basic constructor that starts every statistic off as None (not
+        collected).
+        """
+        self.peak_memory = None
+        self.max_frontier_size = None
+        self.visited_nodes = None
+        self.neighbour_checks = None
+        self.cost_improvements = None
+        self.jump_points = None
+        self.cells_scanned = None
+
+    def __str__(self) -> str:
+        """ Formats the collected statistics in the same way as the rest of
+        the performance statistics, one per line.
+        """
+        lines = []
+        if self.peak_memory is not None:
+            lines.append("The peak memory allocated during the search was: "
+                         f"  {self.peak_memory / 1024:.1f} KiB")
+        for (label, value) in (
+                ("The largest the frontier grew to was:             ",
+                 self.max_frontier_size),
+                ("The number of nodes in the visited set was:       ",
+                 self.visited_nodes),
+                ("The number of neighbouring nodes checked was:     ",
+                 self.neighbour_checks),
+                ("The number of frontier cost improvements was:     ",
+                 self.cost_improvements),
+                ("The number of jump points found was:              ",
+                 self.jump_points),
+                ("The number of cells scanned by jumps was:         ",
+                 self.cells_scanned)):
+            if value is not None:
+                lines.append(f"{label}  {value}")
+        return "\n".join(lines)
+
+    def as_dictionary(self) -> dict:
+        """ Converts the statistics into a dictionary, such as for writing
+        them out as JSON.
+
+        Returns:
+            dict: (statistics). Each statistic's name mapped onto its value.
+        """
+        return dict(vars(self))
+
+    def counting_neighbours(self, neighbour_function):
+        """ Wraps a neighbour function (such as maze_grid.open_neighbours) so
+        that it adds the number of neighbours it finds to neighbour_checks.
+
+        Args:
+            neighbour_function (callable): A function taking (maze, point)
+                and returning a list of the open neighbouring points.
+
+        Returns:
+            callable: (counted_neighbour_function). The wrapped function.
+        """
+        self.neighbour_checks = 0
+
+        def counted_neighbour_function(maze, point):
+            neighbours = neighbour_function(maze, point)
+            self.neighbour_checks += len(neighbours)
+            return neighbours
+
+        return counted_neighbour_function
+
+
+@contextmanager
+def tracking_memory(statistics: SearchStatistics):
+    """ A context manager that records the peak memory allocated by Python
+    while it is active into the statistics' peak_memory, or does nothing if
+    the statistics are None. Tracing memory slows the code inside it down
+    considerably, so its timings should be taken with a pinch of salt.
+
+    Args:
+        statistics (SearchStatistics or None): Where the peak memory is
+            recorded.
+    """
+    if statistics is None:
+        yield
+        return
+
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    (start_memory, _) = tracemalloc.get_traced_memory()
+    try:
+        yield
+    finally:
+        (_, peak_memory) = tracemalloc.get_traced_memory()
+        statistics.peak_memory = peak_memory - start_memory
+        if not already_tracing:
+            tracemalloc.stop()
+
+
+class InstrumentedPriorityQueue(MazePriorityQueue):
+    """ A MazePriorityQueue that records the largest size the queue grows to
+    and the number of times a node's cost is lowered in a SearchStatistics
+    object.
+    """
+    def __init__(self, statistics: SearchStatistics):
+        """ Creates an empty queue that records into the statistics.
+
+        Args:
+            statistics (SearchStatistics): Where the statistics are recorded.
+        """
+        super().__init__()
+        self.statistics = statistics
+        statistics.max_frontier_size = 0
+        statistics.cost_improvements = 0
+
+    def insert(self, data: tuple[(int, int), float]) -> None:
+        """ Inserts the data into the queue (see MazePriorityQueue.insert()),
+        updating the largest size of the queue.
+        """
+        super().insert(data)
+        self.statistics.max_frontier_size = max(
+            self.statistics.max_frontier_size, len(self.priority_queue))
+
+    def change_node_cost(self, data: tuple[(int, int), float]) -> None:
+        """ Lowers the cost of a node in the queue (see
+        MazePriorityQueue.change_node_cost()), counting the improvement.
+        """
+        super().change_node_cost(data)
+        self.statistics.cost_improvements += 1
+
+
+class InstrumentedStack(list):
+    """ A list used as a stack that records the largest size it grows to in
+    a SearchStatistics object.
+    """
+    def __init__(self, statistics: SearchStatistics, items=()):
+        """ Creates a stack holding the items that records into the
+        statistics.
+
+        Args:
+            statistics (SearchStatistics): Where the statistics are recorded.
+            items (iterable, optional): The items the stack starts with.
+        """
+        super().__init__(items)
+        self.statistics = statistics
+        statistics.max_frontier_size = len(self)
+
+    def append(self, item) -> None:
+        """ Pushes an item onto the stack, updating the largest size of the
+        stack.
+        """
+        super().append(item)
+        if len(self) > self.statistics.max_frontier_size:
+            self.statistics.max_frontier_size = len(self)
+
@@ -0,0 +1,398 @@
+"""Mazes held in shared memory, so worker processes can search them zero-copy
+
+When several processes search the same large maze, each one normally holds
+its own copy of the grid and of its connected component labels (4 bytes per
+cell), so the memory used grows with the number of workers. A SharedMaze is
+loaded once by the parent process into a multiprocessing.shared_memory block,
+and workers attach to the block by name and use it in place: the cells of
+their MazeGrid and the labels of their MazeComponents are views of the shared
+block, so adding workers adds almost nothing to the memory used.
+
+The block is a fixed size header followed by the size of each component, the
+label of every cell and the cells themselves, one byte per cell in row order.
+
+solve_shared() answers many (start, goal) queries with several algorithms
+across a process pool this way, and solve.py's --shared-memory option does
+the same for each maze of a batch. From the command line, 200 random queries
+on maze-VLarge.txt solved with two algorithms on four workers:
+    python3 shared_maze.py ../docs/mazes/maze-VLarge.txt --queries 200 \\
+        -a a_star iterative_dfs -w 4 -o results.jsonl
+"""
+import argparse
+import atexit
+import json
+import random
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from maze_grid import MazeGrid
+from maze_binary import load_maze_cached
+from maze_components import MazeComponents, label_components
+from maze_components import load_components_cached, search_if_reachable
+from maze_io import MazeFormatError
+from solver_registry import SOLVERS, get_solver, result_optimality
+from solver_registry import solver_options
+
+MAGIC = b'MAZS'
+VERSION = 1
+# Magic, version, padding, width, height, the start and goal coordinates and
+# the number of components. The header is a multiple of 8 bytes long, so the
+# component sizes that follow it are aligned
+HEADER = struct.Struct('<4sHH6IQ')
+
+# The shared mazes this (worker) process has attached to, by block name
+_ATTACHED = {}
+
+
+class SharedMaze():
+    """ A class that holds a maze, its start and goal points and its
+    connected components in a shared memory block. The process that creates
+    it owns the block and unlinks it when done, while other processes attach
+    to it by name (see attach()) and only close their view of it.
+    """
+    def __init__(self, block: shared_memory.SharedMemory, owner: bool):
+        """ Reads the maze out of a shared memory block, see create() and
+        attach().
+
+        Args:
+            block (shared_memory.SharedMemory): The block holding the maze.
+            owner (bool): Whether this process created the block, and so
+                should unlink it.
+
+        Raises:
+            MazeFormatError: If the block doesn't hold a shared maze.
+        """
+        self.block = block
+        self.owner = owner
+
+        header = bytes(block.buf[:HEADER.size])
+        if header[:4] != MAGIC:
+            raise MazeFormatError(f"Shared memory block {block.name} doesn't "
+                                  "hold a maze")
+        (_, version, _, width, height, start_row, start_column, goal_row,
+         goal_column, component_count) = HEADER.unpack(header)
+        if version != VERSION:
+            raise MazeFormatError(f"Shared memory block {block.name} uses an "
+                                  f"unsupported version ({version})")
+
+        # Every part of the maze is a view of the block, not a copy
+        cell_count = width * height
+        sizes_start = HEADER.size
+        labels_start = sizes_start + 8 * component_count
+        cells_start = labels_start + 4 * cell_count
+        self._views = [
+            block.buf[sizes_start:labels_start].cast('q'),
+            block.buf[labels_start:cells_start].cast('i'),
+            block.buf[cells_start:cells_start + cell_count]]
+        (component_sizes, labels, cells) = self._views
+
+        self.maze_grid = MazeGrid(width, height, cells)
+        self.start_point = (start_row, start_column)
+        self.goal_point = (goal_row, goal_column)
+        self.components = MazeComponents(width, height, labels,
+                                         component_sizes)
+
+    @classmethod
+    def create(cls, maze_grid: MazeGrid, start_point: tuple[int, int],
+               goal_point: tuple[int, int],
+               components: MazeComponents = None) -> "SharedMaze":
+        """ Copies a maze into a new shared memory block.
+
+        Args:
+            maze_grid (MazeGrid): The maze to share.
+            start_point (tuple[int, int]): The coordinate of the maze's start.
+            goal_point (tuple[int, int]): The coordinate of the maze's goal.
+            components (MazeComponents, optional): The maze's connected
+                components, which are labelled if not provided.
+
+        Returns:
+            SharedMaze: (shared_maze). The maze in shared memory, owned by
+                this process.
+        """
+        if components is None:
+            components = label_components(maze_grid)
+        (width, height) = (maze_grid.width, maze_grid.height)
+        cell_count = width * height
+        component_count = len(components)
+
+        block = shared_memory.SharedMemory(
+            create=True,
+            size=HEADER.size + 8 * component_count + 5 * cell_count)
+        try:
+            HEADER.pack_into(block.buf, 0, MAGIC, VERSION, 0, width, height,
+                             *start_point, *goal_point, component_count)
+            position = HEADER.size
+            for part in (components.component_sizes, components.labels,
+                         maze_grid.cells):
+                part = memoryview(part).cast('B')
+                block.buf[position:position + len(part)] = part
+                position += len(part)
+            return cls(block, owner=True)
+        except BaseException:
+            block.close()
+            block.unlink()
+            raise
+
+    @classmethod
+    def from_file(cls, file_name: str) -> "SharedMaze":
+        """ Loads a maze text file (and its connected components) through the
+        on-disk caches into a new shared memory block.
+
+        Args:
+            file_name (str): The file name of the maze text file.
+
+        Returns:
+            SharedMaze: (shared_maze). The maze in shared memory, owned by
+                this process.
+        """
+        (maze_grid, start_point, goal_point) = load_maze_cached(file_name)
+        return cls.create(maze_grid, start_point, goal_point,
+                          load_components_cached(file_name))
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedMaze":
+        """ Attaches to a maze another process has put in shared memory.
+
+        Args:
+            name (str): The name of the block, see SharedMaze.name.
+
+        Raises:
+            FileNotFoundError: If there is no block with that name.
+            MazeFormatError: If the block doesn't hold a shared maze.
+
+        Returns:
+            SharedMaze: (shared_maze). A view of the maze, which this process
+                must not unlink.
+        """
+        try:
+            block = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Before Python 3.13 attaching always registers the block with
+            # the resource tracker, which is harmless in worker processes as
+            # they share the tracker of the process that created it
+            block = shared_memory.SharedMemory(name=name)
+        return cls(block, owner=False)
+
+    @property
+    def name(self) -> str:
+        """ The name other processes attach to the block with.
+        """
+        return self.block.name
+
+    def close(self) -> None:
+        """ Stops using the block in this process, and unlinks it if this
+        process created it. The maze, its grid and its components can't be
+        used afterwards.
+        """
+        if self.block is None:
+            return
+        self.maze_grid = None
+        self.components = None
+        for view in self._views:
+            view.release()
+        self._views = []
+        self.block.close()
+        if self.owner:
+            self.block.unlink()
+        self.block = None
+
+    def __enter__(self) -> "SharedMaze":
+        return self
+
+    def __exit__(self, *exception) -> None:
+        self.close()
+
+
+def attached_maze(name: str) -> SharedMaze:
+    """ Finds the shared maze with a block name, attaching to it the first
+    time it is asked for in this process.
+
+    Args:
+        name (str): The name of the block.
+
+    Returns:
+        SharedMaze: (shared_maze). The attached maze.
+    """
+    if name not in _ATTACHED:
+        if not _ATTACHED:
+            atexit.register(_close_attached)
+        _ATTACHED[name] = SharedMaze.attach(name)
+    return _ATTACHED[name]
+
+
+def _close_attached() -> None:
+    """ Closes every attached maze when the process exits, as a block can't
+    be closed (by its own finaliser) while the maze's views of it are alive.
+    """
+    for shared_maze in _ATTACHED.values():
+        shared_maze.close()
+    _ATTACHED.clear()
+
+
+def solve_shared_task(task: tuple[str, str, tuple[int, int],
+                                  tuple[int, int], bool]) -> dict:
+    """ Solves one query on a shared maze. This runs in a worker process.
+
+    Args:
+        task (tuple[str, str, tuple[int, int], tuple[int, int], bool]): The
+            block name, the algorithm name, the start and goal coordinates
+            (or None for the maze's own) and whether to include the full
+            path in the result.
+
+    Returns:
+        dict: (result). The query and algorithm, whether a path was found,
+            its length in steps and optimality, the number of nodes expanded
+            and the time taken to search (or an error message).
+    """
+    (name, algorithm, start_point, goal_point, include_path) = task
+    result = {"algorithm": algorithm}
+
+    try:
+        shared_maze = attached_maze(name)
+        start_point = start_point or shared_maze.start_point
+        goal_point = goal_point or shared_maze.goal_point
+        result.update({"start": list(start_point), "goal": list(goal_point)})
+
+        solver = get_solver(algorithm)
+        # Anything the search builds from the maze (such as a junction graph)
+        # is built once per worker and reused by its later queries
+        options = solver_options(solver, shared_maze.maze_grid)
+        search_start = time.perf_counter()
+        (path_taken, nodes_expanded) = search_if_reachable(
+            shared_maze.components, solver, shared_maze.maze_grid,
+            tuple(start_point), tuple(goal_point), **options)
+        search_time = time.perf_counter() - search_start
+    except Exception as error:
+        # One bad query shouldn't stop the rest of the batch
+        result["error"] = f"{type(error).__name__}: {error}"
+        return result
+
+    result.update({
+        "solved": path_taken is not None,
+        "path_length": (len(path_taken) - 1 if path_taken is not None
+                        else None),
+        "nodes_expanded": nodes_expanded,
+        "search_seconds": round(search_time, 6),
+    })
+    if path_taken is not None:
+        # How close to the shortest path the path is guaranteed to be
+        result["optimality"] = result_optimality(solver, path_taken)
+    if include_path and path_taken is not None:
+        result["path"] = path_taken
+
+    return result
+
+
+def solve_shared(shared_maze: SharedMaze, queries: list, algorithms: list[str],
+                 workers: int = None, chunksize: int = 1,
+                 include_path: bool = False):
+    """ Solves every query with every algorithm across a process pool, with
+    every worker searching the same shared copy of the maze, yielding the
+    results in order as they become available.
+
+    Args:
+        shared_maze (SharedMaze): The maze, which must stay open until the
+            results have all been read.
+        queries (list of (tuple[int, int], tuple[int, int])): The (start,
+            goal) pairs to solve, where None in either place stands for the
+            maze's own start or goal.
+        algorithms (list[str]): The names of the algorithms to use.
+        workers (int, optional): The number of worker processes, which
+            defaults to the number of CPUs.
+        chunksize (int, optional): The number of tasks sent to a worker at a
+            time.
+        include_path (bool, optional): Whether to include the full path in
+            each result.
+
+    Yields:
+        dict: (result). The result of each (query, algorithm) pair, see
+            solve_shared_task().
+    """
+    tasks = [(shared_maze.name, algorithm, start_point, goal_point,
+              include_path)
+             for (start_point, goal_point) in queries
+             for algorithm in algorithms]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(solve_shared_task, tasks, chunksize=chunksize)
+
+
+def random_queries(shared_maze: SharedMaze, count: int,
+                   seed: int = 0) -> list[tuple[tuple[int, int],
+                                                tuple[int, int]]]:
+    """ Picks (start, goal) pairs of open cells at random.
+
+    Args:
+        shared_maze (SharedMaze): The maze to pick the cells from.
+        count (int): The number of pairs to pick.
+        seed (int, optional): The random seed, so the same pairs are picked
+            each time.
+
+    Returns:
+        list[tuple[tuple[int, int], tuple[int, int]]]: (queries). The pairs.
+    """
+    maze_grid = shared_maze.maze_grid
+    generator = random.Random(seed)
+    open_cells = [index for (index, cell) in enumerate(maze_grid.cells)
+                  if cell]
+    return [(maze_grid.point(generator.choice(open_cells)),
+             maze_grid.point(generator.choice(open_cells)))
+            for _ in range(count)]
+
+
+def main(arguments: list[str] = None) -> int:
+    """ Solves many queries on one maze in parallel from the command line.
+
+    Returns:
+        int: (exit_code). 0 if every task ran, 1 if any of them failed.
+    """
+    parser = argparse.ArgumentParser(
+        description="Solve many queries on one maze across worker processes "
+        "sharing a single copy of it, writing the results as JSON Lines.")
+    parser.add_argument("maze", help="maze file to solve")
+    parser.add_argument("-q", "--queries", type=int, default=0,
+                        help="random start and goal pairs to solve, as well "
+                        "as the maze's own (default: 0)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="random seed for the queries (default: 0)")
+    parser.add_argument("-a", "--algorithms", nargs="+", default=["a_star"],
+                        choices=sorted(SOLVERS), metavar="ALGORITHM",
+                        help="algorithms to run on every query (default: "
+                        "a_star), any of: " + ", ".join(sorted(SOLVERS)))
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="number of worker processes (default: the "
+                        "number of CPUs)")
+    parser.add_argument("-c", "--chunksize", type=int, default=1,
+                        help="tasks sent to a worker at a time (default: 1)")
+    parser.add_argument("-o", "--output", default="-",
+                        help="file to write the results to (default: "
+                        "standard output)")
+    parser.add_argument("--include-path", action="store_true",
+                        help="include the full path in each result")
+    options = parser.parse_args(arguments)
+
+    failures = 0
+    output = (sys.stdout if options.output == "-" else
+              open(options.output, "w", encoding="utf-8"))
+    try:
+        with SharedMaze.from_file(options.maze) as shared_maze:
+            queries = [(None, None)] + random_queries(
+                shared_maze, options.queries, options.seed)
+            for result in solve_shared(shared_maze, queries,
+                                       options.algorithms, options.workers,
+                                       options.chunksize,
+                                       options.include_path):
+                failures += "error" in result
+                output.write(json.dumps(result) + "\n")
+                output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""Solves many mazes with many algorithms in parallel, without any prompts
+
+Each (maze, algorithm) pair is solved in a pool of worker processes, and
+one JSON object is written per pair (JSON Lines), in the order the mazes and
+algorithms were given. Workers load the mazes themselves (through the binary
+parse cache), so only file names and results are sent between processes.
+With --shared-memory the mazes are instead loaded once by this process into
+shared memory (see shared_maze.py), and every worker searches that one copy.
+
+Example, solving every bundled maze with two algorithms on four workers:
+    python3 solve.py ../docs/mazes -a a_star iterative_dfs -w 4 \\
+        -o results.jsonl
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from maze_binary import load_maze_cached
+from maze_components import load_components_cached, search_if_reachable
+from shared_maze import SharedMaze, attached_maze
+from solver_registry import SOLVERS, get_solver, result_optimality
+from solver_registry import solver_options
+
+# The most recently loaded maze (and its connected components) in this
+# (worker) process, so a maze that is solved with several algorithms in a row
+# is only loaded once
+_LOADED_MAZE = {}
+
+
+def find_mazes(patterns: list[str]) -> list[str]:
+    """ Expands directories and glob patterns into a list of maze files.
+    Directories are searched for .txt files (not recursively).
+
+    Args:
+        patterns (list[str]): Maze file names, directories or glob patterns.
+
+    Raises:
+        FileNotFoundError: If a pattern doesn't match any files.
+
+    Returns:
+        list[str]: (maze_files). The matching file names, with each pattern's
+            matches sorted and any duplicates removed.
+    """
+    maze_files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(glob.glob(os.path.join(pattern, "*.txt")))
+        else:
+            matches = sorted(glob.glob(pattern))
+
+        if not matches:
+            raise FileNotFoundError(f"No mazes found matching {pattern!r}")
+        maze_files.extend(matches)
+
+    return list(dict.fromkeys(maze_files))
+
+
+def solve_task(task: tuple[str, str, bool, str]) -> dict:
+    """ Solves one maze with one algorithm. This runs in a worker process.
+
+    Args:
+        task (tuple[str, str, bool, str]): The maze file name, the algorithm
+            name, whether to include the full path in the result and the
+            name of the shared memory block holding the maze (or None to
+            load it from the file).
+
+    Returns:
+        dict: (result). The maze and algorithm, whether a path was found, its
+            length in steps and optimality (see
+            solver_registry.result_optimality()), the number of nodes
+            expanded and the time taken to load the maze and to search it (or
+            an error message).
+    """
+    (maze_file, algorithm, include_path, shared_name) = task
+    result = {"maze": maze_file, "algorithm": algorithm}
+
+    try:
+        load_start = time.perf_counter()
+        if shared_name is not None:
+            # Attaches to the parent's copy (once per worker), which is used
+            # in place rather than loaded
+            shared_maze = attached_maze(shared_name)
+            _LOADED_MAZE["file"] = None
+            _LOADED_MAZE["maze"] = (shared_maze.maze_grid,
+                                    shared_maze.start_point,
+                                    shared_maze.goal_point)
+            _LOADED_MAZE["components"] = shared_maze.components
+        elif _LOADED_MAZE.get("file") != maze_file:
+            _LOADED_MAZE["file"] = None
+            _LOADED_MAZE["maze"] = load_maze_cached(maze_file)
+            _LOADED_MAZE["components"] = load_components_cached(maze_file)
+            _LOADED_MAZE["file"] = maze_file
+        (maze_grid, start_point, goal_point) = _LOADED_MAZE["maze"]
+        solver = get_solver(algorithm)
+        # Anything the search builds from the maze once (such as a junction
+        # graph) is loaded along with it
+        options = solver_options(solver, maze_grid, _LOADED_MAZE["file"])
+        load_time = time.perf_counter() - load_start
+
+        search_start = time.perf_counter()
+        # An unreachable goal is answered from the components, without
+        # searching
+        (path_taken, nodes_expanded) = search_if_reachable(
+            _LOADED_MAZE["components"], solver, maze_grid, start_point,
+            goal_point, **options)
+        search_time = time.perf_counter() - search_start
+    except Exception as error:
+        # One bad maze shouldn't stop the rest of the batch
+        result["error"] = f"{type(error).__name__}: {error}"
+        return result
+
+    result.update({
+        "solved": path_taken is not None,
+        "path_length": (len(path_taken) - 1 if path_taken is not None
+                        else None),
+        "nodes_expanded": nodes_expanded,
+        "load_seconds": round(load_time, 6),
+        "search_seconds": round(search_time, 6),
+    })
+    if path_taken is not None:
+        # How close to the shortest path the path is guaranteed to be
+        result["optimality"] = result_optimality(solver, path_taken)
+    if include_path and path_taken is not None:
+        result["path"] = path_taken
+
+    return result
+
+
+def solve_all(maze_files: list[str], algorithms: list[str],
+              workers: int = None, chunksize: int = 1,
+              include_path: bool = False, shared: bool = False):
+    """ Solves every maze with every algorithm across a process pool,
+    yielding the results in order as they become available.
+
+    Args:
+        maze_files (list[str]): The maze files to solve.
+        algorithms (list[str]): The names of the algorithms to use.
+        workers (int, optional): The number of worker processes, which
+            defaults to the number of CPUs.
+        chunksize (int, optional): The number of tasks sent to a worker at a
+            time. Tasks are ordered maze by maze, so a chunk covering all of
+            the algorithms lets a worker load each maze only once.
+        include_path (bool, optional): Whether to include the full path in
+            each result.
+        shared (bool, optional): Whether to load every maze into shared
+            memory up front, so the workers share one copy of each instead
+            of loading their own.
+
+    Yields:
+        dict: (result). The result of each (maze, algorithm) pair, see
+            solve_task().
+    """
+    shared_mazes = {}
+    try:
+        if shared:
+            for maze_file in maze_files:
+                try:
+                    shared_mazes[maze_file] = SharedMaze.from_file(maze_file)
+                except Exception:
+                    # The workers load a maze that can't be shared themselves,
+                    # so its error is reported in its results
+                    pass
+
+        tasks = [(maze_file, algorithm, include_path,
+                  (shared_mazes[maze_file].name if maze_file in shared_mazes
+                   else None))
+                 for maze_file in maze_files for algorithm in algorithms]
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(solve_task, tasks, chunksize=chunksize)
+    finally:
+        for shared_maze in shared_mazes.values():
+            shared_maze.close()
+
+
+def main(arguments: list[str] = None) -> int:
+    """ Runs the batch solver from the command line.
+
+    Returns:
+        int: (exit_code). 0 if every task ran, 1 if any of them failed.
+    """
+    parser = argparse.ArgumentParser(
+        description="Solve mazes in parallel and write the results as JSON "
+        "Lines.")
+    parser.add_argument("mazes", nargs="+",
+                        help="maze files, directories or glob patterns")
+    parser.add_argument("-a", "--algorithms", nargs="+", default=["a_star"],
+                        choices=sorted(SOLVERS), metavar="ALGORITHM",
+                        help="algorithms to run on every maze (default: "
+                        "a_star), any of: " + ", ".join(sorted(SOLVERS)))
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="number of worker processes (default: the "
+                        "number of CPUs)")
+    parser.add_argument("-c", "--chunksize", type=int, default=1,
+                        help="tasks sent to a worker at a time (default: 1)")
+    parser.add_argument("-o", "--output", default="-",
+                        help="file to write the results to (default: "
+                        "standard output)")
+    parser.add_argument("--include-path", action="store_true",
+                        help="include the full path in each result")
+    parser.add_argument("--shared-memory", action="store_true",
+                        help="load each maze once into shared memory for all "
+                        "of the workers to use")
+    options = parser.parse_args(arguments)
+
+    try:
+        maze_files = find_mazes(options.mazes)
+    except FileNotFoundError as error:
+        parser.error(str(error))
+
+    failures = 0
+    output = (sys.stdout if options.output == "-" else
+              open(options.output, "w", encoding="utf-8"))
+    try:
+        for result in solve_all(maze_files, options.algorithms,
+                                options.workers, options.chunksize,
+                                options.include_path,
+                                options.shared_memory):
+            failures += "error" in result
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""A client for the maze solving server in solve_server.py
+
+SolveClient keeps one connection open and can have many requests in flight
+on it at once, matching each response to its request by id.
+
+Example, solving a bundled maze on a server running locally:
+    python3 solve_client.py maze-Large.txt -a a_star flat_a_star
+    python3 solve_client.py --stats
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+from solve_server import DEFAULT_HOST, DEFAULT_PORT, MAX_REQUEST_BYTES
+
+
+class SolveClient():
+    """ A class that sends requests to a solve server over one connection and
+    waits for their responses.
+    """
+    def __init__(self, reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter):
+        """ Starts reading responses from an open connection, see connect().
+
+        Args:
+            reader (asyncio.StreamReader): The connection's input.
+            writer (asyncio.StreamWriter): The connection's output.
+        """
+        self.reader = reader
+        self.writer = writer
+        self.request_ids = itertools.count(1)
+        # The futures of the requests waiting for a response, by request id
+        self.waiting = {}
+        self.read_task = asyncio.create_task(self._read_responses())
+
+    @classmethod
+    async def connect(cls, host: str = DEFAULT_HOST,
+                      port: int = DEFAULT_PORT) -> "SolveClient":
+        """ Opens a connection to a server.
+
+        Args:
+            host (str, optional): The server's address.
+            port (int, optional): The server's port.
+
+        Returns:
+            SolveClient: (client). A client using the connection.
+        """
+        (reader, writer) = await asyncio.open_connection(
+            host, port, limit=MAX_REQUEST_BYTES)
+        return cls(reader, writer)
+
+    async def request(self, request: dict) -> dict:
+        """ Sends a request and waits for its response.
+
+        Args:
+            request (dict): The request, without an id (one is added).
+
+        Raises:
+            ConnectionError: If the connection closes before the response.
+
+        Returns:
+            dict: (response). The server's response.
+        """
+        request_id = next(self.request_ids)
+        response = asyncio.get_running_loop().create_future()
+        self.waiting[request_id] = response
+        self.writer.write(json.dumps({**request, "id": request_id}).encode()
+                          + b"\n")
+        await self.writer.drain()
+        return await response
+
+    async def solve(self, maze: str = None, algorithm: str = "a_star",
+                    maze_text: str = None,
+                    include_path: bool = False) -> dict:
+        """ Asks the server to solve a maze.
+
+        Args:
+            maze (str, optional): The maze file name, relative to the
+                server's maze directory.
+            algorithm (str, optional): The name of the algorithm to use.
+            maze_text (str, optional): The text of the maze, instead of a
+                file name.
+            include_path (bool, optional): Whether the response should include
+                the full path.
+
+        Returns:
+            dict: (response). The server's response, see solve_server.py.
+        """
+        request = {"algorithm": algorithm, "include_path": include_path}
+        if maze_text is not None:
+            request["maze_text"] = maze_text
+        else:
+            request["maze"] = maze
+        return await self.request(request)
+
+    async def stats(self) -> dict:
+        """ Asks the server for its request counts and latencies.
+
+        Returns:
+            dict: (statistics). See SolveServer.statistics().
+        """
+        return (await self.request({"command": "stats"}))["stats"]
+
+    async def close(self) -> None:
+        """ Closes the connection.
+        """
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+        await self.read_task
+
+    async def _read_responses(self) -> None:
+        """ Hands each response to the request waiting for it, failing every
+        waiting request once the connection closes.
+        """
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                waiting = self.waiting.pop(response.get("id"), None)
+                if waiting is not None and not waiting.done():
+                    waiting.set_result(response)
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            for waiting in self.waiting.values():
+                if not waiting.done():
+                    waiting.set_exception(ConnectionError(
+                        "The connection to the server closed"))
+            self.waiting.clear()
+
+
+async def _run(options: argparse.Namespace) -> int:
+    """ Sends the requests asked for on the command line, printing each
+    response as a line of JSON.
+    """
+    client = await SolveClient.connect(options.host, options.port)
+    try:
+        if options.stats:
+            print(json.dumps(await client.stats()))
+            return 0
+
+        responses = await asyncio.gather(*(
+            client.solve(options.maze, algorithm,
+                         include_path=options.include_path)
+            for algorithm in options.algorithms))
+        for response in responses:
+            print(json.dumps(response))
+        return 0 if all(response["status"] == "ok"
+                        for response in responses) else 1
+    finally:
+        await client.close()
+
+
+def main(arguments: list[str] = None) -> int:
+    """ Runs the client from the command line.
+
+    Returns:
+        int: (exit_code). 0 if every request succeeded, otherwise 1.
+    """
+    parser = argparse.ArgumentParser(
+        description="Send solve requests to a maze solving server.")
+    parser.add_argument("maze", nargs="?",
+                        help="maze file name, relative to the server's maze "
+                        "directory")
+    parser.add_argument("-a", "--algorithms", nargs="+", default=["a_star"],
+                        metavar="ALGORITHM",
+                        help="algorithms to solve the maze with (default: "
+                        "a_star)")
+    parser.add_argument("--include-path", action="store_true",
+                        help="include the full path in each response")
+    parser.add_argument("--stats", action="store_true",
+                        help="print the server's statistics instead")
+    parser.add_argument("--host", default=DEFAULT_HOST,
+                        help=f"server address (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help=f"server port (default: {DEFAULT_PORT})")
+    options = parser.parse_args(arguments)
+    if options.maze is None and not options.stats:
+        parser.error("a maze is needed unless --stats is given")
+
+    try:
+        return asyncio.run(_run(options))
+    except ConnectionError as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,451 @@
+"""Serves maze solving requests over a local socket
+
+An asyncio server that accepts one JSON object per line (JSON Lines) on a TCP
+connection and answers each with one JSON object per line. Requests on one
+connection are handled concurrently and may be answered out of order, so
+every response carries the "id" of its request.
+
+A solve request names an algorithm (any of the names solve.py accepts) and
+either a maze file or the text of a maze:
+    {"id": 1, "maze": "maze-Large.txt", "algorithm": "a_star"}
+    {"id": 2, "maze_text": "# - #\\n# - #\\n", "algorithm": "iterative_dfs",
+     "include_path": true}
+Relative maze file names are looked up in the maze directory (the bundled
+mazes by default). The response holds the same fields as solve.py's results
+along with the time spent on the request:
+    {"id": 1, "status": "ok", "solved": true, "path_length": 973,
+     "nodes_expanded": 22160, "cached": true,
+     "timing": {"queue_seconds": ..., "load_seconds": ...,
+                "search_seconds": ..., "total_seconds": ...}}
+
+The searches run in a pool of worker processes, each of which keeps the mazes
+it has parsed (and their connected components) in a small LRU cache. At most
+max_pending requests are queued or running at once; any more are answered
+straight away with "status": "overloaded" (backpressure) rather than queued,
+so the client can back off and retry. {"command": "stats"} returns the
+request counts and latency percentiles of the server so far, and
+{"command": "ping"} checks the server is up.
+
+Example, serving on port 8642 with two workers:
+    python3 solve_server.py --port 8642 --workers 2
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from maze_binary import load_maze_cached
+from maze_components import label_components, load_components_cached
+from maze_components import search_if_reachable
+from maze_io import parse_maze
+from solver_registry import get_solver, result_optimality, solver_options
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8642
+# The folder relative maze file names are looked up in
+DEFAULT_MAZE_DIRECTORY = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "docs", "mazes")
+# The number of parsed mazes each worker process keeps
+DEFAULT_MAZE_CACHE_SIZE = 8
+# The longest request line accepted, which bounds the size of inline mazes
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+# The number of recent request latencies the percentiles are taken over
+LATENCY_WINDOW = 10000
+
+# The parsed mazes of this worker process, from least to most recently used
+_MAZE_CACHE = OrderedDict()
+_MAZE_CACHE_SIZE = DEFAULT_MAZE_CACHE_SIZE
+
+
+def solve_in_worker(maze_file: str, maze_text: str, algorithm: str,
+                    include_path: bool) -> dict:
+    """ Solves one maze with one algorithm. This runs in a worker process.
+
+    Args:
+        maze_file (str): The file name of the maze, or None if the maze is
+            given as text.
+        maze_text (str): The text of the maze, in the bundled maze format.
+        algorithm (str): The name of the algorithm to use.
+        include_path (bool): Whether to include the full path in the result.
+
+    Raises:
+        ValueError: If the algorithm is unknown or the maze is malformed.
+        OSError: If the maze file can't be read.
+
+    Returns:
+        dict: (result). Whether a path was found, its length in steps and
+            optimality, the number of nodes expanded, whether the maze came
+            from the cache and the time taken to load the maze and to search
+            it.
+    """
+    solver = get_solver(algorithm)
+
+    load_start = time.perf_counter()
+    (maze, cached) = _load_maze(maze_file, maze_text)
+    (maze_grid, start_point, goal_point, components) = maze
+    # Anything the search builds from the maze once (such as a junction
+    # graph) is kept with the cached maze
+    options = solver_options(solver, maze_grid, maze_file)
+    search_start = time.perf_counter()
+    (path_taken, nodes_expanded) = search_if_reachable(
+        components, solver, maze_grid, start_point, goal_point, **options)
+    search_end = time.perf_counter()
+
+    result = {
+        "solved": path_taken is not None,
+        "path_length": (len(path_taken) - 1 if path_taken is not None
+                        else None),
+        "nodes_expanded": nodes_expanded,
+        "cached": cached,
+        "load_seconds": search_start - load_start,
+        "search_seconds": search_end - search_start,
+    }
+    if path_taken is not None:
+        # How close to the shortest path the path is guaranteed to be
+        result["optimality"] = result_optimality(solver, path_taken)
+    if include_path and path_taken is not None:
+        result["path"] = path_taken
+    return result
+
+
+def _set_maze_cache_size(maze_cache_size: int) -> None:
+    """ Sets the number of mazes a worker process keeps, as the initializer
+    of the worker pool.
+    """
+    global _MAZE_CACHE_SIZE
+    _MAZE_CACHE_SIZE = maze_cache_size
+
+
+def _load_maze(maze_file: str, maze_text: str) -> tuple[tuple, bool]:
+    """ Loads a maze along with its connected components, from the worker's
+    cache if it has been loaded before (and, for a file, hasn't changed since).
+    Returns the maze and whether it came from the cache.
+    """
+    if maze_file is not None:
+        source_stat = os.stat(maze_file)
+        key = ("file", os.path.abspath(maze_file), source_stat.st_mtime_ns,
+               source_stat.st_size)
+    else:
+        key = ("text", hashlib.sha1(maze_text.encode()).hexdigest())
+
+    if key in _MAZE_CACHE:
+        _MAZE_CACHE.move_to_end(key)
+        return (_MAZE_CACHE[key], True)
+
+    if maze_file is not None:
+        # Goes through the on-disk caches, so other workers (and later runs)
+        # don't have to parse or label the maze again
+        maze = (*load_maze_cached(maze_file),
+                load_components_cached(maze_file))
+    else:
+        (maze_grid, start_point, goal_point) = parse_maze(
+            maze_text.encode(), "<maze_text>")
+        maze = (maze_grid, start_point, goal_point,
+                label_components(maze_grid))
+
+    _MAZE_CACHE[key] = maze
+    if len(_MAZE_CACHE) > _MAZE_CACHE_SIZE:
+        _MAZE_CACHE.popitem(last=False)
+    return (maze, False)
+
+
+class SolveServer():
+    """ A class that serves solve requests (see the module docstring) from a
+    bounded pool of worker processes, keeping count of the requests and their
+    latencies.
+    """
+    def __init__(self, workers: int = None, max_pending: int = None,
+                 maze_cache_size: int = DEFAULT_MAZE_CACHE_SIZE,
+                 maze_directory: str = DEFAULT_MAZE_DIRECTORY):
+        """ Creates the worker pool.
+
+        Args:
+            workers (int, optional): The number of worker processes, which
+                defaults to the number of CPUs.
+            max_pending (int, optional): The most requests queued or running
+                at once before new ones are answered as overloaded, which
+                defaults to four per worker.
+            maze_cache_size (int, optional): The number of parsed mazes each
+                worker keeps.
+            maze_directory (str, optional): The folder relative maze file
+                names are looked up in.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 4 * self.workers
+        self.maze_directory = maze_directory
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_set_maze_cache_size,
+            initargs=(maze_cache_size,))
+        self.pending = 0
+        self.counts = {"ok": 0, "error": 0, "overloaded": 0}
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.started = time.time()
+        self.server = None
+        # The tasks handling the open connections, and their writers
+        self.connections = {}
+
+    async def start(self, host: str = DEFAULT_HOST,
+                    port: int = DEFAULT_PORT) -> tuple[str, int]:
+        """ Starts listening for connections.
+
+        Args:
+            host (str, optional): The address to listen on.
+            port (int, optional): The port to listen on, 0 for any free port.
+
+        Returns:
+            tuple[str, int]: (host, port). The address being listened on.
+        """
+        self.server = await asyncio.start_server(
+            self.handle_connection, host, port, limit=MAX_REQUEST_BYTES)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def close(self) -> None:
+        """ Stops listening, closes any open connections and shuts the worker
+        pool down.
+        """
+        if self.server is not None:
+            self.server.close()
+        # Closing a connection ends its handler's reading loop, so the handler
+        # returns rather than being cancelled when the event loop stops
+        for writer in self.connections.values():
+            writer.close()
+        if self.connections:
+            await asyncio.gather(*self.connections, return_exceptions=True)
+        if self.server is not None:
+            await self.server.wait_closed()
+        self.executor.shutdown(cancel_futures=True)
+
+    async def handle_connection(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+        """ Reads requests from a connection until it closes, answering each
+        one in its own task.
+
+        Args:
+            reader (asyncio.StreamReader): The connection's input.
+            writer (asyncio.StreamWriter): The connection's output.
+        """
+        connection = asyncio.current_task()
+        self.connections[connection] = writer
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        async def send(response: dict) -> None:
+            async with write_lock:
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+
+        async def respond(line: bytes) -> None:
+            await send(await self.handle_line(line))
+
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # The line is longer than MAX_REQUEST_BYTES, so the rest
+                    # of the connection can't be read reliably
+                    await send(self._error(None, "Request longer than "
+                                           f"{MAX_REQUEST_BYTES} bytes"))
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.create_task(respond(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            # Answers everything already received before closing
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            del self.connections[connection]
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def handle_line(self, line: bytes) -> dict:
+        """ Answers one request line.
+
+        Args:
+            line (bytes): The JSON request.
+
+        Returns:
+            dict: (response). The JSON response.
+        """
+        received = time.perf_counter()
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("a request must be a JSON object")
+        except ValueError as error:
+            return self._error(None, f"Invalid request: {error}")
+
+        request_id = request.get("id")
+        command = request.get("command", "solve")
+        if command == "ping":
+            return {"id": request_id, "status": "ok"}
+        if command == "stats":
+            return {"id": request_id, "status": "ok",
+                    "stats": self.statistics()}
+        if command != "solve":
+            return self._error(request_id, f"Unknown command {command!r}")
+
+        # Backpressure: refuses the request rather than queueing without
+        # limit, so the client knows to slow down
+        if self.pending >= self.max_pending:
+            self.counts["overloaded"] += 1
+            return {"id": request_id, "status": "overloaded",
+                    "error": f"{self.pending} requests already pending",
+                    "pending": self.pending}
+
+        self.pending += 1
+        try:
+            (maze_file, maze_text) = self._maze_source(request)
+            result = await asyncio.get_running_loop().run_in_executor(
+                self.executor, solve_in_worker, maze_file, maze_text,
+                request.get("algorithm", "a_star"),
+                bool(request.get("include_path", False)))
+        except Exception as error:
+            # Errors from the worker (such as a malformed maze) are returned
+            # to the client rather than stopping the server
+            return self._error(request_id, f"{type(error).__name__}: {error}")
+        finally:
+            self.pending -= 1
+
+        total_seconds = time.perf_counter() - received
+        self.counts["ok"] += 1
+        self.latencies.append(total_seconds)
+
+        load_seconds = result.pop("load_seconds")
+        search_seconds = result.pop("search_seconds")
+        return {"id": request_id, "status": "ok", **result, "timing": {
+            "queue_seconds": round(max(0.0, total_seconds - load_seconds
+                                       - search_seconds), 6),
+            "load_seconds": round(load_seconds, 6),
+            "search_seconds": round(search_seconds, 6),
+            "total_seconds": round(total_seconds, 6),
+        }}
+
+    def statistics(self) -> dict:
+        """ Summarises the requests answered so far.
+
+        Returns:
+            dict: (statistics). The number of requests answered by status,
+                the number pending, the uptime and the 50th, 95th and 99th
+                percentile latencies (in seconds) of the most recent
+                successful requests.
+        """
+        latencies = sorted(self.latencies)
+        return {
+            "requests": dict(self.counts),
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "workers": self.workers,
+            "uptime_seconds": round(time.time() - self.started, 3),
+            "latency_seconds": {
+                f"p{percent}": round(percentile(latencies, percent), 6)
+                for percent in (50, 95, 99)} if latencies else None,
+        }
+
+    def _maze_source(self, request: dict) -> tuple[str, str]:
+        """ Finds the maze file name or maze text of a solve request. Maze
+        file names are resolved inside the maze directory, and any name that
+        leads outside of it (an absolute path, '..' or a symbolic link) is
+        refused, so clients can't read arbitrary files on the server.
+        """
+        if "maze_text" in request:
+            return (None, str(request["maze_text"]))
+        if "maze" not in request:
+            raise ValueError("a solve request needs a 'maze' or 'maze_text'")
+        maze_directory = os.path.realpath(self.maze_directory)
+        maze_file = os.path.realpath(
+            os.path.join(maze_directory, str(request["maze"])))
+        if os.path.commonpath([maze_directory, maze_file]) != maze_directory:
+            raise ValueError(f"{request['maze']!r} is outside the maze "
+                             "directory")
+        return (maze_file, None)
+
+    def _error(self, request_id, message: str) -> dict:
+        """ Counts and builds an error response.
+        """
+        self.counts["error"] += 1
+        return {"id": request_id, "status": "error", "error": message}
+
+
+def percentile(ordered: list[float], percent: float) -> float:
+    """ Finds a percentile of some sorted values by the nearest rank method.
+
+    Args:
+        ordered (list[float]): The values, sorted in increasing order.
+        percent (float): The percentile to find, from 0 to 100.
+
+    Returns:
+        float: (value). The smallest value at least percent% of the values
+            are less than or equal to.
+    """
+    rank = -(-percent * len(ordered) // 100)
+    return ordered[max(0, int(rank) - 1)]
+
+
+async def serve(host: str, port: int, **options) -> None:
+    """ Runs a server until it is cancelled.
+
+    Args:
+        host (str): The address to listen on.
+        port (int): The port to listen on.
+        **options: Passed on to SolveServer.
+    """
+    server = SolveServer(**options)
+    (host, port) = await server.start(host, port)
+    print(f"Serving on {host}:{port} with {server.workers} workers "
+          f"(at most {server.max_pending} pending requests)", flush=True)
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(arguments: list[str] = None) -> None:
+    """ Runs the server from the command line.
+    """
+    parser = argparse.ArgumentParser(
+        description="Serve maze solving requests as JSON Lines over TCP.")
+    parser.add_argument("--host", default=DEFAULT_HOST,
+                        help=f"address to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help=f"port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="number of worker processes (default: the "
+                        "number of CPUs)")
+    parser.add_argument("--max-pending", type=int, default=None,
+                        help="requests queued or running before new ones "
+                        "are refused (default: 4 per worker)")
+    parser.add_argument("--maze-cache-size", type=int,
+                        default=DEFAULT_MAZE_CACHE_SIZE,
+                        help="parsed mazes kept by each worker (default: "
+                        f"{DEFAULT_MAZE_CACHE_SIZE})")
+    parser.add_argument("--maze-directory", default=DEFAULT_MAZE_DIRECTORY,
+                        help="folder relative maze names are looked up in "
+                        "(default: the bundled mazes)")
+    options = parser.parse_args(arguments)
+
+    try:
+        asyncio.run(serve(options.host, options.port,
+                          workers=options.workers,
+                          max_pending=options.max_pending,
+                          maze_cache_size=options.maze_cache_size,
+                          maze_directory=options.maze_directory))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
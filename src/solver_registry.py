@@ -0,0 +1,114 @@
+"""Maps algorithm names onto the search functions that implement them
+
+Every search function takes (maze, start_point, goal_point) and returns a
+(path_taken, nodes_expanded) tuple, so any of them can be used wherever a
+maze needs solving by name (such as the batch solving command line).
+OPTIMALITY records how close to the shortest path each one's result is
+guaranteed to be, with the heuristic and weight it is called with here, and
+solver_options() finds the data a search can reuse between queries on the
+same maze.
+"""
+from a_star_search import a_star_search, DEFAULT_HEURISTIC_WEIGHT
+from iterative_depth_first_search import iterative_dfs
+from bidirectional_search import bidirectional_a_star, bidirectional_bfs
+from jump_point_search import jump_point_search
+from junction_graph import junction_a_star, junction_dfs, junction_graph_for
+from flat_search import flat_a_star, flat_dfs
+from resumable_dfs import resumable_dfs
+import wavefront_search
+from heuristics import search_optimality
+
+SOLVERS = {
+    "a_star": a_star_search,
+    "iterative_dfs": iterative_dfs,
+    "bidirectional_a_star": bidirectional_a_star,
+    "bidirectional_bfs": bidirectional_bfs,
+    "jump_point_search": jump_point_search,
+    "junction_a_star": junction_a_star,
+    "junction_dfs": junction_dfs,
+    "flat_a_star": flat_a_star,
+    "flat_dfs": flat_dfs,
+    "resumable_dfs": resumable_dfs,
+}
+
+# The vectorised search is only available when NumPy is installed
+if wavefront_search.numpy is not None:
+    SOLVERS["wavefront_bfs"] = wavefront_search.wavefront_bfs
+
+# The A* searches are called with their default heuristic and weight, while
+# the depth first searches make no promise about the length of their path
+WEIGHTED_A_STAR = search_optimality("manhattan", DEFAULT_HEURISTIC_WEIGHT)
+OPTIMALITY = {
+    a_star_search: WEIGHTED_A_STAR,
+    iterative_dfs: "unbounded",
+    bidirectional_a_star: "optimal",
+    bidirectional_bfs: "optimal",
+    jump_point_search: WEIGHTED_A_STAR,
+    junction_a_star: WEIGHTED_A_STAR,
+    junction_dfs: "unbounded",
+    flat_a_star: WEIGHTED_A_STAR,
+    flat_dfs: "unbounded",
+    resumable_dfs: "unbounded",
+    wavefront_search.wavefront_bfs: "optimal",
+}
+
+
+def get_solver(algorithm: str):
+    """ Finds the search function for an algorithm name.
+
+    Args:
+        algorithm (str): The name of the algorithm, one of the keys of
+            SOLVERS.
+
+    Raises:
+        ValueError: If there is no algorithm with that name.
+
+    Returns:
+        callable: (search_function). The search function for the algorithm.
+    """
+    try:
+        return SOLVERS[algorithm]
+    except KeyError:
+        raise ValueError(f"Unknown algorithm {algorithm!r}, expected one of "
+                         f"{', '.join(SOLVERS)}") from None
+
+
+def result_optimality(search_function, path_taken: list[(int, int)]) -> str:
+    """ Tags a search result with how close to the shortest path it is
+    guaranteed to be, see heuristics.search_optimality().
+
+    Args:
+        search_function (callable): The search function that found the path.
+        path_taken (list[(int, int)]): The path it found, or None.
+
+    Returns:
+        str: (optimality). "optimal", "bounded-suboptimal (at most Wx
+            optimal)" or "unbounded", or None if no path was found (or the
+            search function isn't one of the SOLVERS).
+    """
+    if path_taken is None:
+        return None
+    return OPTIMALITY.get(search_function)
+
+
+def solver_options(search_function, maze_grid, maze_file: str = None
+                   ) -> dict:
+    """ Finds the keyword arguments to call a search function with on a maze,
+    for the searches that work on something built from the maze once (the
+    junction searches' graph) rather than on the maze itself.
+
+    Args:
+        search_function (callable): The search function, one of the SOLVERS.
+        maze_grid (MazeGrid): The maze being searched. The data built for it
+            is kept for later queries on the same maze_grid object.
+        maze_file (str, optional): The file name of the maze's text file, so
+            the data can be loaded from (and saved to) the cache on disk
+            rather than built in every process.
+
+    Returns:
+        dict: (options). The keyword arguments to pass to the search
+            function, empty if it needs none.
+    """
+    if search_function in (junction_a_star, junction_dfs):
+        return {"junction_graph": junction_graph_for(maze_grid, maze_file)}
+    return {}
@@ -0,0 +1,507 @@
+"""Tiled maze storage, for searching mazes too large to hold in memory
+
+A tiled maze file stores the cells of a maze in square tiles of tile_size x
+tile_size cells rather than in rows, so the cells a search needs from one
+area of the maze come from a single contiguous read. The tiles are stored in
+row order, one byte per cell (1 for a path, 0 for a wall), with the tiles on
+the right and bottom edges of the maze padded out with walls.
+
+The header (little endian) is made up of:
+    magic (4 bytes), version (uint16), tile size (uint16), width, height,
+    start row, start column, goal row, goal column (uint32 each).
+
+A TiledMaze memory-maps a tiled maze file (or a binary maze file, see
+maze_binary.py, whose tiles are gathered a row at a time) and copies tiles
+out of it as they are needed, keeping the most recently used ones in an LRU
+cache of a fixed number of tiles. It counts the cache's hits, misses and
+evictions so the tile size and cache capacity can be tuned, and provides
+get() and open_neighbours() like a maze dictionary or MazeGrid, so it can be
+passed straight to a_star_search(), which then only loads the tiles around
+the nodes it reaches.
+
+Converting a maze (the text file is read a band of rows at a time, so it
+never has to fit in memory) and solving it with a cache of 64 tiles:
+    python3 tiled_maze.py ../docs/mazes/maze-VLarge.txt -o maze-VLarge.mazt \\
+        --tile-size 64 --cache-capacity 64
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from collections import OrderedDict
+from maze_grid import MazeGrid
+from maze_io import CELL_TABLE, SEPARATORS, MazeFormatError
+import maze_binary
+from a_star_search import a_star_search
+
+MAGIC = b'MAZT'
+VERSION = 1
+HEADER = struct.Struct('<4sHH6I')
+# File extension used for tiled mazes
+EXTENSION = '.mazt'
+# 64 x 64 cell tiles are 4 KiB each, the size of a page on most systems
+DEFAULT_TILE_SIZE = 64
+# The number of tiles kept in memory by default (4 MiB of 64 x 64 tiles)
+DEFAULT_CACHE_CAPACITY = 1024
+# Everything that is stripped from a line of a maze text file
+LINE_SEPARATORS = SEPARATORS + b'\n'
+
+
+class TiledMaze():
+    """ A class that reads the cells of a maze from a tiled (or binary) maze
+    file a tile at a time, keeping at most cache_capacity tiles in memory.
+
+    The cache's counters are kept in tile_hits, tile_misses and
+    tile_evictions, and cache_statistics() reports them along with the
+    number of different tiles touched since reset_statistics().
+    """
+    def __init__(self, file_name: str,
+                 cache_capacity: int = DEFAULT_CACHE_CAPACITY):
+        """ Opens a tiled maze file, or a binary maze file (which is read as
+        if it were split into tiles of DEFAULT_TILE_SIZE).
+
+        Args:
+            file_name (str): The file name of the tiled or binary maze.
+            cache_capacity (int, optional): The largest number of tiles kept
+                in memory at once.
+
+        Raises:
+            MazeFormatError: If the file isn't a valid tiled or binary maze.
+            ValueError: If the cache capacity is less than 1.
+        """
+        if cache_capacity < 1:
+            raise ValueError("the cache must be able to hold at least one "
+                             "tile")
+
+        with open(file_name, "rb") as file_pointer:
+            header = file_pointer.read(HEADER.size)
+
+        if header[:len(MAGIC)] == MAGIC:
+            (width, height, tile_size, start_point,
+             goal_point) = _unpack_header(header, file_name)
+            self.tiled = True
+        else:
+            # Anything else has to be a binary maze, stored in row order
+            (width, height, start_point, goal_point, _,
+             _) = maze_binary.read_binary_header(file_name)
+            tile_size = DEFAULT_TILE_SIZE
+            self.tiled = False
+
+        with open(file_name, "rb") as file_pointer:
+            self.file_map = mmap.mmap(file_pointer.fileno(), 0,
+                                      access=mmap.ACCESS_READ)
+
+        self.width = width
+        self.height = height
+        self.start_point = start_point
+        self.goal_point = goal_point
+        self.tile_size = tile_size
+        self.tiles_across = -(-width // tile_size)
+        self.tiles_down = -(-height // tile_size)
+
+        if self.tiled:
+            expected_size = (HEADER.size + self.tiles_across
+                             * self.tiles_down * tile_size * tile_size)
+        else:
+            expected_size = maze_binary.HEADER.size + width * height
+        if len(self.file_map) != expected_size:
+            self.file_map.close()
+            raise MazeFormatError(f"{file_name} should be {expected_size} "
+                                  f"bytes long, but is {len(self.file_map)}")
+
+        self.cache_capacity = cache_capacity
+        # Resident tiles, ordered from least to most recently used
+        self.tiles = OrderedDict()
+        self.tile_hits = 0
+        self.tile_misses = 0
+        self.tile_evictions = 0
+        # The ids of every tile used since the statistics were last reset
+        self.touched_tiles = set()
+
+    @classmethod
+    def open(cls, file_name: str,
+             cache_capacity: int = DEFAULT_CACHE_CAPACITY) -> "TiledMaze":
+        """ Opens a tiled or binary maze file, see the constructor.
+        """
+        return cls(file_name, cache_capacity)
+
+    def close(self) -> None:
+        """ Drops the resident tiles and closes the file.
+        """
+        self.tiles.clear()
+        self.file_map.close()
+
+    def __enter__(self) -> "TiledMaze":
+        return self
+
+    def __exit__(self, *exception) -> None:
+        self.close()
+
+    def cache_statistics(self) -> dict:
+        """ Reports how well the tile cache has been working.
+
+        Returns:
+            dict: (statistics). The tile_hits, tile_misses and tile_evictions
+                counters, the hit_ratio, and the number of resident_tiles and
+                touched_tiles (different tiles used since the statistics were
+                last reset).
+        """
+        lookups = self.tile_hits + self.tile_misses
+        return {
+            "tile_hits": self.tile_hits,
+            "tile_misses": self.tile_misses,
+            "tile_evictions": self.tile_evictions,
+            "hit_ratio": self.tile_hits / lookups if lookups else 0.0,
+            "resident_tiles": len(self.tiles),
+            "touched_tiles": len(self.touched_tiles),
+        }
+
+    def reset_statistics(self) -> None:
+        """ Zeroes the cache's counters, such as between searches, while
+        keeping the resident tiles.
+        """
+        self.tile_hits = 0
+        self.tile_misses = 0
+        self.tile_evictions = 0
+        self.touched_tiles = set()
+
+    def open_neighbours(self, point: tuple[int, int]) -> list[(int, int)]:
+        """ Finds the coordinates of the neighbouring cells that are paths, in
+        up, right, down, left order. Neighbours in the same tile as the point
+        are read straight from it, so only a move across the edge of a tile
+        needs another tile.
+
+        Args:
+            point (tuple[int, int]): The coordinate of the current cell.
+
+        Returns:
+            list[(int, int)]: (neighbours). The coordinates of the open
+                neighbours.
+        """
+        (row, column) = point
+        tile_size = self.tile_size
+        (tile_row, cell_row) = divmod(row, tile_size)
+        (tile_column, cell_column) = divmod(column, tile_size)
+        tile = self._tile(tile_row * self.tiles_across + tile_column)
+        index = cell_row * tile_size + cell_column
+        last_cell = tile_size - 1
+
+        neighbours = []
+        # (row step, column step, whether the neighbour is in the same tile,
+        # index step within the tile) for up, right, down and left
+        for (row_step, column_step, in_tile, index_step) in (
+                (-1, 0, cell_row > 0, -tile_size),
+                (0, 1, cell_column < last_cell, 1),
+                (1, 0, cell_row < last_cell, tile_size),
+                (0, -1, cell_column > 0, -1)):
+            next_point = (row + row_step, column + column_step)
+            # The padding of the edge tiles is all walls, so only neighbours
+            # in other tiles need checking against the edges of the maze
+            if in_tile:
+                is_open = tile[index + index_step]
+            else:
+                is_open = self._cell(next_point)
+            if is_open:
+                neighbours.append(next_point)
+        return neighbours
+
+    def __contains__(self, point) -> bool:
+        (row, column) = point
+        return 0 <= row < self.height and 0 <= column < self.width
+
+    def __getitem__(self, point: tuple[int, int]) -> str:
+        if point not in self:
+            raise KeyError(point)
+        return '-' if self._cell(point) else '#'
+
+    def get(self, point: tuple[int, int], default=None):
+        """ Returns the '-'/'#' value at a coordinate, or the default if the
+        coordinate is outside of the maze (mirroring dict.get()).
+        """
+        if point not in self:
+            return default
+        return self[point]
+
+    def _cell(self, point: tuple[int, int]) -> int:
+        """ Reads a single cell, which is a wall outside of the maze.
+        """
+        if point not in self:
+            return MazeGrid.WALL
+        (tile_row, cell_row) = divmod(point[0], self.tile_size)
+        (tile_column, cell_column) = divmod(point[1], self.tile_size)
+        tile = self._tile(tile_row * self.tiles_across + tile_column)
+        return tile[cell_row * self.tile_size + cell_column]
+
+    def _tile(self, tile_id: int) -> bytes:
+        """ Finds a tile in the cache, loading it (and evicting the least
+        recently used tile if the cache is full) if it isn't there.
+        """
+        tiles = self.tiles
+        tile = tiles.get(tile_id)
+        if tile is not None:
+            self.tile_hits += 1
+            tiles.move_to_end(tile_id)
+            # Tiles that stayed resident across a reset are touched too
+            self.touched_tiles.add(tile_id)
+            return tile
+
+        self.tile_misses += 1
+        tile = self._load_tile(tile_id)
+        tiles[tile_id] = tile
+        self.touched_tiles.add(tile_id)
+        if len(tiles) > self.cache_capacity:
+            tiles.popitem(last=False)
+            self.tile_evictions += 1
+        return tile
+
+    def _load_tile(self, tile_id: int) -> bytes:
+        """ Copies a tile out of the file, padding any part of it that lies
+        outside of the maze with walls.
+        """
+        tile_size = self.tile_size
+        tile_bytes = tile_size * tile_size
+        if self.tiled:
+            offset = HEADER.size + tile_id * tile_bytes
+            return self.file_map[offset:offset + tile_bytes]
+
+        # A binary maze holds each row of the tile in a different place
+        (tile_row, tile_column) = divmod(tile_id, self.tiles_across)
+        first_row = tile_row * tile_size
+        first_column = tile_column * tile_size
+        columns = min(tile_size, self.width - first_column)
+        padding = bytes(tile_size - columns)
+        parts = []
+        for row in range(first_row, min(first_row + tile_size, self.height)):
+            offset = (maze_binary.HEADER.size + row * self.width
+                      + first_column)
+            parts.append(self.file_map[offset:offset + columns])
+            parts.append(padding)
+        tile = b''.join(parts)
+        return tile + bytes(tile_bytes - len(tile))
+
+
+def write_tiled_maze(output_path: str, maze_grid: MazeGrid,
+                     start_point: tuple[int, int],
+                     goal_point: tuple[int, int],
+                     tile_size: int = DEFAULT_TILE_SIZE) -> None:
+    """ Writes a maze to a tiled maze file, a band of tile_size rows at a
+    time. The maze can be a memory-mapped binary maze (see
+    maze_binary.read_binary_maze()), which is then read through once without
+    ever being held in memory. The file is written under a temporary name
+    first and then moved into place, so a reader never sees a half-written
+    file.
+
+    Args:
+        output_path (str): The file name to write the tiled maze to.
+        maze_grid (MazeGrid): The maze being written.
+        start_point (tuple[int, int]): The coordinate the maze starts at.
+        goal_point (tuple[int, int]): The coordinate the maze ends at.
+        tile_size (int, optional): The width and height of each tile.
+    """
+    _check_tile_size(tile_size)
+    (width, height) = (maze_grid.width, maze_grid.height)
+    cells = memoryview(maze_grid.cells)
+    header = HEADER.pack(MAGIC, VERSION, tile_size, width, height,
+                         start_point[0], start_point[1],
+                         goal_point[0], goal_point[1])
+
+    temporary_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as file_pointer:
+        file_pointer.write(header)
+        for first_row in range(0, height, tile_size):
+            band = [cells[row * width:(row + 1) * width] for row in
+                    range(first_row, min(first_row + tile_size, height))]
+            _write_band(file_pointer, band, width, tile_size)
+    os.replace(temporary_path, output_path)
+
+
+def convert_text_maze(file_name: str, output_path: str,
+                      tile_size: int = DEFAULT_TILE_SIZE) -> None:
+    """ Converts a maze text file into a tiled maze file, reading it a band
+    of tile_size rows at a time, so only one band of the maze is ever in
+    memory. The same rules as maze_io.load_maze() are applied, but only the
+    first malformed row is reported.
+
+    Args:
+        file_name (str): The file name of the maze text file.
+        output_path (str): The file name to write the tiled maze to.
+        tile_size (int, optional): The width and height of each tile.
+
+    Raises:
+        MazeFormatError: If the maze is malformed, in which case no tiled
+            maze is written.
+    """
+    _check_tile_size(tile_size)
+    temporary_path = f"{output_path}.{os.getpid()}.tmp"
+    try:
+        with open(file_name, "rb") as maze_file, \
+                open(temporary_path, "wb") as file_pointer:
+            # The header is only known once the last row has been read
+            file_pointer.write(bytes(HEADER.size))
+            width = None
+            height = 0
+            blank_rows = 0
+            band = []
+
+            for line in maze_file:
+                row = line.translate(None, LINE_SEPARATORS)
+                # Blank lines are only allowed at the end of the file
+                if not row:
+                    blank_rows += 1
+                    continue
+                if blank_rows or (width is not None and len(row) != width):
+                    raise MazeFormatError(
+                        f"{file_name}: row {height} does not have the same "
+                        f"number of cells ({width}) as the first row")
+                if row.translate(None, b'#-'):
+                    raise MazeFormatError(
+                        f"{file_name}: row {height} contains characters "
+                        f"other than '#' and '-'")
+                if width is None:
+                    width = len(row)
+                    start_column = row.find(b'-')
+                    if start_column == -1:
+                        raise MazeFormatError(
+                            f"{file_name}: the first row has no gap to start "
+                            f"the maze from")
+
+                last_row = row
+                band.append(row.translate(CELL_TABLE))
+                height += 1
+                if len(band) == tile_size:
+                    _write_band(file_pointer, band, width, tile_size)
+                    band = []
+
+            if width is None:
+                raise MazeFormatError(f"{file_name} does not contain a maze")
+            if band:
+                _write_band(file_pointer, band, width, tile_size)
+            goal_column = last_row.find(b'-')
+            if goal_column == -1:
+                raise MazeFormatError(f"{file_name}: the last row has no gap "
+                                      f"to finish the maze at")
+
+            file_pointer.seek(0)
+            file_pointer.write(HEADER.pack(MAGIC, VERSION, tile_size, width,
+                                           height, 0, start_column,
+                                           height - 1, goal_column))
+    except MazeFormatError:
+        os.remove(temporary_path)
+        raise
+    os.replace(temporary_path, output_path)
+
+
+def _write_band(file_pointer, band: list, width: int, tile_size: int) -> None:
+    """ Writes a band of up to tile_size rows (of cell values) as a row of
+    tiles, padding the tiles with walls past the right and bottom edges.
+    """
+    missing_rows = bytes((tile_size - len(band)) * tile_size)
+    for first_column in range(0, width, tile_size):
+        columns = min(tile_size, width - first_column)
+        padding = bytes(tile_size - columns)
+        parts = []
+        for row in band:
+            parts.append(row[first_column:first_column + columns])
+            parts.append(padding)
+        parts.append(missing_rows)
+        file_pointer.write(b''.join(parts))
+
+
+def _check_tile_size(tile_size: int) -> None:
+    """ Checks a tile size fits in the header.
+    """
+    if not 0 < tile_size < 2 ** 16:
+        raise ValueError(f"the tile size must be between 1 and {2 ** 16 - 1}")
+
+
+def _unpack_header(header: bytes, file_name: str) -> tuple:
+    """ Unpacks and validates the raw bytes of a tiled maze header.
+
+    Returns:
+        tuple: (width, height, tile_size, start_point, goal_point).
+    """
+    if len(header) < HEADER.size or header[:4] != MAGIC:
+        raise MazeFormatError(f"{file_name} is not a tiled maze file")
+
+    (_, version, tile_size, width, height, start_row, start_column,
+     goal_row, goal_column) = HEADER.unpack(header[:HEADER.size])
+
+    if version != VERSION or tile_size == 0:
+        raise MazeFormatError(f"{file_name} uses an unsupported tiled maze "
+                              f"version ({version}) or tile size "
+                              f"({tile_size})")
+
+    return (width, height, tile_size, (start_row, start_column),
+            (goal_row, goal_column))
+
+
+def main(arguments: list[str] = None) -> int:
+    """ Converts a maze text file into a tiled maze file (unless it is
+    already a tiled or binary maze) and solves it with A* from the command
+    line, printing the tile cache's statistics.
+
+    Returns:
+        int: (exit_code). 0 if a path was found, otherwise 1.
+    """
+    parser = argparse.ArgumentParser(
+        description="Solve a maze a tile at a time, with a bounded cache of "
+        "tiles in memory.")
+    parser.add_argument("maze", help=f"maze text file to convert, or a tiled "
+                        f"({EXTENSION}) or binary ({maze_binary.EXTENSION}) "
+                        f"maze to solve directly")
+    parser.add_argument("-o", "--output",
+                        help=f"tiled maze file to convert a text maze to "
+                        f"(default: the maze name with a {EXTENSION} "
+                        f"extension)")
+    parser.add_argument("-t", "--tile-size", type=int,
+                        default=DEFAULT_TILE_SIZE,
+                        help=f"width and height of the tiles when converting "
+                        f"(default: {DEFAULT_TILE_SIZE})")
+    parser.add_argument("-c", "--cache-capacity", type=int,
+                        default=DEFAULT_CACHE_CAPACITY,
+                        help=f"tiles kept in memory while solving (default: "
+                        f"{DEFAULT_CACHE_CAPACITY})")
+    parser.add_argument("--convert-only", action="store_true",
+                        help="convert the maze without solving it")
+    options = parser.parse_args(arguments)
+
+    maze_file = options.maze
+    extension = os.path.splitext(maze_file)[1]
+    if extension not in (EXTENSION, maze_binary.EXTENSION):
+        maze_file = (options.output or
+                     os.path.splitext(options.maze)[0] + EXTENSION)
+        start_time = time.perf_counter()
+        convert_text_maze(options.maze, maze_file, options.tile_size)
+        print(f"{options.maze} -> {maze_file} "
+              f"({time.perf_counter() - start_time:.2f}s)")
+    if options.convert_only:
+        return 0
+
+    with TiledMaze.open(maze_file, options.cache_capacity) as tiled_maze:
+        start_time = time.perf_counter()
+        (path_taken, nodes_expanded) = a_star_search(
+            tiled_maze, tiled_maze.start_point, tiled_maze.goal_point)
+        elapsed_time = time.perf_counter() - start_time
+
+        print(f"Path length (steps): "
+              f"{len(path_taken) - 1 if path_taken is not None else None}")
+        print(f"Nodes expanded: {nodes_expanded}")
+        print(f"Time: {elapsed_time:.2f}s")
+        total_tiles = tiled_maze.tiles_across * tiled_maze.tiles_down
+        statistics = tiled_maze.cache_statistics()
+        print(f"Tiles: {statistics['touched_tiles']} of {total_tiles} "
+              f"touched, {statistics['resident_tiles']} resident "
+              f"({tiled_maze.tile_size} x {tiled_maze.tile_size} cells, "
+              f"cache capacity {tiled_maze.cache_capacity})")
+        print(f"Tile cache: {statistics['tile_hits']} hits, "
+              f"{statistics['tile_misses']} misses, "
+              f"{statistics['tile_evictions']} evictions "
+              f"({statistics['hit_ratio']:.2%} hit ratio)")
+
+    return 0 if path_taken is not None else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
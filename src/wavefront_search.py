@@ -0,0 +1,214 @@
+"""Solves a maze with a vectorised breadth first search (requires NumPy)
+
+The search expands a whole BFS layer (wavefront) at a time with NumPy array
+operations instead of one node at a time in Python, building the distance
+field from the start point. The path is then recovered by walking downhill
+through the distance field from the goal back to the start.
+
+NumPy is optional: the rest of the project only uses built in modules, and
+this module can still be imported without it (the search functions raise an
+ImportError when they are called).
+"""
+import time
+from maze_grid import MazeGrid
+from maze_binary import load_maze_cached
+from maze_components import load_components_cached, search_if_reachable
+from iterative_depth_first_search import performance_statistics
+from maze_output import maze_output_to_file, solver_arguments
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Distance given to cells that haven't been (or can't be) reached
+UNREACHED = -1
+
+
+def maze_solver(file_name: str, path_format: str = None) -> None:
+    """ Uses the vectorised breadth first search to solve a maze and prints out
+    statistics about the algorithm's performance when solving the maze,
+    including the number of nodes explored, the execution time and the
+    number of steps in the path.
+
+    Args:
+        file_name (str): The file name of the maze to be solved, provided as a
+            string so that it can be used to open the maze file directly.
+        path_format (str, optional): How to print the path taken, one of
+            maze_output.PATH_FORMATS, or None (the default) to skip printing
+            it.
+    """
+    # Loads the maze (from the binary cache if it is fresh) into a flat grid
+    # along with its start and goal points
+    (maze_grid, start_point, goal_point) = load_maze_cached(file_name)
+    # Loads the maze's connected components (from the cache if they are
+    # fresh), so an unreachable goal is answered without searching
+    components = load_components_cached(file_name)
+
+    # Stores both the path taken and the number of nodes explored by the
+    # algorithm
+    start_time = time.time()
+    (maze_path_wavefront,
+     nodes_expanded) = search_if_reachable(components, wavefront_bfs,
+                                           maze_grid, start_point, goal_point)
+    end_time = time.time()
+
+    # Prints out all the algorithm's performance statistics
+    performance_statistics((len(maze_path_wavefront) - 1
+                            if maze_path_wavefront is not None else None),
+                           nodes_expanded,
+                           round(end_time - start_time, 5),
+                           (maze_path_wavefront if path_format is not None
+                            else None),
+                           path_format
+                           )
+
+    # Outputs the algorithms path through the maze to the file maze_path.txt
+    maze_output_to_file(maze_grid, maze_path_wavefront)
+
+
+def wavefront_bfs(maze_dictionary, start_point: tuple[int, int],
+                  goal_point: tuple[int, int]
+                  ) -> tuple[list[(int, int)], int]:
+    """ Executes a layer by layer (vectorised) breadth first search on the
+    provided maze and returns the shortest path from the start to the goal
+    node, along with the number of nodes that have been expanded.
+
+    Args:
+        maze_dictionary (dict of (int, int): str or MazeGrid): The maze being
+            solved, either as a maze dictionary or as a MazeGrid.
+        start_point (tuple[int, int]): A coordinate (int, int) tuple indicating
+            when the algorithm starts when solving the maze.
+        goal_point (tuple[int, int]): A coordinate (int, int) tuple indicating
+            when the algorithm ends when solving the maze.
+
+    Raises:
+        ImportError: If NumPy isn't installed.
+
+    Returns:
+        tuple[list[(int, int)], int]: (path_taken, nodes_expanded). A packaged
+            tuple containing the shortest path through the maze (or None if
+            the goal can't be reached) along with the number of nodes
+            expanded, counting every node closer to the start than the goal
+            plus the goal itself.
+    """
+    (distances, nodes_expanded) = _expand_wavefront(maze_dictionary,
+                                                    start_point, goal_point)
+
+    if distances[goal_point] == UNREACHED:
+        return (None, nodes_expanded)
+
+    return (_descend(distances, goal_point), nodes_expanded)
+
+
+def distance_field(maze_dictionary, start_point: tuple[int, int]):
+    """ Finds the number of steps from the start point to every cell in the
+    maze.
+
+    Args:
+        maze_dictionary (dict of (int, int): str or MazeGrid): The maze being
+            searched.
+        start_point (tuple[int, int]): The coordinate distances are measured
+            from.
+
+    Raises:
+        ImportError: If NumPy isn't installed.
+
+    Returns:
+        numpy.ndarray: (distances). A (height, width) array of int32 distances,
+            with UNREACHED (-1) for walls and cells that can't be reached.
+    """
+    return _expand_wavefront(maze_dictionary, start_point, None)[0]
+
+
+def _expand_wavefront(maze_dictionary, start_point: tuple[int, int],
+                      goal_point) -> tuple:
+    """ Builds the distance field layer by layer, stopping early once the goal
+    point (if one is given) has been reached.
+
+    Each layer is held as an array of flat indices into a copy of the maze
+    padded with a border of walls, so the neighbours of the whole layer are
+    found with one broadcast addition and no bounds checks are needed.
+
+    Returns:
+        tuple: (distances, nodes_expanded). The (height, width) distance field
+            and the number of nodes expanded before the goal was reached.
+    """
+    if numpy is None:
+        raise ImportError("wavefront_bfs requires NumPy, which isn't "
+                          "installed (pip install numpy)")
+
+    if not isinstance(maze_dictionary, MazeGrid):
+        maze_dictionary = MazeGrid.from_dictionary(maze_dictionary)
+    (height, width) = (maze_dictionary.height, maze_dictionary.width)
+
+    # Surrounds the maze with walls so that every neighbour index is valid
+    padded_width = width + 2
+    unvisited = numpy.zeros((height + 2, padded_width), dtype=bool)
+    unvisited[1:-1, 1:-1] = numpy.frombuffer(
+        maze_dictionary.cells, dtype=numpy.uint8).reshape(height, width)
+    unvisited = unvisited.ravel()
+    distances = numpy.full(unvisited.shape, UNREACHED, dtype=numpy.int32)
+    # Flat index offsets for up, right, down and left in the padded maze
+    offsets = numpy.array([-padded_width, 1, padded_width, -1])
+
+    start_index = (start_point[0] + 1) * padded_width + start_point[1] + 1
+    goal_index = (None if goal_point is None else
+                  (goal_point[0] + 1) * padded_width + goal_point[1] + 1)
+
+    frontier = numpy.array([start_index])
+    unvisited[start_index] = False
+    distances[start_index] = 0
+    layer = 0
+    nodes_expanded = 0
+
+    while frontier.size > 0:
+        if goal_index is not None and distances[goal_index] != UNREACHED:
+            # Only the goal itself is expanded from the final layer
+            nodes_expanded += 1
+            break
+
+        nodes_expanded += frontier.size
+        layer += 1
+        # Every neighbour of every node in the layer, keeping the open cells
+        # that haven't been reached yet (numpy.unique removes the cells that
+        # are reached from more than one node)
+        neighbours = (frontier[:, numpy.newaxis] + offsets).ravel()
+        frontier = numpy.unique(neighbours[unvisited[neighbours]])
+        unvisited[frontier] = False
+        distances[frontier] = layer
+
+    # Removes the padding before returning the distances
+    distances = distances.reshape(height + 2, padded_width)[1:-1, 1:-1]
+    return (distances, nodes_expanded)
+
+
+def _descend(distances, goal_point: tuple[int, int]) -> list[(int, int)]:
+    """ Walks from the goal point back to the start by always stepping to a
+    neighbour that is one step closer to the start (checking up, right, down
+    then left), and returns the path from the start to the goal.
+    """
+    (height, width) = distances.shape
+    (row, column) = goal_point
+    distance = int(distances[row, column])
+    path_taken = [goal_point]
+
+    while distance > 0:
+        distance -= 1
+        for (next_row, next_column) in ((row - 1, column), (row, column + 1),
+                                        (row + 1, column), (row, column - 1)):
+            if (0 <= next_row < height and 0 <= next_column < width
+                    and distances[next_row, next_column] == distance):
+                (row, column) = (next_row, next_column)
+                break
+        path_taken.append((row, column))
+
+    return list(reversed(path_taken))
+
+
+if __name__ == '__main__':
+    # The path is only printed if a format is given on the command line
+    OPTIONS = solver_arguments()
+    MAZE_FILE_NAME = str(input(
+                    "Enter the file_name of the maze you would like solved: "))
+    maze_solver("../docs/mazes/" + MAZE_FILE_NAME, OPTIONS.path_format)